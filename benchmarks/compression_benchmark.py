@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmark the upload compression codecs of LakeFSHook.
+
+Measures compression ratio, throughput and CPU time of each codec and level
+on generated CSV and JSON lines artifacts, or on files given as arguments.
+Bandwidth saved is worth the CPU when size / throughput + compressed size /
+link speed is below size / link speed.
+
+    python benchmarks/compression_benchmark.py [--size-mb 64] [FILE ...]
+"""
+
+import argparse
+import io
+import json
+import random
+import time
+
+from lakefs_provider.hooks.compression import compress_stream, decompress_stream
+
+CODECS = [("gzip", 1), ("gzip", 6), ("zstd", 1), ("zstd", 3), ("zstd", 9)]
+
+
+def generate_csv(size):
+    rng = random.Random(0)
+    out = io.BytesIO()
+    out.write(b"id,timestamp,user,country,amount,status\n")
+    i = 0
+    while out.tell() < size:
+        out.write(b"%d,2023-10-%02dT%02d:%02d:00Z,user-%d,%s,%.2f,%s\n" % (
+            i, rng.randint(1, 31), rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 100000),
+            rng.choice([b"US", b"IL", b"DE", b"FR", b"JP"]), rng.random() * 1000,
+            rng.choice([b"ok", b"failed", b"pending"])))
+        i += 1
+    return out.getvalue()
+
+
+def generate_jsonl(size):
+    rng = random.Random(1)
+    out = io.BytesIO()
+    i = 0
+    while out.tell() < size:
+        out.write(json.dumps({"id": i, "event": rng.choice(["click", "view", "purchase"]),
+                              "properties": {"page": f"/products/{rng.randint(0, 5000)}",
+                                             "duration_ms": rng.randint(0, 60000)}}).encode() + b"\n")
+        i += 1
+    return out.getvalue()
+
+
+def measure(data, codec, level):
+    compressed = io.BytesIO()
+    wall, cpu = time.perf_counter(), time.process_time()
+    compress_stream(io.BytesIO(data), compressed, codec, level)
+    compress_wall, compress_cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    compressed.seek(0)
+    wall, cpu = time.perf_counter(), time.process_time()
+    reader = decompress_stream(compressed, codec)
+    while reader.read(1 << 20):
+        pass
+    decompress_wall, decompress_cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return len(compressed.getvalue()), compress_wall, compress_cpu, decompress_wall, decompress_cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64, help="size of each generated artifact")
+    parser.add_argument("files", nargs="*", help="benchmark these files instead of generated artifacts")
+    args = parser.parse_args()
+
+    if args.files:
+        artifacts = []
+        for name in args.files:
+            with open(name, "rb") as f:
+                artifacts.append((name, f.read()))
+    else:
+        size = args.size_mb << 20
+        artifacts = [("csv", generate_csv(size)), ("jsonl", generate_jsonl(size))]
+
+    print(f"{'artifact':<12}{'codec':<8}{'level':>6}{'ratio':>8}{'comp MB/s':>11}{'comp CPU s':>12}"
+          f"{'decomp MB/s':>13}{'decomp CPU s':>14}")
+    for name, data in artifacts:
+        mb = len(data) / (1 << 20)
+        for codec, level in CODECS:
+            try:
+                size, cw, cc, dw, dc = measure(data, codec, level)
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"{name:<12}{codec:<8}{level:>6}  skipped: {e}")
+                continue
+            print(f"{name:<12}{codec:<8}{level:>6}{len(data) / size:>8.1f}{mb / cw:>11.0f}{cc:>12.2f}"
+                  f"{mb / dw:>13.0f}{dc:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-__version__ = '0.48.0'
+__version__ = '0.49.0'
 
 ## This is needed to allow Airflow to pick up specific metadata fields it needs for certain features. We recognize it's a bit unclean to define these in multiple places, but at this point it's the only workaround if you'd like your custom conn type to show up in the Airflow UI.
 def get_provider_info():
@@ -13,5 +13,36 @@ def get_provider_info():
         }],
 
         "extra-links": ["lakefs_provider.links.lakefs_link.LakeFSLink"],
+        "filesystems": ["lakefs_provider.fs.lakefs_fs"],
+        "config": {
+            "lakefs": {
+                "description": "lakeFS provider settings.",
+                "options": {
+                    "profile": {
+                        "description": "Profile every run of lakeFS operators and sensors with cProfile. "
+                                       "Operators can override this with their profile argument.",
+                        "version_added": "0.49.0",
+                        "type": "boolean",
+                        "example": "True",
+                        "default": "False",
+                    },
+                    "profile_dir": {
+                        "description": "Directory of the full profiles of profiled tasks. "
+                                       "Defaults to lakefs_profiles under [logging] base_log_folder.",
+                        "version_added": "0.49.0",
+                        "type": "string",
+                        "example": "/tmp/lakefs_profiles",
+                        "default": "",
+                    },
+                    "profile_top": {
+                        "description": "Number of hottest calls shown in the task log of profiled tasks.",
+                        "version_added": "0.49.0",
+                        "type": "integer",
+                        "example": "50",
+                        "default": "25",
+                    },
+                },
+            },
+        },
         "versions": ["0.0.1"]
     }
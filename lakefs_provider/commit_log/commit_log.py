@@ -0,0 +1,83 @@
+"""Compact export of lakeFS commit logs to Parquet.
+
+Commits are converted to plain tuple rows, with the ::lakefs::Airflow::
+metadata written by WithLakeFSMetadataOperator flattened into columns of
+their own and any other metadata kept in a map column.  Pages of rows are
+written as Parquet row groups as they arrive, so exporting a log of any
+length holds only a few pages in memory.  Requires pyarrow.
+"""
+from typing import IO, Any, Dict, Iterable, List, Tuple
+
+from airflow.exceptions import AirflowException
+
+AIRFLOW_METADATA_PREFIX = "::lakefs::Airflow::"
+
+# Columns of the Airflow metadata keys added by WithLakeFSMetadataOperator.
+AIRFLOW_COLUMNS = {
+    "dag_id": "airflow_dag_id",
+    "dag_run_id": "airflow_dag_run_id",
+    "run_type": "airflow_run_type",
+    "logical_date[iso8601]": "airflow_logical_date",
+    "data_interval_start[iso8601]": "airflow_data_interval_start",
+    "data_interval_end[iso8601]": "airflow_data_interval_end",
+    "last_scheduling_decision[iso8601]": "airflow_last_scheduling_decision",
+    "external_trigger[boolean]": "airflow_external_trigger",
+    "note": "airflow_note",
+    "url[url:id]": "airflow_url_id",
+    "url[url:ui]": "airflow_url_ui",
+}
+
+COMMIT_COLUMNS = ("id", "parents", "committer", "message", "creation_date", "meta_range_id")
+
+COLUMNS = COMMIT_COLUMNS + tuple(AIRFLOW_COLUMNS.values()) + ("metadata",)
+
+_AIRFLOW_KEYS = {AIRFLOW_METADATA_PREFIX + key: i for i, key in enumerate(AIRFLOW_COLUMNS)}
+
+
+def commit_row(commit: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the row of a commit, as a tuple of values for COLUMNS."""
+    airflow = [None] * len(AIRFLOW_COLUMNS)
+    metadata = []
+    for key, value in (commit.get("metadata") or {}).items():
+        i = _AIRFLOW_KEYS.get(key)
+        if i is None:
+            metadata.append((key, value))
+        else:
+            airflow[i] = value
+    return (commit["id"], commit["parents"], commit["committer"], commit["message"], commit["creation_date"],
+            commit["meta_range_id"], *airflow, metadata)
+
+
+def _pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise AirflowException(
+            "Exporting commit logs requires pyarrow, install airflow-provider-lakefs[parquet]") from e
+    return pa, pq
+
+
+def commit_log_schema() -> Any:
+    pa, _ = _pyarrow()
+    return pa.schema([("id", pa.string()), ("parents", pa.list_(pa.string())), ("committer", pa.string()),
+                      ("message", pa.string()), ("creation_date", pa.timestamp("s", tz="UTC")),
+                      ("meta_range_id", pa.string())]
+                     + [(column, pa.string()) for column in AIRFLOW_COLUMNS.values()]
+                     + [("metadata", pa.map_(pa.string(), pa.string()))])
+
+
+def write_commit_log(pages: Iterable[List[Tuple[Any, ...]]], out: IO[bytes]) -> int:
+    """Write pages of commit rows to out as Parquet, one row group per page.
+    Returns the number of rows."""
+    pa, pq = _pyarrow()
+    schema = commit_log_schema()
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in pages:
+            if not rows:
+                continue
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)], schema=schema))
+            count += len(rows)
+    return count
@@ -0,0 +1,77 @@
+"""Airflow Datasets for lakeFS branches.
+
+A commit or merge operator created with ``emit_dataset=True`` declares the
+Dataset ``lakefs://<repo>/<branch>[/<prefix>]`` as an outlet, so DAGs
+scheduled on that Dataset run after each commit without polling lakeFS::
+
+    @dag(schedule=[lakefs_dataset("example-repo", "main")])
+    def consumer():
+        @task
+        def process(**context):
+            commit_id = get_triggering_commit(context, "example-repo", "main")
+
+Datasets need Airflow 2.4 or later.
+"""
+from typing import Any, Dict, Optional
+
+LAKEFS_DATASET_SCHEME = "lakefs"
+
+
+def lakefs_dataset_uri(repo: str, branch: str, prefix: Optional[str] = None) -> str:
+    """Return the Dataset URI of a branch, or of a prefix on it."""
+    uri = f"{LAKEFS_DATASET_SCHEME}://{repo}/{branch}"
+    if prefix:
+        uri = f"{uri}/{prefix.strip('/')}"
+    return uri
+
+
+def lakefs_dataset(repo: str, branch: str, prefix: Optional[str] = None) -> Any:
+    """Return the Airflow Dataset of a branch, or of a prefix on it."""
+    from airflow.datasets import Dataset
+
+    return Dataset(lakefs_dataset_uri(repo, branch, prefix))
+
+
+def set_dataset_commit(context: Dict[str, Any], dataset: Any, commit_id: str) -> None:
+    """Attach commit_id to the event that the running task emits for dataset.
+
+    Dataset event extras need Airflow 2.10 or later; on older versions
+    get_triggering_commit reads the commit ID from the producing task's XCom
+    instead."""
+    outlet_events = context.get("outlet_events")
+    if outlet_events is not None:
+        outlet_events[dataset].extra = {"commit_id": commit_id}
+
+
+def get_triggering_commit(context: Dict[str, Any], repo: str, branch: str,
+                          prefix: Optional[str] = None) -> Optional[str]:
+    """Return the ID of the latest lakeFS commit that triggered this DAG run
+    through the Dataset of repo and branch (and prefix), or None if that
+    Dataset did not trigger it."""
+    events = context.get("triggering_dataset_events", {}).get(lakefs_dataset_uri(repo, branch, prefix))
+    if not events:
+        return None
+    event = events[-1]
+    commit_id = (event.extra or {}).get("commit_id")
+    if commit_id is None:
+        # Events from older Airflow versions have no extra: the commit and merge
+        # operators return the commit ID.
+        from airflow.models import XCom
+
+        commit_id = XCom.get_one(key="return_value", dag_id=event.source_dag_id,
+                                 task_id=event.source_task_id, run_id=event.source_run_id,
+                                 map_index=event.source_map_index)
+    return commit_id
+
+
+def declare_lakefs_outlet(operator: Any, repo: str, branch: str, prefix: Optional[str] = None) -> Any:
+    """Add the Dataset of repo and branch (and prefix) to the outlets of operator
+    and return it.  Datasets are fixed when the DAG is parsed, so these cannot
+    be templated."""
+    from airflow.exceptions import AirflowException
+
+    if any("{{" in (value or "") for value in (repo, branch, prefix)):
+        raise AirflowException(f"{operator.task_id}: cannot emit a Dataset for a templated repo, branch or prefix")
+    dataset = lakefs_dataset(repo, branch, prefix)
+    operator.outlets = list(operator.outlets or []) + [dataset]
+    return dataset
@@ -0,0 +1,44 @@
+import asyncio
+import json
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+async def poll_events(receiver_url: str, repository: str, branch: Optional[str], after: Optional[int],
+                      timeout: float) -> Tuple[int, List[Dict[str, Any]]]:
+    """Long-poll a LakeFSEventReceiver for events on repository and branch
+    after cursor after.  Returns (cursor, events).  Query parameters of
+    receiver_url (such as token) are passed along.
+
+    Raises OSError or asyncio.TimeoutError if the receiver cannot be reached."""
+    url = urlsplit(receiver_url)
+    query = dict(parse_qsl(url.query))
+    query.update(repository=repository, timeout=timeout)
+    if branch:
+        query["branch"] = branch
+    if after is not None:
+        query["after"] = after
+    secure = url.scheme == "https"
+    port = url.port or (443 if secure else 80)
+    path = f"{url.path.rstrip('/')}/events?{urlencode(query)}"
+
+    async def request():
+        reader, writer = await asyncio.open_connection(url.hostname, port,
+                                                       ssl=ssl.create_default_context() if secure else None)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                         f"Connection: close\r\n\r\n".encode("ascii"))
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+
+    # Leave the receiver time to answer an expired long poll.
+    response = await asyncio.wait_for(request(), timeout=timeout + 10)
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    if status != 200:
+        raise OSError(f"lakeFS event receiver returned {status}: {body.decode('utf-8', 'replace')}")
+    result = json.loads(body)
+    return result["cursor"], result["events"]
@@ -0,0 +1,192 @@
+"""Receiver for lakeFS action webhooks.
+
+Run it next to the Airflow triggerer::
+
+    python -m lakefs_provider.events.receiver --host 0.0.0.0 --port 8765 --token <secret>
+
+It listens on 127.0.0.1 by default; listening on any other address requires
+--token.  Point a lakeFS action's webhook at it, passing the token in a
+``token`` query parameter (set the same URL, without /webhook, as the
+event_receiver_url extra of the lakeFS connection)::
+
+    name: notify airflow
+    on:
+      post-commit:
+      post-merge:
+    hooks:
+      - id: airflow
+        type: webhook
+        properties:
+          url: "http://<receiver host>:8765/webhook?token=<secret>"
+
+Deferred lakeFS sensors long-poll ``GET /events`` for the repository and
+branch they watch, and wake as soon as a matching webhook arrives.
+"""
+import argparse
+import asyncio
+import collections
+import ipaddress
+import json
+import logging
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# lakeFS webhook payload fields kept for subscribers.
+_EVENT_FIELDS = ("event_type", "event_time", "repository_id", "branch_id", "source_ref", "commit_id")
+
+
+class LakeFSEventReceiver:
+    """
+    Minimal asyncio HTTP server that accepts lakeFS webhooks on
+    ``POST /webhook`` and serves them to long-polling subscribers on
+    ``GET /events?repository=<repo>&branch=<branch>&after=<cursor>&timeout=<seconds>``.
+
+    Events are numbered by a monotonically increasing cursor and kept in a
+    bounded buffer.  A subscriber passes the cursor it last saw and gets every
+    later event for its repository and branch, or an empty list once timeout
+    expires.
+
+    :param host: Address to listen on.
+    :param port: Port to listen on.
+    :param token: If set, requests must carry it in a ``token`` query
+        parameter or in an ``X-Lakefs-Event-Token`` header.
+    :param buffer_size: Number of recent events kept for subscribers.
+    """
+
+    max_poll_timeout = 300
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, token: Optional[str] = None,
+                 buffer_size: int = 10000) -> None:
+        self.host = host
+        self.port = port
+        self.token = token
+        self._events: Deque[Tuple[int, Dict[str, Any]]] = collections.deque(maxlen=buffer_size)
+        self._cursor = 0
+        self._arrived: Optional[asyncio.Condition] = None
+        self._server = None
+
+    async def start(self) -> None:
+        self._arrived = asyncio.Condition()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("lakeFS event receiver listening on %s:%d", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def record(self, payload: Dict[str, Any]) -> int:
+        """Record a webhook payload and wake matching subscribers.  Returns its cursor."""
+        async with self._arrived:
+            self._cursor += 1
+            event = {field: payload.get(field) for field in _EVENT_FIELDS}
+            self._events.append((self._cursor, event))
+            self._arrived.notify_all()
+            return self._cursor
+
+    def _matching(self, repository: str, branch: Optional[str], after: int) -> List[Dict[str, Any]]:
+        return [dict(event, cursor=cursor) for cursor, event in self._events
+                if cursor > after and event["repository_id"] == repository
+                and (not branch or event["branch_id"] == branch)]
+
+    async def wait(self, repository: str, branch: Optional[str], after: Optional[int],
+                   timeout: float) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (cursor, events after the given cursor), waiting up to timeout
+        for the first one.  A missing cursor returns the current cursor at once."""
+        async with self._arrived:
+            if after is None:
+                return self._cursor, []
+            try:
+                await asyncio.wait_for(
+                    self._arrived.wait_for(lambda: self._matching(repository, branch, after)),
+                    timeout=min(timeout, self.max_poll_timeout))
+            except asyncio.TimeoutError:
+                pass
+            return self._cursor, self._matching(repository, branch, after)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._dispatch(reader)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, body = 400, {"message": str(e)}
+        except Exception as e:  # pylint: disable=broad-except
+            log.exception("lakeFS event receiver failed to handle a request")
+            status, body = 500, {"message": str(e)}
+        data = json.dumps(body).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("ascii") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any]]:
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if self.token and self.token not in (query.get("token"), headers.get("x-lakefs-event-token")):
+            return 401, {"message": "bad or missing token"}
+
+        if method == "POST" and url.path == "/webhook":
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            cursor = await self.record(json.loads(body or b"{}"))
+            return 200, {"cursor": cursor}
+        if method == "GET" and url.path == "/events":
+            if "repository" not in query:
+                raise ValueError("missing repository")
+            after = int(query["after"]) if query.get("after") else None
+            cursor, events = await self.wait(query["repository"], query.get("branch"), after,
+                                             float(query.get("timeout", 30)))
+            return 200, {"cursor": cursor, "events": events}
+        if method == "GET" and url.path == "/health":
+            return 200, {"cursor": self._cursor}
+        return 404, {"message": f"no route for {method} {url.path}"}
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Receive lakeFS action webhooks for deferred lakeFS sensors")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on; "
+                        "other than a loopback address requires --token")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--token", default=None, help="shared secret required on every request")
+    parser.add_argument("--buffer-size", type=int, default=10000, help="number of recent events to keep")
+    args = parser.parse_args(argv)
+    if not args.token and not is_loopback(args.host):
+        parser.error(f"--token is required to listen on {args.host}, anyone reaching it could inject events")
+
+    logging.basicConfig(level=logging.INFO)
+    receiver = LakeFSEventReceiver(args.host, args.port, args.token, args.buffer_size)
+    asyncio.run(receiver.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
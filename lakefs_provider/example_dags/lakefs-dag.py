@@ -8,7 +8,6 @@ from airflow.decorators import dag
 from airflow.utils.dates import days_ago
 from airflow.exceptions import AirflowFailException
 
-from lakefs_sdk.exceptions import NotFoundException
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
 from lakefs_provider.operators.create_branch_operator import LakeFSCreateBranchOperator
 from lakefs_provider.operators.create_symlink_operator import LakeFSCreateSymlinkOperator
@@ -60,6 +59,8 @@ def check_logs(task_instance, repo: str, ref: str, commits: Sequence[str], messa
 
 
 def check_branch_object(task_instance, repo: str, branch: str, path: str):
+    from lakefs_sdk.exceptions import NotFoundException
+
     hook = LakeFSHook(default_args['lakefs_conn_id'])
     print(f"Trying to check if the following path exists: lakefs://{repo}/{branch}/{path}")
     try:
@@ -0,0 +1,204 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fsspec.spec import AbstractBufferedFile, AbstractFileSystem
+from lakefs_sdk.exceptions import NotFoundException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+# Schemes handled by get_fs, for Airflow ObjectStoragePath.
+schemes = ["lakefs"]
+
+
+class LakeFSFileSystem(AbstractFileSystem):
+    """
+    fsspec filesystem over lakeFS, using the connection of a LakeFSHook.
+
+    Paths have the form ``lakefs://<repo>/<ref>/<path>``.  Reads are ranged
+    GETs served through an fsspec block cache, so columnar readers only
+    fetch the byte ranges they need.  Writes are spooled to a local
+    temporary file as they are flushed and uploaded when the file closes.
+
+    :param lakefs_conn_id: connection to run the filesystem with
+    :type lakefs_conn_id: str
+    :param default_block_size: Size of each ranged read and of the write buffer.
+    :type default_block_size: int
+    :param default_cache_type: fsspec cache used for reads ("readahead",
+        "blockcache", "bytes", "none", ...).
+    :type default_cache_type: str
+    :param list_page_size: Number of objects fetched per listing page.
+    :type list_page_size: int
+    :param hook: Existing hook to run requests through, instead of creating
+        one from lakefs_conn_id.
+    :type hook: LakeFSHook
+    """
+
+    protocol = "lakefs"
+    root_marker = ""
+
+    def __init__(self, lakefs_conn_id: str = LakeFSHook.default_conn_name,
+                 default_block_size: Optional[int] = None, default_cache_type: str = "readahead",
+                 list_page_size: int = 1000, hook: Optional[LakeFSHook] = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lakefs_conn_id = hook.lakefs_conn_id if hook else lakefs_conn_id
+        self.default_block_size = default_block_size or LakeFSFile.DEFAULT_BLOCK_SIZE
+        self.default_cache_type = default_cache_type
+        self.list_page_size = list_page_size
+        self.hook = hook or LakeFSHook(lakefs_conn_id)
+
+    @staticmethod
+    def split_path(path: str) -> Tuple[str, str, str]:
+        """Split a path into (repo, ref, path inside ref)."""
+        path = LakeFSFileSystem._strip_protocol(path)
+        parts = path.split("/", 2)
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            raise ValueError(f"lakeFS path '{path}' must include a repository and a ref")
+        return parts[0], parts[1], parts[2] if len(parts) > 2 else ""
+
+    def _object_info(self, repo: str, ref: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+        name = f"{repo}/{ref}/{stats['path']}".rstrip("/")
+        if stats.get("path_type") == "common_prefix":
+            return {"name": name, "size": 0, "type": "directory"}
+        return {
+            "name": name,
+            "size": stats.get("size_bytes") or 0,
+            "type": "file",
+            "checksum": stats.get("checksum"),
+            "mtime": stats.get("mtime"),
+            "content_type": stats.get("content_type"),
+            "physical_address": stats.get("physical_address"),
+        }
+
+    def ls(self, path: str, detail: bool = True, **kwargs: Any) -> List[Any]:
+        repo, ref, key = self.split_path(path)
+        prefix = f"{key.rstrip('/')}/" if key else ""
+        entries = [self._object_info(repo, ref, stats)
+                   for stats in self.hook.list_objects(repo, ref, prefix=prefix, delimiter="/",
+                                                       size=self.list_page_size)]
+        if not entries and key:
+            # ls of a single file lists that file.
+            entries = [self.info(path)]
+        return entries if detail else [entry["name"] for entry in entries]
+
+    def find(self, path: str, maxdepth: Optional[int] = None, withdirs: bool = False,
+             detail: bool = False, **kwargs: Any) -> Any:
+        if maxdepth is not None or withdirs:
+            return super().find(path, maxdepth=maxdepth, withdirs=withdirs, detail=detail, **kwargs)
+        # A flat listing fetches the whole subtree in as few pages as possible.
+        repo, ref, key = self.split_path(path)
+        path = self._strip_protocol(path)
+        prefix = f"{key.rstrip('/')}/" if key else ""
+        found = {}
+        try:
+            found[path] = self.info(path)
+            if found[path]["type"] != "file":
+                found = {}
+        except FileNotFoundError:
+            pass
+        for stats in self.hook.list_objects(repo, ref, prefix=prefix, size=self.list_page_size):
+            entry = self._object_info(repo, ref, stats)
+            found[entry["name"]] = entry
+        return found if detail else sorted(found)
+
+    def info(self, path: str, **kwargs: Any) -> Dict[str, Any]:
+        repo, ref, key = self.split_path(path)
+        if key and not key.endswith("/"):
+            try:
+                return self._object_info(repo, ref, self.hook.stat_object(repo, ref, key))
+            except NotFoundException:
+                pass
+        prefix = f"{key.rstrip('/')}/" if key else ""
+        for _ in self.hook.list_objects(repo, ref, prefix=prefix, delimiter="/", size=1):
+            return {"name": f"{repo}/{ref}/{key}".rstrip("/"), "size": 0, "type": "directory"}
+        if not key:
+            # An empty ref is still a directory.
+            return {"name": f"{repo}/{ref}", "size": 0, "type": "directory"}
+        raise FileNotFoundError(path)
+
+    def modified(self, path: str) -> datetime:
+        info = self.info(path)
+        if info["type"] != "file":
+            raise IsADirectoryError(path)
+        return datetime.fromtimestamp(info["mtime"], tz=timezone.utc)
+
+    def ukey(self, path: str) -> str:
+        return self.info(path)["checksum"]
+
+    def cat_file(self, path: str, start: Optional[int] = None, end: Optional[int] = None,
+                 **kwargs: Any) -> bytes:
+        repo, ref, key = self.split_path(path)
+        if start is None and end is None:
+            return bytes(self.hook.get_object(repo, ref, key))
+        if (start is not None and start < 0) or (end is not None and end < 0):
+            size = self.size(path)
+            start = size + start if start is not None and start < 0 else start
+            end = size + end if end is not None and end < 0 else end
+        return bytes(self.hook.read_range(repo, ref, key, start or 0, end))
+
+    def _rm(self, path: str) -> None:
+        repo, ref, key = self.split_path(path)
+        self.hook.delete_object(repo, ref, key)
+
+    def mkdir(self, path: str, create_parents: bool = True, **kwargs: Any) -> None:
+        # lakeFS has no directories, they exist implicitly.
+        pass
+
+    def makedirs(self, path: str, exist_ok: bool = False) -> None:
+        pass
+
+    def _open(self, path: str, mode: str = "rb", block_size: Optional[int] = None,
+              autocommit: bool = True, cache_options: Optional[Dict[str, Any]] = None,
+              cache_type: Optional[str] = None, **kwargs: Any) -> "LakeFSFile":
+        return LakeFSFile(self, path, mode=mode,
+                          block_size=block_size or self.default_block_size,
+                          autocommit=autocommit,
+                          cache_type=cache_type or self.default_cache_type,
+                          cache_options=cache_options, **kwargs)
+
+
+class LakeFSFile(AbstractBufferedFile):
+    """A file on lakeFS.  Reads are ranged GETs, writes spool to a local
+    temporary file that is uploaded when the file is closed."""
+
+    def __init__(self, fs: LakeFSFileSystem, path: str, mode: str = "rb", **kwargs: Any) -> None:
+        if mode not in ("rb", "wb"):
+            raise ValueError(f"lakeFS files do not support mode '{mode}'")
+        self.repo, self.ref, self.key = fs.split_path(path)
+        self._spool = None
+        super().__init__(fs, path, mode=mode, **kwargs)
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        if start >= end:
+            return b""
+        return bytes(self.fs.hook.read_range(self.repo, self.ref, self.key, start, end))
+
+    def _initiate_upload(self) -> None:
+        self._spool = tempfile.NamedTemporaryFile(prefix="lakefs-upload-", delete=False)
+
+    def _upload_chunk(self, final: bool = False) -> bool:
+        self._spool.write(self.buffer.getbuffer())
+        if final and self.autocommit:
+            self.commit()
+        return True
+
+    def commit(self) -> None:
+        self._spool.close()
+        try:
+            self.fs.hook.upload_file(self.repo, self.ref, self.key, self._spool.name)
+        finally:
+            os.unlink(self._spool.name)
+        self.fs.invalidate_cache(self.path)
+
+    def discard(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            os.unlink(self._spool.name)
+            self._spool = None
+
+
+def get_fs(conn_id: Optional[str], storage_options: Optional[Dict[str, Any]] = None) -> LakeFSFileSystem:
+    """Return a lakeFS filesystem for Airflow ObjectStoragePath."""
+    return LakeFSFileSystem(lakefs_conn_id=conn_id or LakeFSHook.default_conn_name,
+                            **(storage_options or {}))
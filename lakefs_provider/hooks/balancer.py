@@ -0,0 +1,138 @@
+import itertools
+import logging
+import threading
+from typing import Any, List, Optional, Set
+
+import urllib3
+from lakefs_sdk.rest import RESTClientObject
+from urllib3.util import parse_url
+
+log = logging.getLogger(__name__)
+
+LOAD_BALANCING_POLICIES = ("least_inflight", "round_robin")
+
+# Methods that may be sent again after the connection failed mid-request.
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _endpoint_root(configuration: Any, endpoint: str) -> str:
+    """Return the API root URL of endpoint, normalized like LakeFSClient does:
+    http is the default scheme, and the API path the default path."""
+    if not endpoint.startswith(("http://", "https://")):
+        endpoint = "http://" + endpoint
+    url = parse_url(endpoint)
+    if not url.path or url.path == "/":
+        url = url._replace(path=parse_url(configuration.get_host_settings()[0]["url"]).path)
+    return url.url.rstrip("/")
+
+
+class _Endpoint:
+    """A lakeFS replica with its own keep-alive connection pool."""
+
+    def __init__(self, root: str, rest_client: RESTClientObject) -> None:
+        self.root = root
+        self.rest_client = rest_client
+        self.inflight = 0
+        self.healthy = True
+
+
+class BalancedRESTClient(RESTClientObject):
+    """
+    Drop-in replacement for the lakeFS SDK REST client that spreads requests
+    over several lakeFS endpoints (stateless replicas of one lakeFS).
+
+    Requests go to the healthy endpoint with the fewest requests in flight,
+    or to healthy endpoints in turn with the round_robin policy.  An endpoint
+    that fails to connect is ejected, and the request moves on to another
+    endpoint if it is safe to send again.  A background thread probes ejected
+    endpoints and returns them to service once they pass a health check.  If
+    every endpoint is ejected, all of them are tried.
+
+    :param configuration: lakeFS SDK configuration, its host is the first endpoint.
+    :param endpoints: URLs of all endpoints.
+    :param policy: least_inflight or round_robin.
+    :param probe_interval: Seconds between health probes of ejected endpoints.
+    """
+
+    def __init__(self, configuration: Any, endpoints: List[str], policy: str = "least_inflight",
+                 probe_interval: float = 10) -> None:
+        if policy not in LOAD_BALANCING_POLICIES:
+            raise ValueError(f"unknown load balancing policy {policy}, use one of {LOAD_BALANCING_POLICIES}")
+        super().__init__(configuration)
+        self.root = configuration.host.rstrip("/")
+        self.endpoints = [_Endpoint(_endpoint_root(configuration, endpoint), RESTClientObject(configuration))
+                          for endpoint in endpoints]
+        self.policy = policy
+        self.probe_interval = probe_interval
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._probe: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def _acquire(self, tried: Set[_Endpoint]) -> _Endpoint:
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in tried]
+            candidates = [e for e in candidates if e.healthy] or candidates
+            # Rotate the start so ties are broken in turn.
+            start = next(self._turn) % len(candidates)
+            candidates = candidates[start:] + candidates[:start]
+            endpoint = candidates[0]
+            if self.policy == "least_inflight":
+                endpoint = min(candidates, key=lambda e: e.inflight)
+            endpoint.inflight += 1
+            return endpoint
+
+    def _release(self, endpoint: _Endpoint) -> None:
+        with self._lock:
+            endpoint.inflight -= 1
+
+    def _eject(self, endpoint: _Endpoint, error: Exception) -> None:
+        with self._lock:
+            if not endpoint.healthy:
+                return
+            endpoint.healthy = False
+            log.warning("Ejecting lakeFS endpoint %s: %s", endpoint.root, error)
+            if self._probe is None or not self._probe.is_alive():
+                self._probe = threading.Thread(target=self._probe_ejected, name="lakefs-health-probe",
+                                               daemon=True)
+                self._probe.start()
+
+    def _probe_ejected(self) -> None:
+        while not self._closed.wait(self.probe_interval):
+            ejected = [e for e in self.endpoints if not e.healthy]
+            if not ejected:
+                return
+            for endpoint in ejected:
+                try:
+                    endpoint.rest_client.request("GET", f"{endpoint.root}/healthcheck",
+                                                 _request_timeout=self.probe_interval)
+                except Exception:  # pylint: disable=broad-except
+                    continue
+                log.info("lakeFS endpoint %s is healthy again", endpoint.root)
+                endpoint.healthy = True
+
+    def close(self) -> None:
+        """Stop probing ejected endpoints."""
+        self._closed.set()
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        if not url.startswith(self.root):
+            # Not an API URL (such as a presigned URL): send as is.
+            return super().request(method, url, *args, **kwargs)
+        path = url[len(self.root):]
+        tried: Set[_Endpoint] = set()
+        while True:
+            endpoint = self._acquire(tried)
+            tried.add(endpoint)
+            try:
+                return endpoint.rest_client.request(method, endpoint.root + path, *args, **kwargs)
+            except (urllib3.exceptions.MaxRetryError, urllib3.exceptions.ProtocolError) as e:
+                self._eject(endpoint, e)
+                # A request that never connected was not sent, so any method can go
+                # to another endpoint.
+                never_sent = isinstance(e, urllib3.exceptions.MaxRetryError) and isinstance(
+                    e.reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+                if len(tried) == len(self.endpoints) or not (never_sent or method.upper() in _IDEMPOTENT_METHODS):
+                    raise
+            finally:
+                self._release(endpoint)
@@ -0,0 +1,78 @@
+import gzip
+import shutil
+from typing import Any, Dict, IO, Optional
+
+from airflow.exceptions import AirflowException
+
+COMPRESSION_CODECS = ("gzip", "zstd")
+
+# User metadata key recording the codec of a compressed object.  lakeFS sets
+# user metadata on upload from X-Lakefs-Meta-* headers.
+COMPRESSION_METADATA_KEY = "Airflow-Compression"
+
+CHUNK_SIZE = 1 << 20
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise AirflowException(
+            "zstd compression requires zstandard, install airflow-provider-lakefs[zstd]") from e
+    return zstandard
+
+
+def check_codec(codec: str) -> None:
+    if codec not in COMPRESSION_CODECS:
+        raise AirflowException(f"Unknown compression codec {codec}, use one of {COMPRESSION_CODECS}")
+
+
+def compress_stream(src: IO[bytes], dst: IO[bytes], codec: str, level: Optional[int] = None) -> None:
+    """Compress src into dst with codec, CHUNK_SIZE bytes at a time."""
+    check_codec(codec)
+    if codec == "gzip":
+        with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6 if level is None else level) as out:
+            shutil.copyfileobj(src, out, CHUNK_SIZE)
+    else:
+        zstandard = _zstandard()
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        compressor.copy_stream(src, dst, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+
+
+class _GzipReader(gzip.GzipFile):
+    """GzipFile that closes its source when closed, and releases its
+    connection if the source is a urllib3 response."""
+
+    def close(self) -> None:
+        src = self.fileobj
+        try:
+            super().close()
+        finally:
+            if src is not None:
+                src.close()
+                release_conn = getattr(src, "release_conn", None)
+                if release_conn is not None:
+                    release_conn()
+
+
+def decompress_stream(src: IO[bytes], codec: str) -> IO[bytes]:
+    """Return a file object reading src decompressed with codec.  Closing it
+    closes src."""
+    check_codec(codec)
+    if codec == "gzip":
+        return _GzipReader(fileobj=src, mode="rb")
+    return _zstandard().ZstdDecompressor().stream_reader(src, read_size=CHUNK_SIZE, closefd=True)
+
+
+def compression_headers(codec: str) -> Dict[str, str]:
+    """Return the upload headers recording codec in the object's user metadata."""
+    return {f"X-Lakefs-Meta-{COMPRESSION_METADATA_KEY}": codec}
+
+
+def codec_from_metadata(metadata: Optional[Dict[str, str]]) -> Optional[str]:
+    """Return the codec recorded in object user metadata, or None if uncompressed."""
+    for key, value in (metadata or {}).items():
+        # lakeFS may change the case of metadata keys.
+        if key.lower() == COMPRESSION_METADATA_KEY.lower():
+            return value
+    return None
@@ -1,16 +1,109 @@
-from typing import Any, Dict, IO, Iterator
+import io
+import itertools
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from lakefs_provider import __version__
-
-import lakefs_sdk
-from lakefs_sdk import models
-from lakefs_sdk.client import LakeFSClient
-from lakefs_sdk.models.object_stats import ObjectStats
-from lakefs_sdk.models import Merge
+from lakefs_provider import __version__, tracing
 
 from airflow.exceptions import AirflowException
 from airflow.hooks.base import BaseHook
 
+# The generated lakeFS SDK is large.  Import it only when actually calling
+# lakeFS, so that parsing DAGs which merely use lakeFS operators stays cheap.
+if TYPE_CHECKING:
+    from lakefs_sdk.client import LakeFSClient
+    from lakefs_sdk.models.object_stats import ObjectStats
+
+    from lakefs_provider.hooks.writer import LakeFSWriter
+
+# Seconds to wait for lakeFS in test_connection if the connection sets no timeout.
+DEFAULT_TEST_CONNECTION_TIMEOUT = 30
+
+# Bytes read at a time when streaming lines.
+LINE_CHUNK_SIZE = 65536
+
+# Longest line kept when streaming lines, and most bytes read back by tail_lines.
+MAX_LINE_BYTES = 1024 * 1024
+MAX_TAIL_BYTES = 16 * 1024 * 1024
+
+
+def _iter_lines(reader: IO[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> Iterator[bytes]:
+    """Yield the lines of a byte stream, without their line endings.  Lines
+    longer than max_line_bytes are truncated to max_line_bytes, so that memory
+    stays bounded even on data without newlines."""
+    line = bytearray()
+    while True:
+        chunk = reader.read(LINE_CHUNK_SIZE)
+        if not chunk:
+            break
+        start = 0
+        while True:
+            end = chunk.find(b'\n', start)
+            stop = len(chunk) if end < 0 else end
+            line += chunk[start:min(stop, start + max(0, max_line_bytes - len(line)))]
+            if end < 0:
+                break
+            yield bytes(line).rstrip(b'\r')
+            line.clear()
+            start = end + 1
+    if line:
+        yield bytes(line).rstrip(b'\r')
+
+
+def _prefetched(iterator: Iterator[Any], depth: int) -> Iterator[Any]:
+    """Yield the items of iterator, consuming it in a background thread up to
+    depth items ahead.  Exceptions of iterator are raised to the consumer, and
+    its spans are children of the current span of the consumer."""
+    items: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+    trace_context = tracing.current_context()
+    stop = threading.Event()
+    done = object()
+
+    def put(item, error=None):
+        while not stop.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        with tracing.attached(trace_context):
+            try:
+                for item in iterator:
+                    if not put(item):
+                        return
+                put(done)
+            except Exception as e:  # pylint: disable=broad-except
+                put(done, e)
+
+    producer = threading.Thread(target=produce, name="lakefs-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Release a producer blocked on a full queue if the consumer stops early.
+        stop.set()
+
+
+# Results of LakeFSHook.check_health: {conn_id: (monotonic time, error or None)}.
+_health_probes: Dict[str, Tuple[float, Optional[str]]] = {}
+
 
 class LakeFSHook(BaseHook):
     """
@@ -19,6 +112,13 @@ class LakeFSHook(BaseHook):
     :param lakefs_conn_id: connection that has the uses the extra fields to extract the
         access_key_id, secret_access_key and lakeFS server endpoint.
     :type lakefs_conn_id: str
+
+    The connection extra 'endpoints' may list several lakeFS replicas.  Requests
+    are then balanced over them with the 'load_balancing' policy
+    (least_inflight or round_robin), see BalancedRESTClient.
+
+    The connection extras 'connect_timeout', 'read_timeout' and 'total_timeout'
+    (seconds) bound every request; without them requests wait indefinitely.
     """
     conn_name_attr = "lakefs_conn_id"
     client_id = f"lakefs-airflow-provider/{__version__}"
@@ -29,15 +129,64 @@ class LakeFSHook(BaseHook):
     def __init__(self, lakefs_conn_id: str) -> None:
         super().__init__()
         self.lakefs_conn_id = lakefs_conn_id
+        self._client = None
+        self._client_lock = threading.Lock()
 
     def get_base_url(self) -> str:
-        base = self.get_connection(self.lakefs_conn_id).host
+        conn = self.get_connection(self.lakefs_conn_id)
+        base = conn.host or next(iter(self.get_endpoints(conn)), None)
+        if not base:
+            raise AirflowException("lakeFS endpoint must be specified in the lakeFS connection details")
         if not (base.startswith('http://') or base.startswith('https://')):
             base = f"http://{base}"
         return base
 
-    def get_conn(self) -> LakeFSClient:
-        conn = self.get_connection(self.lakefs_conn_id)
+    def get_conn(self) -> "LakeFSClient":
+        """Return a lakeFS client, creating it on first use.
+
+        The client is reused for the lifetime of the hook, so consecutive calls
+        share its HTTP connection pool.  Threads sharing the hook, like the
+        workers of LakeFSWriter, create a single client."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @staticmethod
+    def get_endpoints(conn: Any) -> List[str]:
+        """Return the lakeFS endpoints of conn: the connection extra 'endpoints'
+        (a list or a comma-separated string of URLs), or else its host."""
+        endpoints = conn.extra_dejson.get("endpoints")
+        if isinstance(endpoints, str):
+            endpoints = endpoints.split(",")
+        endpoints = [e.strip() for e in endpoints or [] if e.strip()]
+        return endpoints or ([conn.host] if conn.host else [])
+
+    @staticmethod
+    def get_timeout(conn: Any) -> Union[float, Tuple[float, float], None]:
+        """Return the request timeout of conn from its connection extras
+        'connect_timeout', 'read_timeout' and 'total_timeout' (seconds): a
+        (connect, read) pair, each capped by the total, or else the total."""
+        extra = conn.extra_dejson
+        total = float(extra["total_timeout"]) if extra.get("total_timeout") else None
+        connect = float(extra["connect_timeout"]) if extra.get("connect_timeout") else None
+        read = float(extra["read_timeout"]) if extra.get("read_timeout") else None
+        if connect is None and read is None:
+            return total
+        return (min(filter(None, (connect, total)), default=None),
+                min(filter(None, (read, total)), default=None))
+
+    def _create_client(self) -> "LakeFSClient":
+        with tracing.span("connection_lookup", conn_id=self.lakefs_conn_id):
+            conn = self.get_connection(self.lakefs_conn_id)
+        with tracing.span("client_construction", conn_id=self.lakefs_conn_id):
+            return self._build_client(conn)
+
+    def _build_client(self, conn: Any) -> "LakeFSClient":
+        import lakefs_sdk
+        from lakefs_sdk.client import LakeFSClient
+
         configuration = lakefs_sdk.Configuration()
         if conn.conn_type == "http" and conn.extra_dejson.get("access_key_id") and conn.extra_dejson.get(
                 "secret_access_key"):
@@ -46,7 +195,10 @@ class LakeFSHook(BaseHook):
         else:
             configuration.username = conn.login
             configuration.password = conn.password
-        configuration.host = conn.host
+        # Keep a connection for each concurrent request of batch methods.
+        configuration.connection_pool_maxsize = int(conn.extra_dejson.get("max_connections", 16))
+        endpoints = self.get_endpoints(conn)
+        configuration.host = endpoints[0] if endpoints else None
         if not configuration.username:
             raise AirflowException("access_key_id must be specified in the lakeFS connection details")
         if not configuration.password:
@@ -54,8 +206,55 @@ class LakeFSHook(BaseHook):
         if not configuration.host:
             raise AirflowException("lakeFS endpoint must be specified in the lakeFS connection details")
 
-        return LakeFSClient(configuration,
-                            header_name='X-Lakefs-Client', header_value=self.client_id)
+        client = LakeFSClient(configuration,
+                              header_name='X-Lakefs-Client', header_value=self.client_id)
+        # LakeFSClient has no public way to replace the REST client of its API
+        # client, so setup.py keeps lakefs_sdk to the versions tested with this.
+        if len(endpoints) > 1:
+            from lakefs_provider.hooks.balancer import BalancedRESTClient
+
+            client._api.rest_client = BalancedRESTClient(
+                configuration, endpoints,
+                policy=conn.extra_dejson.get("load_balancing", "least_inflight"),
+                probe_interval=float(conn.extra_dejson.get("health_probe_interval", 10)))
+        timeout = self.get_timeout(conn)
+        if timeout:
+            from lakefs_provider.hooks.rest_clients import TimeoutRESTClient
+
+            client._api.rest_client = TimeoutRESTClient(client._api.rest_client, timeout)
+        if tracing.enabled():
+            from lakefs_provider.hooks.rest_clients import TracedRESTClient
+
+            client._api.rest_client = TracedRESTClient(client._api.rest_client)
+        return client
+
+    def check_health(self, max_age: float = 30, timeout: float = 5) -> Optional[str]:
+        """Probe the lakeFS health check, and return None if lakeFS is up or
+        the error if it is not.  Results are cached in the process for max_age
+        seconds, and the probe gives up after timeout seconds."""
+        now = time.monotonic()
+        cached = _health_probes.get(self.lakefs_conn_id)
+        if cached is not None and now - cached[0] < max_age:
+            return cached[1]
+        try:
+            self.get_conn().health_check_api.health_check(_request_timeout=timeout)
+            error = None
+        except Exception as e:  # pylint: disable=broad-except
+            error = f"{type(e).__name__}: {e}"
+        _health_probes[self.lakefs_conn_id] = (now, error)
+        return error
+
+    def ensure_healthy(self) -> None:
+        """Fail fast with AirflowException if lakeFS is down, instead of waiting
+        on requests to time out."""
+        error = self.check_health()
+        if error is not None:
+            raise AirflowException(f"lakeFS of connection {self.lakefs_conn_id} is unavailable: {error}")
+
+    def get_event_receiver_url(self) -> Optional[str]:
+        """Return the URL of the lakeFS event receiver set in the connection extra
+        'event_receiver_url', or None if webhook events are not configured."""
+        return self.get_connection(self.lakefs_conn_id).extra_dejson.get("event_receiver_url")
 
     @staticmethod
     def get_ui_field_behaviour():
@@ -66,14 +265,20 @@ class LakeFSHook(BaseHook):
             "placeholders": {},
         }
 
+    @tracing.traced("create_branch")
     def create_branch(self, repository: str, name: str, source_branch: str = 'main') -> str:
+        from lakefs_sdk import models
+
         client = self.get_conn()
         ref = client.branches_api.create_branch(
             repository=repository, branch_creation=models.BranchCreation(name=name,
                                                                          source=source_branch))
         return ref
 
+    @tracing.traced("commit")
     def commit(self, repo: str, branch: str, msg: str, metadata: Dict[str, Any] = None) -> str:
+        from lakefs_sdk import models
+
         client = self.get_conn()
         commit = client.commits_api.commit(
             repository=repo,
@@ -82,7 +287,34 @@ class LakeFSHook(BaseHook):
 
         return commit.id
 
-    def upload(self, repo: str, branch: str, path: str, content: bytes) -> str:
+    @tracing.traced("revert")
+    def revert(self, repo: str, branch: str, ref: str, parent_number: int = 0) -> None:
+        """Commit to branch the reverse of the changes of commit ref.  For a
+        merge commit, parent_number (1-based) selects the parent to diff with."""
+        from lakefs_sdk import models
+
+        client = self.get_conn()
+        client.branches_api.revert_branch(repository=repo, branch=branch,
+                                          revert_creation=models.RevertCreation(ref=ref, parent_number=parent_number))
+
+    @tracing.traced("reset_branch")
+    def reset_branch(self, repo: str, branch: str) -> None:
+        """Discard all uncommitted changes on branch."""
+        from lakefs_sdk import models
+
+        client = self.get_conn()
+        client.branches_api.reset_branch(repository=repo, branch=branch,
+                                         reset_creation=models.ResetCreation(type='reset'))
+
+    @tracing.traced("upload")
+    def upload(self, repo: str, branch: str, path: str, content: bytes, compression: Optional[str] = None) -> str:
+        """Upload content.  With compression (gzip or zstd) the content is
+        compressed as a stream and the codec is recorded in the object's user
+        metadata, for reads to detect."""
+        if compression:
+            # Like the SDK, treat a str content as the name of a file to read.
+            with open(content, 'rb') if isinstance(content, str) else io.BytesIO(content) as src:
+                return self._upload_compressed(repo, branch, path, src, compression)
         client = self.get_conn()
         upload = client.objects_api.upload_object(
             repository=repo,
@@ -92,8 +324,60 @@ class LakeFSHook(BaseHook):
 
         return upload.physical_address
 
+    @tracing.traced("upload")
+    def upload_file(self, repo: str, branch: str, path: str, local_path: str,
+                    compression: Optional[str] = None) -> str:
+        """Upload the contents of the file at local_path, compressed with
+        compression if set."""
+        if compression:
+            with open(local_path, 'rb') as src:
+                return self._upload_compressed(repo, branch, path, src, compression)
+        client = self.get_conn()
+        # The SDK treats a str content as the name of a file to read.
+        upload = client.objects_api.upload_object(
+            repository=repo,
+            branch=branch,
+            path=path,
+            content=str(local_path))
+
+        return upload.physical_address
+
+    def _upload_compressed(self, repo: str, branch: str, path: str, src: IO[bytes], codec: str) -> str:
+        from lakefs_provider.hooks.compression import compress_stream, compression_headers
+
+        with tempfile.NamedTemporaryFile(prefix='lakefs-upload-', delete=False) as compressed:
+            try:
+                compress_stream(src, compressed, codec)
+                compressed.close()
+                client = self.get_conn()
+                upload = client.objects_api.upload_object(
+                    repository=repo,
+                    branch=branch,
+                    path=path,
+                    content=compressed.name,
+                    _headers=compression_headers(codec))
+            finally:
+                os.unlink(compressed.name)
+
+        return upload.physical_address
+
+    def writer(self, repo: str, branch: str, **kwargs: Any) -> "LakeFSWriter":
+        """Return a LakeFSWriter uploading to branch in the background, for
+        tasks writing many objects.  kwargs are passed to LakeFSWriter."""
+        from lakefs_provider.hooks.writer import LakeFSWriter
+
+        return LakeFSWriter(self, repo, branch, **kwargs)
+
+    @tracing.traced("delete_object")
+    def delete_object(self, repo: str, branch: str, path: str) -> None:
+        client = self.get_conn()
+        client.objects_api.delete_object(repository=repo, branch=branch, path=path)
+
+    @tracing.traced("merge")
     def merge(self, repo: str, source_ref: str, destination_branch: str,
               msg: str, metadata: Dict[str, Any] = None) -> str:
+        from lakefs_sdk.models import Merge
+
         client = self.get_conn()
         merge_result = client.refs_api.merge_into_branch(
             repository=repo,
@@ -103,11 +387,51 @@ class LakeFSHook(BaseHook):
 
         return merge_result.reference
 
+    def list_branches(self, repo: str, prefix: str = '', size: int = 1000) -> Iterator[Dict[str, str]]:
+        """Yield branches of repo with names starting with prefix, as {id,
+        commit_id}.  Fetch size branches at a time."""
+        client = self.get_conn()
+        after = ''
+        while True:
+            response = client.branches_api.list_branches(repo, prefix=prefix, after=after, amount=size)
+            for branch in response.results:
+                yield branch.to_dict()
+            if response.pagination is None or not response.pagination.has_more:
+                return
+            after = response.pagination.next_offset
+
+    def diff_branch(self, repo: str, branch: str, prefix: str = '', size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield the uncommitted changes on branch under prefix, in path order.
+        Fetch size changes at a time."""
+        client = self.get_conn()
+        after = ''
+        while True:
+            response = client.branches_api.diff_branch(repository=repo, branch=branch, prefix=prefix,
+                                                       after=after, amount=size)
+            for diff in response.results:
+                yield diff.to_dict()
+            if response.pagination is None or not response.pagination.has_more:
+                return
+            after = response.pagination.next_offset
+
+    @tracing.traced("has_uncommitted_changes")
+    def has_uncommitted_changes(self, repo: str, branch: str) -> bool:
+        """Return whether branch has any uncommitted change, in one request."""
+        return next(self.diff_branch(repo, branch, size=1), None) is not None
+
+    @tracing.traced("find_merge_base")
+    def find_merge_base(self, repo: str, source_ref: str, destination_branch: str) -> str:
+        """Return the ID of the merge base commit of source_ref and destination_branch."""
+        client = self.get_conn()
+        return client.refs_api.find_merge_base(repo, source_ref, destination_branch).base_commit_id
+
+    @tracing.traced("get_branch")
     def get_branch_commit_id(self, repo: str, name: str) -> str:
         client = self.get_conn()
         ref = client.branches_api.get_branch(repo, name)
         return ref.commit_id
 
+    @tracing.traced("get_commit")
     def get_commit(self, repo: str, ref: str) -> Dict[str, str]:
         client = self.get_conn()
         commit = client.commits_api.get_commit(repo, ref)
@@ -126,15 +450,273 @@ class LakeFSHook(BaseHook):
                 return
             after = response.pagination.next_offset
 
-    def stat_object(self, repo: str, ref: str, path: str) -> ObjectStats:
+    def log_commit_pages(self, repo: str, ref: str, size: int = 1000, first_parent: bool = False,
+                         prefetch: int = 2) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of up to size commits of repo backwards from ref, as plain
+        dicts parsed straight from the response without building SDK models.
+        A background thread fetches up to prefetch pages ahead of the consumer,
+        so memory stays bounded by (prefetch + 2) pages.  first_parent follows
+        only the first parent of merge commits."""
+        from urllib.parse import quote
+
+        resource_path = f"/repositories/{quote(repo, safe='')}/refs/{quote(ref, safe='')}/commits"
+
+        def pages():
+            after = ''
+            while True:
+                with tracing.span("log_commits", repo=repo, ref=ref):
+                    response = json.loads(self._get_raw(resource_path, [
+                        ('after', after), ('amount', size), ('first_parent', str(first_parent).lower())]).data)
+                yield response['results']
+                pagination = response.get('pagination')
+                if not pagination or not pagination.get('has_more'):
+                    return
+                after = pagination['next_offset']
+
+        return _prefetched(pages(), prefetch)
+
+    @tracing.traced("stat_object")
+    def stat_object(self, repo: str, ref: str, path: str) -> "ObjectStats":
         client = self.get_conn()
         response = client.objects_api.stat_object(repository=repo, ref=ref, path=path)
         return response.to_dict()
 
-    def get_object(self, repo: str, ref: str, path: str) -> IO:
+    @tracing.traced("stat_objects")
+    def stat_objects(self, repo: str, ref: str, paths: Iterable[str], max_workers: int = 16,
+                     cluster_size: int = 16) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return {path: stats, or None if missing} for many paths on ref.
+
+        Paths are grouped by directory.  Directories with at least cluster_size
+        requested paths are answered from listings, which return up to 1000
+        stats per request; other paths are stat'ed concurrently.  A listing
+        uses at most one page per cluster_size paths, the paths past where it
+        stopped are stat'ed too, so it never costs many more requests than
+        stat'ing each path."""
+        from lakefs_sdk.exceptions import NotFoundException
+
+        paths = list(paths)
+        client = self.get_conn()
+        directories = defaultdict(list)
+        for path in set(paths):
+            directories[path[:path.rfind('/') + 1]].append(path)
+
+        def list_directory(directory, wanted):
+            wanted = sorted(wanted)
+            found = dict.fromkeys(wanted)
+            # Listing is exclusive of after: start just before the first path.
+            after = wanted[0][:-1]
+            for _ in range(-(-len(wanted) // cluster_size)):
+                response = client.objects_api.list_objects(repository=repo, ref=ref, prefix=directory,
+                                                           delimiter='/', after=after, amount=1000)
+                for stats in response.results:
+                    if stats.path in found:
+                        found[stats.path] = stats.to_dict()
+                if (response.pagination is None or not response.pagination.has_more
+                        or response.pagination.next_offset >= wanted[-1]):
+                    return found, []
+                after = response.pagination.next_offset
+            unlisted = [path for path in wanted if path > after]
+            for path in unlisted:
+                del found[path]
+            return found, unlisted
+
+        def stat(path):
+            try:
+                return client.objects_api.stat_object(repository=repo, ref=ref, path=path).to_dict()
+            except NotFoundException:
+                return None
+
+        result = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            listings = [executor.submit(list_directory, directory, wanted)
+                        for directory, wanted in directories.items() if len(wanted) >= cluster_size]
+            sparse = [path for wanted in directories.values() if len(wanted) < cluster_size for path in wanted]
+            for listing in listings:
+                found, unlisted = listing.result()
+                result.update(found)
+                sparse.extend(unlisted)
+            result.update(zip(sparse, executor.map(stat, sparse)))
+        return {path: result[path] for path in paths}
+
+    @tracing.traced("get_object")
+    def get_object(self, repo: str, ref: str, path: str, compression: Optional[str] = None) -> IO:
+        """Return the contents of an object.  compression 'auto' decompresses
+        objects uploaded with compression, and a codec name always decompresses
+        with that codec."""
+        if compression:
+            with self.open_object(repo, ref, path, compression) as reader:
+                return reader.read()
         client = self.get_conn()
         return client.objects_api.get_object(repository=repo, ref=ref, path=path)
 
+    @tracing.traced("open_object")
+    def open_object(self, repo: str, ref: str, path: str, compression: Optional[str] = 'auto') -> IO[bytes]:
+        """Return a file object streaming the contents of an object, without
+        reading it all into memory.  compression 'auto' decompresses objects
+        uploaded with compression, a codec name always decompresses with that
+        codec, and None reads the stored bytes."""
+        from urllib.parse import quote
+
+        from lakefs_provider.hooks.compression import codec_from_metadata, decompress_stream
+
+        if compression == 'auto':
+            compression = codec_from_metadata(self.stat_object(repo, ref, path).get('metadata'))
+        # The generated SDK always reads whole responses, so stream the raw response.
+        response = self._get_raw(f"/repositories/{quote(repo, safe='')}/refs/{quote(ref, safe='')}/objects",
+                                 [('path', path)])
+        return decompress_stream(response, compression) if compression else response
+
+    def _get_raw(self, resource_path: str, query: List[Tuple[str, Any]]) -> Any:
+        """Send a GET request on the REST client of the SDK and return the
+        unread urllib3 response, skipping deserialization into SDK models.
+        The public SDK methods read the whole response even without preloading
+        content, so this uses the API client of the SDK as the generated
+        methods do, for the lakefs_sdk versions pinned in setup.py."""
+        api = self.get_conn()._api
+        headers = dict(api.default_headers)
+        query = list(query)
+        api.update_params_for_auth(headers=headers, queries=query,
+                                   auth_settings=['basic_auth', 'cookie_auth', 'oidc_auth', 'saml_auth', 'jwt_token'],
+                                   resource_path=resource_path, method='GET', body=None)
+        return api.rest_client.request(
+            'GET', f"{api.configuration.host}{resource_path}?{api.parameters_to_url_query(query, {})}",
+            headers=headers, _preload_content=False)
+
+    @tracing.traced("read_range")
+    def read_range(self, repo: str, ref: str, path: str, start: int, end: Optional[int] = None) -> bytes:
+        """Return bytes [start, end) of an object.  If end is None read to the end
+        of the object.  A negative start reads the last -start bytes (end must
+        be None)."""
+        client = self.get_conn()
+        if start < 0:
+            if end is not None:
+                raise AirflowException("Cannot read a range with a negative start and an end")
+            return client.objects_api.get_object(repository=repo, ref=ref, path=path, range=f"bytes={start}")
+        last = '' if end is None else str(end - 1)
+        return client.objects_api.get_object(repository=repo, ref=ref, path=path,
+                                             range=f"bytes={start}-{last}")
+
+    @tracing.traced("head_lines")
+    def head_lines(self, repo: str, ref: str, path: str, n: int, compression: Optional[str] = None,
+                   encoding: str = 'utf-8', max_line_bytes: int = MAX_LINE_BYTES) -> List[str]:
+        """Return the first n lines of an object.  Streams the object and stops
+        reading after line n.  compression is as for open_object; lines are
+        truncated to max_line_bytes."""
+        lines = []
+        if n > 0:
+            with self.open_object(repo, ref, path, compression) as reader:
+                for line in _iter_lines(reader, max_line_bytes):
+                    lines.append(line.decode(encoding, 'replace'))
+                    if len(lines) == n:
+                        break
+        return lines
+
+    @tracing.traced("tail_lines")
+    def tail_lines(self, repo: str, ref: str, path: str, n: int, chunk_size: int = 65536,
+                   encoding: str = 'utf-8', max_bytes: int = MAX_TAIL_BYTES) -> List[str]:
+        """Return the last n lines of an object, reading it backwards in ranges
+        of chunk_size bytes until they hold n lines.  Reads at most the last
+        max_bytes of the object, and then returns only the complete lines in
+        them."""
+        if n <= 0:
+            return []
+        end = self.stat_object(repo, ref, path)['size_bytes']
+        limit = max(0, end - max_bytes)
+        chunks: List[bytes] = []
+        newlines = 0
+        while end > limit:
+            start = max(limit, end - chunk_size)
+            chunk = self.read_range(repo, ref, path, start, end)
+            # A newline ending the object does not start another line.
+            newlines += chunk.count(b'\n', 0, len(chunk) if chunks else len(chunk) - 1)
+            chunks.append(chunk)
+            end = start
+            if newlines >= n:
+                break
+        data = b''.join(reversed(chunks))
+        if end > 0 and newlines < n:
+            self.log.warning("Read the last %d bytes of object '%s' on ref '%s' in repo '%s', "
+                             "they hold only %d of %d lines", max_bytes, path, ref, repo, newlines, n)
+            # The first line started before the bytes read.
+            data = data[data.find(b'\n') + 1:] if b'\n' in data else b''
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        return [line.rstrip(b'\r').decode(encoding, 'replace') for line in data.split(b'\n')[-n:]] if data else []
+
+    @tracing.traced("sample_lines")
+    def sample_lines(self, repo: str, ref: str, path: str, k: int, skip_lines: int = 0,
+                     compression: Optional[str] = None, encoding: str = 'utf-8',
+                     seed: Optional[int] = None, max_line_bytes: int = MAX_LINE_BYTES) -> List[str]:
+        """Return k lines of an object sampled uniformly at random, in their
+        order in the object.  Streams the whole object through a reservoir of
+        k lines, so memory does not grow with its size.  skip_lines skips
+        leading lines (such as a CSV header) from sampling; lines are truncated
+        to max_line_bytes."""
+        rng = random.Random(seed)
+        reservoir: List[Tuple[int, bytes]] = []
+        with self.open_object(repo, ref, path, compression) as reader:
+            for i, line in enumerate(itertools.islice(_iter_lines(reader, max_line_bytes), skip_lines, None)):
+                if i < k:
+                    reservoir.append((i, line))
+                else:
+                    j = rng.randint(0, i)
+                    if j < k:
+                        reservoir[j] = (i, line)
+        return [line.decode(encoding, 'replace') for _, line in sorted(reservoir)]
+
+    def list_objects(self, repo: str, ref: str, prefix: str = '', delimiter: str = '',
+                     size: int = 1000, after: str = '', presign: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield stats of objects under prefix on ref, in lexicographical order,
+        starting after path after.  Fetch size objects at a time.  When
+        delimiter is set, also yield common prefixes (with path_type
+        'common_prefix') instead of recursing into them.  With presign, the
+        physical_address of each object is a presigned URL of the object store,
+        valid until physical_address_expiry."""
+        client = self.get_conn()
+        while True:
+            response = client.objects_api.list_objects(repository=repo, ref=ref, prefix=prefix,
+                                                       delimiter=delimiter, after=after, amount=size,
+                                                       presign=presign or None)
+            for stats in response.results:
+                yield stats.to_dict()
+            if response.pagination is None or not response.pagination.has_more:
+                return
+            after = response.pagination.next_offset
+
+    @tracing.traced("read_parquet")
+    def read_parquet(self, repo: str, ref: str, prefix: str, columns: Optional[Sequence[str]] = None,
+                     filters: Optional[List[Any]] = None, suffix: str = '.parquet',
+                     max_workers: int = 8) -> Any:
+        """Read the Parquet files under prefix on ref into a single Arrow table.
+
+        Files are read in parallel through ranged GETs: only each file's footer
+        and the chunks of the requested columns are fetched, and row groups
+        whose statistics do not match filters (in pyarrow DNF form, e.g.
+        [('year', '>=', 2023)]) are skipped.  Requires pyarrow and fsspec."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            from lakefs_provider.fs.lakefs_fs import LakeFSFileSystem
+        except ImportError as e:
+            raise AirflowException(
+                "read_parquet requires pyarrow and fsspec, install airflow-provider-lakefs[parquet]") from e
+
+        paths = [f"{repo}/{ref}/{stats['path']}" for stats in self.list_objects(repo, ref, prefix=prefix)
+                 if stats['path'].endswith(suffix)]
+        if not paths:
+            raise AirflowException(f"No {suffix} files under '{prefix}' on ref '{ref}' in repo '{repo}'")
+
+        # No block cache: pyarrow coalesces its own column chunk reads.
+        fs = LakeFSFileSystem(hook=self, default_cache_type="none", skip_instance_cache=True)
+
+        def read(path):
+            return pq.read_table(path, filesystem=fs, columns=columns, filters=filters, pre_buffer=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tables = list(executor.map(read, paths))
+        return pa.concat_tables(tables)
+
+    @tracing.traced("create_symlink_file")
     def create_symlink_file(self, repo: str, branch: str, location: str = None) -> str:
         client = self.get_conn()
 
@@ -145,6 +727,7 @@ class LakeFSHook(BaseHook):
         response = client.internal_api.create_symlink_file(repository=repo, branch=branch, **kwargs)
         return response.location
 
+    @tracing.traced("delete_branch")
     def delete_branch(self, repo: str, branch: str) -> str:
         client = self.get_conn()
         return client.branches_api.delete_branch(repository=repo, branch=branch)
@@ -154,7 +737,7 @@ class LakeFSHook(BaseHook):
         conn = self.get_connection(self.lakefs_conn_id)
         import requests
         import json
-        url = conn.host + "/api/v1/auth/login"
+        url = self.get_base_url() + "/api/v1/auth/login"
         if conn.conn_type == "http" and conn.extra_dejson.get("access_key_id") and conn.extra_dejson.get(
                 "secret_access_key"):
             login = conn.extra_dejson.get("access_key_id")
@@ -167,7 +750,8 @@ class LakeFSHook(BaseHook):
             "access_key_id": login,
             "secret_access_key": password})
         headers = {'Content-Type': 'application/json'}
-        response = requests.request("POST", url, headers=headers, data=payload)
+        response = requests.request("POST", url, headers=headers, data=payload,
+                                    timeout=self.get_timeout(conn) or DEFAULT_TEST_CONNECTION_TIMEOUT)
         try:
             response.raise_for_status()
             return True, "Connection Tested Successfully"
@@ -0,0 +1,44 @@
+from typing import Any, Tuple, Union
+
+from lakefs_sdk.rest import RESTClientObject
+
+from lakefs_provider.tracing import inject_trace_headers
+
+
+class _WrappedRESTClient(RESTClientObject):
+    """Wraps a lakeFS SDK REST client to adjust each request."""
+
+    def __init__(self, rest_client: RESTClientObject) -> None:  # pylint: disable=super-init-not-called
+        self.rest_client = rest_client
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        return self.rest_client.request(method, url, *args, **kwargs)
+
+
+class TracedRESTClient(_WrappedRESTClient):
+    """
+    Wraps a lakeFS SDK REST client to send the trace context of the current
+    span with each request, for lakeFS to continue the trace.
+    """
+
+    def request(self, method: str, url: str, *args: Any, headers: Any = None, **kwargs: Any) -> Any:
+        headers = dict(headers or {})
+        inject_trace_headers(headers)
+        return self.rest_client.request(method, url, *args, headers=headers, **kwargs)
+
+
+class TimeoutRESTClient(_WrappedRESTClient):
+    """
+    Wraps a lakeFS SDK REST client to apply a default timeout to requests
+    that set none.
+
+    :param timeout: Total seconds, or a (connect, read) seconds pair.
+    """
+
+    def __init__(self, rest_client: RESTClientObject, timeout: Union[float, Tuple[float, float]]) -> None:
+        super().__init__(rest_client)
+        self.timeout = timeout
+
+    def request(self, method: str, url: str, *args: Any, _request_timeout: Any = None, **kwargs: Any) -> Any:
+        return self.rest_client.request(method, url, *args, _request_timeout=_request_timeout or self.timeout,
+                                        **kwargs)
@@ -0,0 +1,124 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from airflow.exceptions import AirflowException
+
+log = logging.getLogger(__name__)
+
+
+class LakeFSWriter:
+    """
+    Write-behind buffer for uploading many objects to a lakeFS branch from a
+    Python task.  write() and write_file() return as soon as the upload is
+    queued, and a pool of threads uploads in the background, so the task keeps
+    computing while earlier outputs are uploaded.
+
+    At most max_pending uploads are queued or running: when the queue is full,
+    writes block until an upload completes.  flush() waits for all queued
+    uploads and raises the error of the first failed write, in write order;
+    uploads after a failure still run.  Leaving the context flushes, then
+    commits the branch if commit_message is set.  Leaving it on an exception
+    cancels queued uploads, waits for running ones and does not commit.
+
+        with LakeFSWriter(hook, 'repo', 'branch', commit_message='Add outputs') as writer:
+            for i, part in enumerate(compute()):
+                writer.write(f'outputs/{i}.json', part)
+
+    :param hook: The hook to upload with.
+    :type hook: LakeFSHook
+    :param repo: The lakeFS repo to upload to.
+    :type repo: str
+    :param branch: The branch to upload to.
+    :type branch: str
+    :param max_workers: Number of concurrent uploads.
+    :type max_workers: int
+    :param max_pending: Number of queued or running uploads before writes block.
+    :type max_pending: int
+    :param commit_message: Commit the branch with this message on exit.
+    :type commit_message: str
+    :param commit_metadata: Metadata of the commit on exit.
+    :type commit_metadata: Dict[str, str]
+    :param compression: Compress uploads with this codec, see LakeFSHook.upload.
+    :type compression: str
+    """
+
+    def __init__(self, hook: Any, repo: str, branch: str, max_workers: int = 8, max_pending: int = 64,
+                 commit_message: Optional[str] = None, commit_metadata: Optional[Dict[str, str]] = None,
+                 compression: Optional[str] = None) -> None:
+        self.hook = hook
+        self.repo = repo
+        self.branch = branch
+        self.commit_message = commit_message
+        self.commit_metadata = commit_metadata
+        self.compression = compression
+        self.commit_id: Optional[str] = None
+        self.uploaded = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lakefs-writer')
+        self._pending: List[Tuple[str, Future]] = []
+        self._closed = False
+
+    def write(self, path: str, content: bytes) -> None:
+        """Queue an upload of content to path, blocking while the queue is full."""
+        self._submit(path, self.hook.upload, bytes(content))
+
+    def write_file(self, path: str, local_path: str) -> None:
+        """Queue an upload of the file at local_path to path, blocking while
+        the queue is full.  The file must not change until flush()."""
+        self._submit(path, self.hook.upload_file, local_path)
+
+    def _submit(self, path: str, upload: Any, source: Any) -> None:
+        if self._closed:
+            raise AirflowException("LakeFSWriter is closed")
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(upload, self.repo, self.branch, path, source,
+                                           compression=self.compression)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._pending.append((path, future))
+
+    def flush(self) -> int:
+        """Wait for all queued uploads.  Return how many were uploaded, or raise
+        the error of the first failed write."""
+        pending, self._pending = self._pending, []
+        failed = [(path, future.exception()) for path, future in pending if future.exception() is not None]
+        uploaded = len(pending) - len(failed)
+        self.uploaded += uploaded
+        if failed:
+            path, error = failed[0]
+            raise AirflowException(f"Failed to upload {len(failed)} of {len(pending)} objects to branch "
+                                   f"'{self.branch}' in repo '{self.repo}', first '{path}': {error}") from error
+        return uploaded
+
+    def close(self) -> None:
+        """Flush and stop the upload threads."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "LakeFSWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            # Do not commit a partial output, nor hide the error with an upload error.
+            self._closed = True
+            for _, future in self._pending:
+                future.cancel()
+            self._pending = []
+            self._executor.shutdown(wait=True)
+            return
+        self.close()
+        log.info("Uploaded %d objects to branch '%s' in repo '%s'", self.uploaded, self.branch, self.repo)
+        if self.commit_message is not None:
+            self.commit_id = self.hook.commit(self.repo, self.branch, self.commit_message,
+                                              dict(self.commit_metadata or {}))
@@ -5,6 +5,8 @@ from airflow.utils.context import Context
 
 import logging
 
+from lakefs_provider import tracing
+
 log = logging.getLogger(__name__)
 
 LAKEFS_COMMIT_LINK = "{base_url}/repositories/{repo}/commits/{commit_digest}"
@@ -33,7 +35,8 @@ class LakeFSLink(BaseOperatorLink):
     ):
         value = {'base_url': lakefs_base_url, 'repo': repo, 'commit_digest': commit_digest}
         log.info(f"Persist lakeFS commit data {value}")
-        task_instance.xcom_push(context, key=LakeFSLink.key, value=value)
+        with tracing.span("link_persist", repo=repo, commit_id=commit_digest):
+            task_instance.xcom_push(context, key=LakeFSLink.key, value=value)
 
 
 LakeFSLink.operators = ["lakefs_provider.operators.commit_operator.LakeFSCommitOperator",
@@ -0,0 +1,191 @@
+"""Manifests of the objects under a prefix at a lakeFS commit.
+
+A manifest holds one (path, size_bytes, checksum, mtime) entry per object,
+sorted by path as lakeFS lists them.  Entries are written and read as
+streams, and diff_manifests merge-joins two manifests into adds, removes and
+modifies, so neither manifest is ever held in memory.
+
+Two formats are supported: a compact binary format (no dependencies, reads
+from any stream) and Parquet (requires pyarrow, reads from seekable files).
+
+Manifest operators write to a local path or to lakefs://<repo>/<branch>/<path>,
+through open_manifest_output.
+"""
+import contextlib
+import os
+import shutil
+import struct
+import tempfile
+from typing import IO, TYPE_CHECKING, Any, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from airflow.exceptions import AirflowException
+
+if TYPE_CHECKING:
+    from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+MANIFEST_FORMATS = ("binary", "parquet")
+
+BINARY_MAGIC = b"LKFSMAN1"
+PARQUET_MAGIC = b"PAR1"
+
+# Record: path length, path, size, checksum length, checksum, mtime.
+_LENGTH = struct.Struct("<I")
+_NUMBERS = struct.Struct("<qq")
+
+PARQUET_BATCH_ROWS = 65536
+
+
+class ManifestEntry(NamedTuple):
+    path: str
+    size_bytes: int
+    checksum: str
+    mtime: int
+
+
+def split_lakefs_uri(uri: str) -> Optional[Tuple[str, str, str]]:
+    """Return (repo, branch, path) of a lakefs://<repo>/<branch>/<path> URI, or
+    None if uri is not a lakefs:// URI."""
+    if not uri.startswith("lakefs://"):
+        return None
+    repo, branch, path = (uri[len("lakefs://"):].split("/", 2) + ["", ""])[:3]
+    if not (repo and branch and path):
+        raise AirflowException(f"Manifest destination {uri} is not lakefs://<repo>/<branch>/<path>")
+    return repo, branch, path
+
+
+@contextlib.contextmanager
+def open_manifest_output(hook: "LakeFSHook", destination: str, mode: str = "wb",
+                         **kwargs: Any) -> Iterator[IO]:
+    """Open a temporary file to write a manifest to, and publish it to
+    destination if the block succeeds: upload it (uncommitted) to a lakefs://
+    destination, or atomically replace a local destination, so that readers
+    never see a partial manifest.  kwargs are passed to NamedTemporaryFile."""
+    upload_to = split_lakefs_uri(destination)
+    directory = None if upload_to else os.path.dirname(os.path.abspath(destination))
+    with tempfile.NamedTemporaryFile(mode, dir=directory, prefix=".lakefs-manifest-", delete=False,
+                                     **kwargs) as out:
+        try:
+            yield out
+            out.close()
+            if upload_to:
+                hook.upload_file(*upload_to, out.name)
+            else:
+                # Temporary files are private, give the manifest the mode of the file it replaces.
+                if os.path.exists(destination):
+                    shutil.copymode(destination, out.name)
+                else:
+                    os.chmod(out.name, 0o644)
+                os.replace(out.name, destination)
+        finally:
+            if os.path.exists(out.name):
+                os.unlink(out.name)
+
+
+def _pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise AirflowException(
+            "Parquet manifests require pyarrow, install airflow-provider-lakefs[parquet]") from e
+    return pa, pq
+
+
+def write_manifest(entries: Iterable[ManifestEntry], out: IO[bytes], manifest_format: str = "binary") -> int:
+    """Write entries, sorted by path, to out.  Returns the number of entries."""
+    if manifest_format == "binary":
+        return _write_binary(entries, out)
+    if manifest_format == "parquet":
+        return _write_parquet(entries, out)
+    raise AirflowException(f"Unknown manifest format {manifest_format}, use one of {MANIFEST_FORMATS}")
+
+
+def _write_binary(entries: Iterable[ManifestEntry], out: IO[bytes]) -> int:
+    out.write(BINARY_MAGIC)
+    count = 0
+    for entry in entries:
+        path = entry.path.encode("utf-8")
+        checksum = entry.checksum.encode("utf-8")
+        out.write(b"".join((_LENGTH.pack(len(path)), path, _LENGTH.pack(len(checksum)), checksum,
+                            _NUMBERS.pack(entry.size_bytes, entry.mtime))))
+        count += 1
+    return count
+
+
+def _write_parquet(entries: Iterable[ManifestEntry], out: IO[bytes]) -> int:
+    pa, pq = _pyarrow()
+    schema = pa.schema([("path", pa.string()), ("size_bytes", pa.int64()), ("checksum", pa.string()),
+                        ("mtime", pa.int64())])
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) == PARQUET_BATCH_ROWS:
+                writer.write_batch(pa.RecordBatch.from_arrays([pa.array(column) for column in zip(*batch)],
+                                                              schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_arrays([pa.array(column) for column in zip(*batch)],
+                                                          schema=schema))
+            count += len(batch)
+    return count
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size) if size else b""
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            raise AirflowException("Truncated lakeFS manifest")
+        data += more
+    return data
+
+
+def read_manifest(stream: IO[bytes]) -> Iterator[ManifestEntry]:
+    """Yield the entries of a manifest in either format, detected from its
+    first bytes.  Parquet manifests must be seekable files."""
+    head = _read_exactly(stream, len(PARQUET_MAGIC))
+    if head == PARQUET_MAGIC:
+        _, pq = _pyarrow()
+        stream.seek(0)
+        for batch in pq.ParquetFile(stream).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+            yield from (ManifestEntry(*row) for row in zip(*(column.to_pylist() for column in batch.columns)))
+        return
+    if head + _read_exactly(stream, len(BINARY_MAGIC) - len(head)) != BINARY_MAGIC:
+        raise AirflowException("Not a lakeFS manifest")
+    while True:
+        length = stream.read(_LENGTH.size)
+        if not length:
+            return
+        length += _read_exactly(stream, _LENGTH.size - len(length))
+        path = _read_exactly(stream, _LENGTH.unpack(length)[0]).decode("utf-8")
+        checksum = _read_exactly(stream, _LENGTH.unpack(_read_exactly(stream, _LENGTH.size))[0]).decode("utf-8")
+        size_bytes, mtime = _NUMBERS.unpack(_read_exactly(stream, _NUMBERS.size))
+        yield ManifestEntry(path, size_bytes, checksum, mtime)
+
+
+class ManifestChange(NamedTuple):
+    change: str  # added, removed or modified
+    path: str
+    old: Optional[ManifestEntry]
+    new: Optional[ManifestEntry]
+
+
+def diff_manifests(old: Iterable[ManifestEntry], new: Iterable[ManifestEntry]) -> Iterator[ManifestChange]:
+    """Merge-join two path-sorted manifests, yielding the changes from old to
+    new in path order.  An object is modified if its size or checksum changed."""
+    old, new = iter(old), iter(new)
+    o, n = next(old, None), next(new, None)
+    while o is not None or n is not None:
+        if n is None or (o is not None and o.path < n.path):
+            yield ManifestChange("removed", o.path, o, None)
+            o = next(old, None)
+        elif o is None or n.path < o.path:
+            yield ManifestChange("added", n.path, None, n)
+            n = next(new, None)
+        else:
+            if o.checksum != n.checksum or o.size_bytes != n.size_bytes:
+                yield ManifestChange("modified", n.path, o, n)
+            o, n = next(old, None), next(new, None)
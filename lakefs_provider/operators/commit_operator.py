@@ -1,13 +1,23 @@
-from typing import Any, Dict
+import json
+from collections import Counter
+from typing import Any, Dict, Tuple
 
+from airflow.exceptions import AirflowException, AirflowSkipException
 from airflow.utils.decorators import apply_defaults
 
+from lakefs_provider.datasets.lakefs_dataset import declare_lakefs_outlet, set_dataset_commit
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
 from lakefs_provider.links.lakefs_link import LakeFSLink
 from lakefs_provider.operators.with_metadata_operator import WithLakeFSMetadataOperator
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
+ON_EMPTY = ('commit', 'skip', 'head')
 
-class LakeFSCommitOperator(WithLakeFSMetadataOperator):
+# Most prefixes counted in the diff summary of the commit metadata.
+MAX_SUMMARY_PREFIXES = 50
+
+
+class LakeFSCommitOperator(LakeFSProfilingMixin, WithLakeFSMetadataOperator):
     """
     Commit changes to a lakeFS branch.
 
@@ -21,6 +31,23 @@ class LakeFSCommitOperator(WithLakeFSMetadataOperator):
     :type msg: str
     :param metadata: Additional metadata to the commit.
     :type metadata: Dict[str, str]
+    :param emit_dataset: Declare the Airflow Dataset lakefs://<repo>/<branch> as an outlet and
+        emit it with the commit ID on success (Airflow 2.4+).
+    :type emit_dataset: bool
+    :param dataset_prefix: Path prefix to add to the Dataset URI.
+    :type dataset_prefix: str
+    :param on_empty: What to do when the branch has no uncommitted changes:
+        'commit' always commits (lakeFS may reject the empty commit), 'skip'
+        marks the task skipped and 'head' returns the current head commit ID
+        without committing.  'head' cannot be used with emit_dataset, as the
+        task would emit its Dataset without a new commit: use 'skip', which
+        emits no Dataset event.  Other than 'commit', the uncommitted changes are
+        listed first, and their counts by change type and by prefix are added
+        to the commit metadata.
+    :type on_empty: str
+    :param summary_depth: Number of path components of the prefixes counted in
+        the diff summary.
+    :type summary_depth: int
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -36,25 +63,70 @@ class LakeFSCommitOperator(WithLakeFSMetadataOperator):
     operator_extra_links = [LakeFSLink()]
 
     @apply_defaults
-    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, msg: str, metadata: Dict[str, str] = None, **kwargs: Any) -> None:
+    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, msg: str, metadata: Dict[str, str] = None,
+                 emit_dataset: bool = False, dataset_prefix: str = None, on_empty: str = 'commit',
+                 summary_depth: int = 1, **kwargs: Any) -> None:
         super().__init__(**kwargs)
+        if on_empty not in ON_EMPTY:
+            raise AirflowException(f"Unknown on_empty {on_empty}, use one of {ON_EMPTY}")
+        if on_empty == 'head' and emit_dataset:
+            raise AirflowException("on_empty='head' would emit the Dataset without a commit, "
+                                   "use on_empty='skip' with emit_dataset")
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
         self.branch = branch
         self.msg = msg
         self.metadata = metadata
+        self._dataset = declare_lakefs_outlet(self, repo, branch, dataset_prefix) if emit_dataset else None
+        self.on_empty = on_empty
+        self.summary_depth = summary_depth
+
+    def summarize_diff(self, hook: LakeFSHook) -> Tuple[Counter, Counter]:
+        """Stream the uncommitted changes of the branch, and return their counts
+        by change type and by prefix."""
+        by_type, by_prefix = Counter(), Counter()
+        for diff in hook.diff_branch(self.repo, self.branch):
+            by_type[diff['type']] += 1
+            parts = diff['path'].split('/')
+            by_prefix['/'.join(parts[:self.summary_depth]) + '/' if len(parts) > self.summary_depth else ''] += 1
+        return by_type, by_prefix
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+
+        summary = None
+        if self.on_empty != 'commit':
+            by_type, by_prefix = self.summarize_diff(hook)
+            if not by_type:
+                self.log.info("No uncommitted changes on lakeFS branch '%s' in repo '%s'",
+                              self.branch, self.repo)
+                if self.on_empty == 'skip':
+                    raise AirflowSkipException(f"Nothing to commit on branch '{self.branch}'")
+                ref = hook.get_branch_commit_id(self.repo, self.branch)
+                LakeFSLink.persist(context,
+                                   task_instance=self,
+                                   lakefs_base_url=hook.get_base_url(),
+                                   repo=self.repo,
+                                   commit_digest=ref)
+                return ref
+            summary = {'changes': dict(by_type), 'prefixes': dict(by_prefix.most_common(MAX_SUMMARY_PREFIXES))}
+            self.log.info("Uncommitted changes: %s", summary['changes'])
 
         self.log.info("Committing to lakeFS branch '%s' in repo '%s'",
                       self.branch, self.repo)
 
         self.metadata["airflow_task_id"] = self.task_id
+        if summary is not None:
+            self.metadata[self._metadata_key("diff_summary")] = json.dumps(summary, sort_keys=True)
 
         self.enrich_metadata(context)
 
         ref = hook.commit(self.repo, self.branch, self.msg, self.metadata)
+        if self._dataset is not None:
+            set_dataset_commit(context, self._dataset, ref)
+
         LakeFSLink.persist(context,
                            task_instance=self,
                            lakefs_base_url=hook.get_base_url(),
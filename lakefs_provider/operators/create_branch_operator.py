@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSCreateBranchOperator(BaseOperator):
+class LakeFSCreateBranchOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Create a lakeFS branch by calling the lakeFS server.
 
@@ -37,6 +38,7 @@ class LakeFSCreateBranchOperator(BaseOperator):
         self.branch = branch
         self.source_branch = source_branch
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSCreateSymlinkOperator(BaseOperator):
+class LakeFSCreateSymlinkOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Create a symlink file
 
@@ -44,6 +45,7 @@ class LakeFSCreateSymlinkOperator(BaseOperator):
         self.branch = branch
         self.location = location
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
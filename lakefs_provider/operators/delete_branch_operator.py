@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSDeleteBranchOperator(BaseOperator):
+class LakeFSDeleteBranchOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Delete a lakeFS branch by calling the lakeFS server.
 
@@ -33,6 +34,7 @@ class LakeFSDeleteBranchOperator(BaseOperator):
         self.repo = repo
         self.branch = branch
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
@@ -0,0 +1,172 @@
+import fnmatch
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import timedelta
+from typing import Any, Dict, Optional, Sequence, Union
+
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+
+class _RateLimiter:
+    """Spaces calls of acquire() across threads to at most rate per second."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self.interval = 1 / rate if rate else 0
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next - now
+            self.next = max(now, self.next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class LakeFSDeleteStaleBranchesOperator(LakeFSProfilingMixin, BaseOperator):
+    """
+    Delete the stale branches of a lakeFS repo in one task, for instance the
+    per-run branches left behind by failed DAG runs.
+
+    A branch is stale if its name matches pattern and it meets every given
+    criterion: its head commit is older than older_than, and/or its head is
+    already merged into merged_into.  Branches with uncommitted changes are
+    never stale.  Beware that a fresh branch, created without any commit yet,
+    counts as merged into its source and is as old as its source's head: only
+    its uncommitted changes keep it from deletion, so a running DAG that has
+    not written to its branch yet can still lose it.  Choose pattern and
+    older_than so that they never match branches of running DAG runs.
+
+    Branches are listed a page at a time, checked and deleted in parallel, and
+    deletes are rate limited.  Returns a report {matched, stale, deleted,
+    failed, dry_run}.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo to clean up.
+    :type repo: str
+    :param pattern: Shell-style pattern of branch names to consider, e.g. 'run-*'.
+    :type pattern: str
+    :param older_than: Minimal age of the head commit (seconds or timedelta).
+    :type older_than: timedelta
+    :param merged_into: Branch that the head commit must already be merged into.
+    :type merged_into: str
+    :param protected_branches: Branches never deleted.
+    :type protected_branches: Sequence[str]
+    :param max_workers: Number of branches checked and deleted in parallel.
+    :type max_workers: int
+    :param max_deletes_per_second: Rate limit of deletes, None for no limit.
+    :type max_deletes_per_second: float
+    :param dry_run: Only report the stale branches, do not delete them.
+    :type dry_run: bool
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'repo',
+        'pattern',
+        'merged_into',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, repo: str, pattern: str,
+                 older_than: Union[timedelta, float, None] = None, merged_into: Optional[str] = None,
+                 protected_branches: Sequence[str] = ('main', 'master'), max_workers: int = 8,
+                 max_deletes_per_second: Optional[float] = 10, dry_run: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if older_than is None and merged_into is None:
+            raise AirflowException("Set older_than, merged_into or both to select stale branches")
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.pattern = pattern
+        self.older_than = older_than if older_than is None or isinstance(older_than, timedelta) \
+            else timedelta(seconds=older_than)
+        self.merged_into = merged_into
+        self.protected_branches = protected_branches
+        self.max_workers = max_workers
+        self.max_deletes_per_second = max_deletes_per_second
+        self.dry_run = dry_run
+
+    def is_stale(self, hook: LakeFSHook, branch: Dict[str, str], now: float) -> bool:
+        if self.older_than is not None:
+            created = hook.get_commit(self.repo, branch['commit_id'])['creation_date']
+            if now - created < self.older_than.total_seconds():
+                return False
+        if self.merged_into is not None:
+            # The head is merged if it is the merge base: merged_into contains it.
+            if hook.find_merge_base(self.repo, branch['id'], self.merged_into) != branch['commit_id']:
+                return False
+        # Work in progress, such as uploads of a running DAG to a fresh branch.
+        return not hook.has_uncommitted_changes(self.repo, branch['id'])
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+        # List only names starting with the literal prefix of the pattern.
+        prefix = re.split(r'[*?\[]', self.pattern, maxsplit=1)[0]
+        protected = set(self.protected_branches) | ({self.merged_into} if self.merged_into else set())
+        limiter = _RateLimiter(self.max_deletes_per_second)
+        now = time.time()
+        report = {'matched': 0, 'stale': [], 'deleted': [], 'failed': {}, 'dry_run': self.dry_run}
+
+        self.log.info("%s stale branches matching '%s' in repo '%s' (older than %s, merged into %s)",
+                      "Finding" if self.dry_run else "Deleting", self.pattern, self.repo, self.older_than,
+                      self.merged_into)
+
+        def clean(branch):
+            try:
+                if not self.is_stale(hook, branch, now):
+                    return branch['id'], False, None
+                if not self.dry_run:
+                    limiter.acquire()
+                    hook.delete_branch(self.repo, branch['id'])
+                return branch['id'], True, None
+            except Exception as e:  # pylint: disable=broad-except
+                return branch['id'], None, e
+
+        def record(future):
+            name, stale, error = future.result()
+            report['matched'] += 1
+            if error is not None:
+                self.log.warning("Branch '%s' failed: %s", name, error)
+                report['failed'][name] = str(error)
+            elif stale:
+                report['stale'].append(name)
+                if not self.dry_run:
+                    report['deleted'].append(name)
+
+        candidates = (branch for branch in hook.list_branches(self.repo, prefix=prefix)
+                      if fnmatch.fnmatchcase(branch['id'], self.pattern) and branch['id'] not in protected)
+        # Keep a bounded window of branches in flight, so that listing advances
+        # only as branches are done and memory does not grow with their number.
+        window = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for branch in candidates:
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future)
+                pending.add(executor.submit(clean, branch))
+            for future in as_completed(pending):
+                record(future)
+
+        self.log.info("Matched %d branches: %d stale, %d deleted, %d failed", report['matched'],
+                      len(report['stale']), len(report['deleted']), len(report['failed']))
+        if report['failed']:
+            context['ti'].xcom_push(key='report', value=report)
+            raise AirflowException(f"Failed on {len(report['failed'])} branches of repo '{self.repo}'")
+        return report
@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSGetCommitOperator(BaseOperator):
+class LakeFSGetCommitOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Get commit details for a lakeFS ref.
 
@@ -32,6 +33,7 @@ class LakeFSGetCommitOperator(BaseOperator):
         self.repo = repo
         self.ref = ref
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSGetObjectOperator(BaseOperator):
+class LakeFSGetObjectOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Get text of an object from lakeFS.  Reads into memory and only works for a *small* object!
 
@@ -18,6 +19,9 @@ class LakeFSGetObjectOperator(BaseOperator):
     :type ref: str
     :param path: The path from which to get.
     :type path: str
+    :param compression: 'auto' to decompress objects uploaded with compression,
+        or the codec (gzip or zstd) to decompress with.
+    :type compression: str
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -31,18 +35,20 @@ class LakeFSGetObjectOperator(BaseOperator):
     ui_color = '#f4a460'
 
     @apply_defaults
-    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, path: str, **kwargs: Any) -> None:
+    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, path: str, compression: str = None, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
         self.ref = ref
         self.path = path
+        self.compression = compression
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
         self.log.info("Get object from repo '%s' reference '%s' path '%s'",
                       self.repo, self.ref, self.path)
 
-        contents = hook.get_object(self.repo, self.ref, self.path)
+        contents = hook.get_object(self.repo, self.ref, self.path, compression=self.compression)
         return str(contents, 'utf-8')
@@ -0,0 +1,76 @@
+from typing import Any, Dict
+
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+
+class LakeFSManifestOperator(LakeFSProfilingMixin, BaseOperator):
+    """
+    Write a manifest of the objects under a prefix at the commit of a ref:
+    their path, size, checksum and mtime, sorted by path.  Compare manifests
+    of two runs with lakefs_provider.manifests.manifest.diff_manifests to find
+    added, removed and modified objects.
+
+    The listing is streamed into the manifest, and the ref is resolved to a
+    commit ID first, so the manifest is an exact snapshot even if the branch
+    moves meanwhile.  A local destination is replaced only once the manifest
+    is complete.  Returns {commit_id, destination, objects}.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo to list.
+    :type repo: str
+    :param ref: The reference to list, can be branch, tag, commit, etc.
+    :type ref: str
+    :param prefix: The prefix to list.
+    :type prefix: str
+    :param destination: Where to write the manifest: a local path, or
+        lakefs://<repo>/<branch>/<path> to upload it to lakeFS (uncommitted).
+    :type destination: str
+    :param manifest_format: binary (default) or parquet.
+    :type manifest_format: str
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'repo',
+        'ref',
+        'prefix',
+        'destination',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, prefix: str, destination: str,
+                 manifest_format: str = 'binary', **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.ref = ref
+        self.prefix = prefix
+        self.destination = destination
+        self.manifest_format = manifest_format
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        from lakefs_provider.manifests.manifest import ManifestEntry, open_manifest_output, write_manifest
+
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+
+        commit_id = hook.get_commit(self.repo, self.ref)['id']
+        self.log.info("Writing manifest of prefix '%s' at commit '%s' (ref '%s') in repo '%s' to '%s'",
+                      self.prefix, commit_id, self.ref, self.repo, self.destination)
+
+        entries = (ManifestEntry(stats['path'], stats.get('size_bytes') or 0, stats['checksum'], stats['mtime'])
+                   for stats in hook.list_objects(self.repo, commit_id, prefix=self.prefix))
+
+        with open_manifest_output(hook, self.destination) as out:
+            count = write_manifest(entries, out, self.manifest_format)
+
+        self.log.info("Wrote %d entries", count)
+        return {'commit_id': commit_id, 'destination': self.destination, 'objects': count}
@@ -1,13 +1,54 @@
-from typing import Any, Dict
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
 
+from airflow.exceptions import AirflowException
+from airflow.stats import Stats
 from airflow.utils.decorators import apply_defaults
 
+from lakefs_provider.datasets.lakefs_dataset import declare_lakefs_outlet, set_dataset_commit
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
 from lakefs_provider.links.lakefs_link import LakeFSLink
 from lakefs_provider.operators.with_metadata_operator import WithLakeFSMetadataOperator
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSMergeOperator(WithLakeFSMetadataOperator):
+def merge_queue_pool(repo: str, branch: str) -> str:
+    """Return the name of the Airflow pool queueing merges to branch in repo."""
+    return f"lakefs_merge_queue::{repo}::{branch}"
+
+
+def create_merge_queue_pool(repo: str, branch: str) -> str:
+    """Create (or reset to one slot) the merge queue pool of branch in repo, and
+    return its name.  Run it once, for instance from a setup script, before
+    DAGs with merge_queue=True merging to the branch run; or use the CLI:
+    airflow pools set <name> 1 <description>."""
+    from airflow.models.pool import Pool
+    from airflow.utils.session import create_session
+
+    name = merge_queue_pool(repo, branch)
+    with create_session() as session:
+        pool = session.query(Pool).filter(Pool.pool == name).one_or_none()
+        if pool is None:
+            pool = Pool(pool=name)
+            session.add(pool)
+        pool.slots = 1
+        pool.description = f"lakeFS merge queue of branch '{branch}' in repo '{repo}'"
+    return name
+
+
+def _ready_time(context: Dict[str, Any]) -> Optional[datetime]:
+    """Return when the task of context could first run: when its last upstream
+    task ended, or when its DAG run started."""
+    dag_run, task = context.get('dag_run'), context.get('task')
+    if dag_run is None or task is None:
+        return None
+    ends = [ti.end_date for ti in dag_run.get_task_instances()
+            if ti.task_id in task.upstream_task_ids and ti.end_date is not None]
+    return max(ends, default=dag_run.start_date)
+
+
+class LakeFSMergeOperator(LakeFSProfilingMixin, WithLakeFSMetadataOperator):
     """
     Merge source branch to destination branch
 
@@ -23,6 +64,21 @@ class LakeFSMergeOperator(WithLakeFSMetadataOperator):
     :type msg: str
     :param metadata: The commit message.
     :type metadata: Additional metadata to the commit
+    :param emit_dataset: Declare the Airflow Dataset lakefs://<repo>/<destination_branch> as an outlet and
+        emit it with the commit ID on success (Airflow 2.4+).
+    :type emit_dataset: bool
+    :param dataset_prefix: Path prefix to add to the Dataset URI.
+    :type dataset_prefix: str
+    :param merge_queue: Run merges to the same destination branch one at a time,
+        instead of contending on the branch in lakeFS.  The task runs in the
+        one-slot Airflow pool merge_queue_pool(repo, destination_branch), which
+        must exist: create it with create_merge_queue_pool.  Waiting merges do
+        not hold a worker slot, and are started in Airflow's pool order
+        (priority weight, then logical date), not in arrival order.  repo and
+        destination_branch cannot be templated.  Queue wait (since upstream
+        tasks ended) and merge times are pushed to XCom as queue_wait_seconds
+        and merge_seconds.
+    :type merge_queue: bool
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -39,7 +95,15 @@ class LakeFSMergeOperator(WithLakeFSMetadataOperator):
     operator_extra_links = [LakeFSLink()]
 
     @apply_defaults
-    def __init__(self, lakefs_conn_id: str, repo: str, source_ref: str, destination_branch: str, msg: str, metadata: Dict[str, str] = None, **kwargs: Any) -> None:
+    def __init__(self, lakefs_conn_id: str, repo: str, source_ref: str, destination_branch: str, msg: str, metadata: Dict[str, str] = None,
+                 emit_dataset: bool = False, dataset_prefix: str = None, merge_queue: bool = False, **kwargs: Any) -> None:
+        if merge_queue:
+            if "{{" in repo or "{{" in destination_branch:
+                raise AirflowException(f"{kwargs.get('task_id')}: cannot queue merges to a templated repo or branch")
+            pool = merge_queue_pool(repo, destination_branch)
+            if kwargs.setdefault('pool', pool) != pool:
+                raise AirflowException(f"{kwargs.get('task_id')}: merge_queue runs in pool {pool}, "
+                                       f"not {kwargs['pool']}")
         super().__init__(**kwargs)
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
@@ -47,9 +111,13 @@ class LakeFSMergeOperator(WithLakeFSMetadataOperator):
         self.destination_branch = destination_branch
         self.msg = msg
         self.metadata = metadata
+        self._dataset = declare_lakefs_outlet(self, repo, destination_branch, dataset_prefix) if emit_dataset else None
+        self.merge_queue = merge_queue
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
 
         self.log.info("Merging to lakeFS branch '%s' in repo '%s' from source ref '%s'",
                       self.destination_branch, self.repo, self.source_ref)
@@ -58,7 +126,24 @@ class LakeFSMergeOperator(WithLakeFSMetadataOperator):
 
         self.enrich_metadata(context)
 
+        started = time.monotonic()
         ref = hook.merge(self.repo, self.source_ref, self.destination_branch, self.msg, self.metadata)
+        merge_seconds = time.monotonic() - started
+
+        if self.merge_queue:
+            ready, ti = _ready_time(context), context['ti']
+            queue_wait_seconds = max(0.0, (ti.start_date - ready).total_seconds()) \
+                if ready is not None and ti.start_date is not None else None
+            self.log.info("Merged after waiting %s seconds in the queue of branch '%s', in %.1f seconds",
+                          queue_wait_seconds, self.destination_branch, merge_seconds)
+            if queue_wait_seconds is not None:
+                Stats.timing("lakefs.merge_queue.wait", queue_wait_seconds * 1000)
+            Stats.timing("lakefs.merge_queue.merge", merge_seconds * 1000)
+            ti.xcom_push(key="queue_wait_seconds", value=queue_wait_seconds)
+            ti.xcom_push(key="merge_seconds", value=merge_seconds)
+
+        if self._dataset is not None:
+            set_dataset_commit(context, self._dataset, ref)
 
         LakeFSLink.persist(context,
                            task_instance=self,
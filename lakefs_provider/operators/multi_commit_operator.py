@@ -0,0 +1,186 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from airflow.exceptions import AirflowException
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.with_metadata_operator import WithLakeFSMetadataOperator
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+FAILURE_POLICIES = ('best_effort', 'all_or_nothing')
+
+
+class LakeFSMultiCommitOperator(LakeFSProfilingMixin, WithLakeFSMetadataOperator):
+    """
+    Commit many lakeFS branches, possibly in different repos, in one task,
+    for instance per-tenant branches written by one DAG run.  The metadata is
+    rendered once and added to every commit, and the branches are committed
+    concurrently over one connection.
+
+    A branch without uncommitted changes is not committed.  If its head is a
+    commit of this task run, made by an earlier try, its status is 'unchanged'
+    and its commit_id that head, so a retry succeeds on the branches that the
+    earlier try committed.  Otherwise there is nothing to commit and the
+    branch fails, as an empty commit would; in particular a retry after an
+    all_or_nothing rollback fails instead of reporting success.
+
+    With failure_policy 'best_effort' every branch is committed if it can be.
+    With 'all_or_nothing' no more commits start after the first failure, the
+    commits already made are reverted, and the uncommitted changes of the
+    other branches are reset, so that no branch keeps a partial output; note
+    that this discards those changes.  When a commit request fails but the
+    branch head moved, the head counts as committed only if its metadata shows
+    it is the commit of this task run; otherwise the branch has status
+    'unknown' and is left alone.
+
+    Returns a report with one entry {repo, branch, status, commit_id, error,
+    compensation} per target, in target order.  status is one of committed,
+    unchanged, failed, unknown or not_started.  If any commit failed, the
+    report is pushed to XCom key 'report' and the task fails.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param targets: Branches to commit, as (repo, branch) or (repo, branch, msg)
+        sequences, or dicts with keys repo, branch and optionally msg.
+    :type targets: Sequence
+    :param msg: The commit message of targets without their own.
+    :type msg: str
+    :param metadata: Additional metadata to every commit.
+    :type metadata: Dict[str, str]
+    :param failure_policy: best_effort or all_or_nothing.
+    :type failure_policy: str
+    :param max_workers: Number of branches committed in parallel.
+    :type max_workers: int
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'targets',
+        'msg',
+        'metadata',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, targets: Sequence[Union[Sequence[str], Dict[str, str]]],
+                 msg: Optional[str] = None, metadata: Dict[str, str] = None, failure_policy: str = 'best_effort',
+                 max_workers: int = 8, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if failure_policy not in FAILURE_POLICIES:
+            raise AirflowException(f"Unknown failure policy {failure_policy}, use one of {FAILURE_POLICIES}")
+        self.lakefs_conn_id = lakefs_conn_id
+        self.targets = targets
+        self.msg = msg
+        self.metadata = metadata if metadata is not None else {}
+        self.failure_policy = failure_policy
+        self.max_workers = max_workers
+
+    def _report_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for target in self.targets:
+            if isinstance(target, dict):
+                repo, branch, msg = target['repo'], target['branch'], target.get('msg', self.msg)
+            else:
+                repo, branch, msg = (list(target) + [self.msg])[:3]
+            if msg is None:
+                raise AirflowException(f"No commit message for branch '{branch}' in repo '{repo}'")
+            entries.append({'repo': repo, 'branch': branch, 'msg': msg, 'status': None, 'commit_id': None,
+                            'error': None, 'compensation': None})
+        return entries
+
+    def is_own_commit(self, hook: LakeFSHook, repo: str, commit_id: str) -> bool:
+        """Return whether commit_id was made by this task run, from its metadata."""
+        metadata = hook.get_commit(repo, commit_id).get('metadata') or {}
+        keys = ('airflow_task_id', self._metadata_key('dag_id'), self._metadata_key('dag_run_id'))
+        return all(metadata.get(key) == self.metadata.get(key) for key in keys)
+
+    def compensate(self, hook: LakeFSHook, entry: Dict[str, Any]) -> None:
+        """Undo the commit of entry, or reset its branch if it did not commit.
+        Unchanged branches and branches in an unknown state are left alone."""
+        try:
+            if entry['status'] == 'committed':
+                hook.revert(entry['repo'], entry['branch'], entry['commit_id'])
+                entry['compensation'] = 'reverted'
+            elif entry['status'] in ('failed', 'not_started'):
+                hook.reset_branch(entry['repo'], entry['branch'])
+                entry['compensation'] = 'reset'
+        except Exception as e:  # pylint: disable=broad-except
+            self.log.error("Could not compensate branch '%s' in repo '%s': %s", entry['branch'], entry['repo'], e)
+            entry['compensation'] = f"failed: {e}"
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+        entries = self._report_entries()
+        all_or_nothing = self.failure_policy == 'all_or_nothing'
+
+        self.log.info("Committing %d lakeFS branches (%s)", len(entries), self.failure_policy)
+
+        self.metadata["airflow_task_id"] = self.task_id
+
+        self.enrich_metadata(context)
+
+        abort = threading.Event()
+
+        def commit(entry):
+            repo, branch = entry['repo'], entry['branch']
+            if abort.is_set():
+                entry['status'] = 'not_started'
+                entry['error'] = "not committed after an earlier failure"
+                return
+            head = None
+            try:
+                head = hook.get_branch_commit_id(repo, branch)
+                if not hook.has_uncommitted_changes(repo, branch):
+                    if not self.is_own_commit(hook, repo, head):
+                        raise AirflowException("No uncommitted changes, and the head is not a commit of "
+                                               "this task run")
+                    entry['status'], entry['commit_id'] = 'unchanged', head
+                    return
+                entry['commit_id'] = hook.commit(repo, branch, entry['msg'], dict(self.metadata))
+                entry['status'] = 'committed'
+                return
+            except Exception as e:  # pylint: disable=broad-except
+                entry['status'], entry['error'] = 'failed', str(e)
+            if all_or_nothing:
+                abort.set()
+            if head is None:
+                return
+            # The commit may have succeeded even though its response was lost,
+            # or another writer may have moved the branch meanwhile.
+            try:
+                current = hook.get_branch_commit_id(repo, branch)
+                if current != head:
+                    if self.is_own_commit(hook, repo, current):
+                        entry['status'], entry['commit_id'], entry['error'] = 'committed', current, None
+                    else:
+                        entry['status'] = 'unknown'
+            except Exception as e:  # pylint: disable=broad-except
+                entry['status'] = 'unknown'
+                entry['error'] += f"; cannot check branch head: {e}"
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(commit, entries))
+
+        failed = [entry for entry in entries if entry['error'] is not None]
+        for entry in failed:
+            self.log.warning("Branch '%s' in repo '%s' %s: %s", entry['branch'], entry['repo'],
+                             entry['status'], entry['error'])
+        self.log.info("Committed %d and left unchanged %d of %d branches",
+                      sum(entry['status'] == 'committed' for entry in entries),
+                      sum(entry['status'] == 'unchanged' for entry in entries), len(entries))
+        if failed and all_or_nothing:
+            self.log.info("Reverting commits and resetting uncommitted branches")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda entry: self.compensate(hook, entry), entries))
+
+        for entry in entries:
+            del entry['msg']
+        if failed:
+            context['ti'].xcom_push(key='report', value=entries)
+            raise AirflowException(f"Failed to commit {len(failed)} of {len(entries)} branches")
+        return entries
@@ -0,0 +1,179 @@
+import itertools
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from typing import IO, Any, Dict, List, Optional, Union
+
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.manifests.manifest import open_manifest_output, split_lakefs_uri
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+
+class _Batch:
+    """A page of the listing: the entries after path after, and the earliest
+    expiry of their URLs."""
+
+    __slots__ = ('after', 'count', 'expires_at')
+
+    def __init__(self, after: str) -> None:
+        self.after = after
+        self.count = 0
+        self.expires_at: Optional[int] = None
+
+
+def _manifest_line(stats: Dict[str, Any]) -> str:
+    return json.dumps({'path': stats['path'], 'size_bytes': stats.get('size_bytes'),
+                       'url': stats['physical_address'], 'expires_at': stats.get('physical_address_expiry')}) + '\n'
+
+
+class LakeFSPresignedManifestOperator(LakeFSProfilingMixin, BaseOperator):
+    """
+    Write a manifest of presigned URLs of the objects under a prefix at the
+    commit of a ref, for Spark, Dask or DuckDB jobs to read the objects
+    straight from the object store, in parallel, without passing the data
+    through lakeFS or the Airflow worker.
+
+    The manifest has one JSON line {path, size_bytes, url, expires_at} per
+    object, in path order; expires_at is the Unix time when the URL expires.
+    The listing is streamed with presigned URLs into a temporary file, a page
+    at a time.  Pages whose URLs expire within min_url_validity of the end of
+    the listing are then listed again, so that the manifest holds URLs valid
+    for at least min_url_validity when the operator finishes.  The lifetime of
+    the URLs of the first object listed is the longest lakeFS gives (15
+    minutes by default, see blockstore pre_signed_expiry); the operator fails
+    on that first object if it is shorter than min_url_validity, as listing
+    again could not help.  A local
+    destination is replaced only once the manifest is complete.  Returns
+    {commit_id, destination, objects, refreshed_pages, expires_at}, a small
+    XCom referencing the manifest.  Requires an object store that lakeFS can
+    presign URLs for.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo to list.
+    :type repo: str
+    :param ref: The reference to list, can be branch, tag, commit, etc.
+    :type ref: str
+    :param prefix: The prefix to list.
+    :type prefix: str
+    :param destination: Where to write the manifest: a local path, or
+        lakefs://<repo>/<branch>/<path> to upload it to lakeFS (uncommitted).
+    :type destination: str
+    :param min_url_validity: How long URLs in the manifest must stay valid (seconds or timedelta),
+        at most the presign expiry of lakeFS.
+    :type min_url_validity: timedelta
+    :param page_size: Number of objects listed per request, and refreshed together.
+    :type page_size: int
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'repo',
+        'ref',
+        'prefix',
+        'destination',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, prefix: str, destination: str,
+                 min_url_validity: Union[timedelta, float] = timedelta(minutes=10), page_size: int = 1000,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.ref = ref
+        self.prefix = prefix
+        self.destination = destination
+        self.min_url_validity = min_url_validity if isinstance(min_url_validity, timedelta) \
+            else timedelta(seconds=min_url_validity)
+        self.page_size = page_size
+
+    def list_presigned(self, hook: LakeFSHook, commit_id: str, out: IO[str]) -> List[_Batch]:
+        """Write the manifest lines of the listing to out, and return its pages."""
+        batches: List[_Batch] = []
+        last_path = ''
+        for stats in hook.list_objects(self.repo, commit_id, prefix=self.prefix, size=self.page_size,
+                                       presign=True):
+            if not batches or batches[-1].count == self.page_size:
+                batches.append(_Batch(last_path))
+            batch = batches[-1]
+            batch.count += 1
+            expires_at = stats.get('physical_address_expiry')
+            if expires_at is not None and len(batches) == 1 and batch.count == 1:
+                ttl = expires_at - time.time()
+                if ttl < self.min_url_validity.total_seconds():
+                    raise AirflowException(f"lakeFS presigns URLs for {ttl:.0f} seconds, less than "
+                                           f"min_url_validity of {self.min_url_validity}")
+            if expires_at is not None and (batch.expires_at is None or expires_at < batch.expires_at):
+                batch.expires_at = expires_at
+            out.write(_manifest_line(stats))
+            last_path = stats['path']
+        return batches
+
+    def refresh(self, hook: LakeFSHook, commit_id: str, listing: IO[str], batches: List[_Batch],
+                out: IO[str]) -> int:
+        """Copy the manifest lines of listing to out, listing again the pages
+        whose URLs expire too soon.  Returns the number of refreshed pages.
+
+        list_presigned checked that fresh URLs outlive min_url_validity, so
+        only pages that aged during the listing are listed again."""
+        deadline = time.time() + self.min_url_validity.total_seconds()
+        refreshed = 0
+        for batch in batches:
+            lines = list(itertools.islice(listing, batch.count))
+            if batch.expires_at is None or batch.expires_at >= deadline:
+                out.writelines(lines)
+                continue
+            fresh = list(itertools.islice(hook.list_objects(self.repo, commit_id, prefix=self.prefix,
+                                                            size=batch.count, after=batch.after, presign=True),
+                                          batch.count))
+            # A commit never changes, so the page lists the same objects again.
+            if [stats['path'] for stats in fresh] != [json.loads(line)['path'] for line in lines]:
+                raise AirflowException(f"Listing of commit '{commit_id}' changed while refreshing URLs")
+            out.writelines(_manifest_line(stats) for stats in fresh)
+            batch.expires_at = min((stats['physical_address_expiry'] for stats in fresh
+                                    if stats.get('physical_address_expiry') is not None), default=None)
+            refreshed += 1
+        return refreshed
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+
+        commit_id = hook.get_commit(self.repo, self.ref)['id']
+        self.log.info("Writing presigned URLs of prefix '%s' at commit '%s' (ref '%s') in repo '%s' to '%s'",
+                      self.prefix, commit_id, self.ref, self.repo, self.destination)
+
+        # Check the destination before listing.
+        split_lakefs_uri(self.destination)
+
+        with tempfile.NamedTemporaryFile('w', prefix='lakefs-presigned-', suffix='.jsonl', encoding='utf-8',
+                                         delete=False) as listing:
+            try:
+                batches = self.list_presigned(hook, commit_id, listing)
+                listing.close()
+                with open(listing.name, encoding='utf-8') as lines:
+                    with open_manifest_output(hook, self.destination, 'w', encoding='utf-8',
+                                              suffix='.jsonl') as manifest:
+                        refreshed = self.refresh(hook, commit_id, lines, batches, manifest)
+            finally:
+                os.unlink(listing.name)
+
+        objects = sum(batch.count for batch in batches)
+        expires_at = min((batch.expires_at for batch in batches if batch.expires_at is not None), default=None)
+        self.log.info("Wrote %d presigned URLs, refreshed %d of %d pages, earliest expiry at %s",
+                      objects, refreshed, len(batches), expires_at)
+        if expires_at is not None and expires_at < time.time() + self.min_url_validity.total_seconds():
+            self.log.warning("lakeFS presigns URLs for less than %s, some URLs expire at %s",
+                             self.min_url_validity, expires_at)
+        return {'commit_id': commit_id, 'destination': self.destination, 'objects': objects,
+                'refreshed_pages': refreshed, 'expires_at': expires_at}
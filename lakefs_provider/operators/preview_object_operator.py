@@ -0,0 +1,108 @@
+from typing import Any, Dict, List, Optional
+
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+PREVIEW_MODES = ('head', 'tail', 'sample', 'range')
+
+
+class LakeFSPreviewObjectOperator(LakeFSProfilingMixin, BaseOperator):
+    """
+    Read part of an object on lakeFS, for previews and pipeline gates on
+    large files: its first or last lines, a uniform sample of its lines, or a
+    byte range, which may be its last bytes.  Only head, tail and range avoid
+    reading the whole object; sample streams it in constant memory.  The
+    result is truncated to max_output_bytes, to keep XComs small: a list of
+    lines, or a string for range.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo from which to read.
+    :type repo: str
+    :param ref: The reference from which to read.
+    :type ref: str
+    :param path: The path of the object.
+    :type path: str
+    :param mode: head, tail, sample or range.
+    :type mode: str
+    :param lines: Number of lines to return, for head, tail and sample.
+    :type lines: int
+    :param skip_lines: Leading lines (such as a header) to skip in sample.
+    :type skip_lines: int
+    :param start: First byte to read, for range.  A negative start reads the
+        last -start bytes of the object.
+    :type start: int
+    :param max_output_bytes: Bound on the size of the result.
+    :type max_output_bytes: int
+    :param compression: 'auto' or a codec to decompress with, for head and sample.
+    :type compression: str
+    :param encoding: Text encoding of the object.
+    :type encoding: str
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'repo',
+        'ref',
+        'path',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, path: str, mode: str = 'head', lines: int = 10,
+                 skip_lines: int = 0, start: int = 0, max_output_bytes: int = 65536,
+                 compression: Optional[str] = None, encoding: str = 'utf-8', **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if mode not in PREVIEW_MODES:
+            raise AirflowException(f"Unknown preview mode {mode}, use one of {PREVIEW_MODES}")
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.ref = ref
+        self.path = path
+        self.mode = mode
+        self.lines = lines
+        self.skip_lines = skip_lines
+        self.start = start
+        self.max_output_bytes = max_output_bytes
+        self.compression = compression
+        self.encoding = encoding
+
+    def _truncate(self, lines: List[str]) -> List[str]:
+        result, size = [], 0
+        for line in lines:
+            size += len(line.encode(self.encoding, 'replace')) + 1
+            if size > self.max_output_bytes:
+                self.log.info("Truncated output to %d of %d lines (max_output_bytes %d)",
+                              len(result), len(lines), self.max_output_bytes)
+                break
+            result.append(line)
+        return result
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+
+        self.log.info("Preview %s of object '%s' on ref '%s' in repo '%s'", self.mode, self.path, self.ref, self.repo)
+
+        if self.mode == 'range':
+            if self.start < 0:
+                data = hook.read_range(self.repo, self.ref, self.path, max(self.start, -self.max_output_bytes))
+            else:
+                data = hook.read_range(self.repo, self.ref, self.path, self.start,
+                                       self.start + self.max_output_bytes)
+            return data.decode(self.encoding, 'replace')
+        if self.mode == 'head':
+            lines = hook.head_lines(self.repo, self.ref, self.path, self.lines, compression=self.compression,
+                                    encoding=self.encoding, max_line_bytes=self.max_output_bytes)
+        elif self.mode == 'tail':
+            lines = hook.tail_lines(self.repo, self.ref, self.path, self.lines, encoding=self.encoding)
+        else:
+            lines = hook.sample_lines(self.repo, self.ref, self.path, self.lines, skip_lines=self.skip_lines,
+                                      compression=self.compression, encoding=self.encoding,
+                                      max_line_bytes=self.max_output_bytes)
+        return self._truncate(lines)
@@ -0,0 +1,68 @@
+from typing import Any, Dict, List
+
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+
+# Stats kept for each found object in the returned map.
+STAT_FIELDS = ('size_bytes', 'checksum', 'mtime')
+
+
+class LakeFSStatObjectsOperator(LakeFSProfilingMixin, BaseOperator):
+    """
+    Check that many objects exist on a lakeFS ref, in a few batched requests.
+    Returns {path: {size_bytes, checksum, mtime}, or None if missing}.
+
+    :param lakefs_conn_id: connection to run the operator with
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo of the objects.
+    :type repo: str
+    :param ref: The reference of the objects, can be branch, tag, commit, etc.
+    :type ref: str
+    :param paths: Paths of the objects to check.
+    :type paths: List[str]
+    :param fail_on_missing: Fail if any of the objects is missing.
+    :type fail_on_missing: bool
+    :param max_workers: Number of concurrent requests.
+    :type max_workers: int
+    """
+
+    # Specify the arguments that are allowed to parse with jinja templating
+    template_fields = [
+        'repo',
+        'ref',
+        'paths',
+    ]
+    template_ext = ()
+    ui_color = '#f4a460'
+
+    @apply_defaults
+    def __init__(self, lakefs_conn_id: str, repo: str, ref: str, paths: List[str], fail_on_missing: bool = True,
+                 max_workers: int = 16, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.ref = ref
+        self.paths = paths
+        self.fail_on_missing = fail_on_missing
+        self.max_workers = max_workers
+
+    @profiled
+    def execute(self, context: Dict[str, Any]) -> Any:
+        hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
+        hook.ensure_healthy()
+
+        self.log.info("Stat %d objects on ref '%s' in repo '%s'", len(self.paths), self.ref, self.repo)
+
+        stats = hook.stat_objects(self.repo, self.ref, self.paths, max_workers=self.max_workers)
+        result = {path: None if s is None else {k: s.get(k) for k in STAT_FIELDS} for path, s in stats.items()}
+
+        missing = [path for path, s in result.items() if s is None]
+        self.log.info("Found %d objects, %d missing", len(result) - len(missing), len(missing))
+        if missing and self.fail_on_missing:
+            raise AirflowException(f"{len(missing)} objects missing on ref '{self.ref}' in repo '{self.repo}', "
+                                   f"first: {missing[:10]}")
+        return result
@@ -4,9 +4,10 @@ from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
 
 
-class LakeFSUploadOperator(BaseOperator):
+class LakeFSUploadOperator(LakeFSProfilingMixin, BaseOperator):
     """
     Upload an object to a lakeFS repo.
 
@@ -20,6 +21,10 @@ class LakeFSUploadOperator(BaseOperator):
     :type msg: str
     :param content: Contents of the desired object.
     :type content: bytes
+    :param compression: Compress the object with this codec (gzip or zstd) and
+        record it in the object metadata.  Reads with compression='auto'
+        decompress it.
+    :type compression: str
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -32,18 +37,21 @@ class LakeFSUploadOperator(BaseOperator):
     ui_color = '#f4a460'
 
     @apply_defaults
-    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, path: str, content: bytes, **kwargs: Any) -> None:
+    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, path: str, content: bytes, compression: str = None,
+                 **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
         self.branch = branch
         self.path = path
         self.content = content
+        self.compression = compression
 
+    @profiled
     def execute(self, context: Dict[str, Any]) -> Any:
         hook = LakeFSHook(lakefs_conn_id=self.lakefs_conn_id)
 
         self.log.info("Uploading to path '%s' on lakeFS branch '%s' in repo '%s' (content type: %s)",
                       self.path, self.branch, self.repo, type(self.content))
 
-        return hook.upload(self.repo, self.branch, self.path, self.content)
+        return hook.upload(self.repo, self.branch, self.path, self.content, compression=self.compression)
@@ -4,6 +4,8 @@ from airflow.configuration import conf as airflow_conf
 from airflow.models import BaseOperator, DagRun
 from sqlalchemy.exc import SQLAlchemyError
 
+from lakefs_provider import tracing
+
 
 class WithLakeFSMetadataOperator(BaseOperator):
 
@@ -51,13 +53,14 @@ class WithLakeFSMetadataOperator(BaseOperator):
         if hasattr(DagRun, "note"): # Older Airflow versions don't have DagRun.note.
             self.__metadata_templates["note"] = "{{dag_run.note}}"
 
-        cdd = self._get_current_dag_dict(context)
-        for k, template in self.__metadata_templates.items():
-            try:
-                expanded = str(self.render_template(template, cdd))
-                self.metadata[self._metadata_key(k)] = expanded
-            except SQLAlchemyError as sql_e:
-                self.log.warning(f"metadata {k} not added: ${sql_e} (possibly undefined fields)")
+        with tracing.span("enrich_metadata"):
+            cdd = self._get_current_dag_dict(context)
+            for k, template in self.__metadata_templates.items():
+                try:
+                    expanded = str(self.render_template(template, cdd))
+                    self.metadata[self._metadata_key(k)] = expanded
+                except SQLAlchemyError as sql_e:
+                    self.log.warning(f"metadata {k} not added: ${sql_e} (possibly undefined fields)")
 
     @classmethod
     def _metadata_key(cls, key: str) -> str:
@@ -0,0 +1,191 @@
+"""Opt-in profiling of lakeFS operators and sensors, and their task spans.
+
+Operators and sensors with LakeFSProfilingMixin accept profile=True, or
+profile all their runs when the Airflow config sets [lakefs] profile = True.
+Their execute then runs under cProfile; a sensor collects all its pokes of
+the try into one profile, without the sleeps between them.  The task log
+gets the hottest calls by cumulative time, and the full profile is written to
+[lakefs] profile_dir, for pstats or snakeviz.  Threads started by the
+profiled calls, such as ThreadPoolExecutor workers, are profiled too and
+merged into the same profile.  cProfile is deterministic, so a profiled task
+runs slower than usual; time in network waits shows up as time in socket and
+SSL calls.  In reschedule mode every reschedule of a sensor runs in a new
+process, and writes its own profile.
+
+The execute of every lakeFS operator and sensor also records a lakefs.task
+span (see lakefs_provider.tracing), the parent of the spans of its hook calls.
+"""
+import functools
+import io
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from airflow.configuration import conf
+
+from lakefs_provider import tracing
+
+PROFILE_SORT_KEY = "cumulative"
+
+# cProfile cannot nest, so profile only the outermost profiled call of a thread.
+_active = threading.local()
+
+# Before Python 3.12 cProfile sees only the thread that enabled it.
+PROFILE_THREADS_SEPARATELY = sys.version_info < (3, 12)
+
+
+def profile_enabled(profile: Optional[bool]) -> bool:
+    """Return whether to profile, given the profile argument of an operator."""
+    if profile is not None:
+        return profile
+    return conf.getboolean("lakefs", "profile", fallback=False)
+
+
+def profile_dir() -> str:
+    return conf.get("lakefs", "profile_dir", fallback="") or os.path.join(
+        conf.get("logging", "base_log_folder"), "lakefs_profiles")
+
+
+def profile_path(context: Dict[str, Any], name: str) -> str:
+    """Return the path of the profile file of calls named name, written now in
+    the task run of context.  A try may write more than one profile (on
+    reschedule or deferral), so the file name ends with the time and process."""
+    ti = context.get("ti")
+    called = f"{datetime.now().strftime('%Y%m%dT%H%M%S.%f')}.{os.getpid()}"
+    if ti is None:
+        parts = ["unknown", f"{name}.{called}"]
+    else:
+        parts = [ti.dag_id, ti.task_id, ti.run_id, f"{name}.try_{ti.try_number}"]
+        if getattr(ti, "map_index", -1) >= 0:
+            parts[-1] += f".map_{ti.map_index}"
+        parts[-1] += f".{called}"
+    return os.path.join(profile_dir(), *(re.sub(r"[^\w.-]", "_", str(part)) for part in parts)) + ".prof"
+
+
+class Profile:
+    """A cProfile profile accumulated over one or more calls, including the
+    threads that they start."""
+
+    def __init__(self) -> None:
+        import cProfile
+
+        self.profiler = cProfile.Profile()
+        self.thread_profilers: List[Any] = []
+        self.calls = 0
+
+    def _profile_thread(self, frame: Any, event: str, arg: Any) -> None:
+        # threading calls this once at the start of every new thread.
+        import cProfile
+
+        profiler = cProfile.Profile()
+        self.thread_profilers.append(profiler)
+        profiler.enable()
+
+    def run(self, method: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call method under the profile, unless a profile is already running."""
+        if getattr(_active, "profiling", False):
+            return method(*args, **kwargs)
+        _active.profiling = True
+        if PROFILE_THREADS_SEPARATELY:
+            threading.setprofile(self._profile_thread)
+        self.profiler.enable()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.profiler.disable()
+            if PROFILE_THREADS_SEPARATELY:
+                threading.setprofile(None)
+            _active.profiling = False
+            self.calls += 1
+
+    def stats(self, stream: Any) -> Any:
+        """Return pstats.Stats of the calls, merged with their threads."""
+        import pstats
+
+        stats = pstats.Stats(self.profiler, stream=stream)
+        for profiler in self.thread_profilers:
+            try:
+                stats.add(profiler)
+            except TypeError:
+                # pstats refuses a profiler that recorded nothing.
+                pass
+        return stats
+
+
+def _task_span_attributes(operator: Any, context: Dict[str, Any]) -> Dict[str, Any]:
+    branch = getattr(operator, "branch", None) or getattr(operator, "destination_branch", None)
+    return dict(tracing.task_attributes(context), operator=operator.task_type,
+                repo=getattr(operator, "repo", None), branch=branch)
+
+
+def profiled(method: Callable) -> Callable:
+    """Decorate execute of a LakeFSProfilingMixin operator or sensor to trace
+    it as a lakefs.task span, and profile it when profiling is enabled.
+    Sensors also decorate poke, which is then profiled into the profile of
+    their execute."""
+
+    def call(self, context: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        profile = getattr(self, "_profile", None)
+        if profile is not None:
+            if method.__name__ == "execute":
+                return method(self, context, *args, **kwargs)
+            return profile.run(method, self, context, *args, **kwargs)
+        if getattr(_active, "profiling", False) or not profile_enabled(getattr(self, "profile", None)):
+            return method(self, context, *args, **kwargs)
+
+        profile = Profile()
+        if method.__name__ == "execute" and hasattr(self, "poke"):
+            # Collect the pokes of the sensor, but not its sleeps between them.
+            self._profile = profile
+            try:
+                return method(self, context, *args, **kwargs)
+            finally:
+                self._profile = None
+                if profile.calls:
+                    self._report_profile(profile, context, "poke")
+        try:
+            return profile.run(method, self, context, *args, **kwargs)
+        finally:
+            self._report_profile(profile, context, method.__name__)
+
+    @functools.wraps(method)
+    def wrapper(self, context: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        if method.__name__ != "execute":
+            return call(self, context, *args, **kwargs)
+        with tracing.span("task", **_task_span_attributes(self, context)):
+            return call(self, context, *args, **kwargs)
+
+    return wrapper
+
+
+class LakeFSProfilingMixin:
+    """
+    Profiling argument of lakeFS operators and sensors, see
+    lakefs_provider.profiling.  Their execute (and poke, for sensors) is
+    decorated with profiled, which also traces execute.
+
+    :param profile: Profile the task, overriding the Airflow config [lakefs] profile.
+    :type profile: bool
+    """
+
+    def __init__(self, *args: Any, profile: Optional[bool] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.profile = profile
+        self._profile: Optional[Profile] = None
+
+    def _report_profile(self, profile: Profile, context: Dict[str, Any], name: str) -> None:
+        report = io.StringIO()
+        stats = profile.stats(report)
+        stats.sort_stats(PROFILE_SORT_KEY).print_stats(conf.getint("lakefs", "profile_top", fallback=25))
+        self.log.info("Profile of %s (%d calls, %d threads):\n%s", name, profile.calls,
+                      len(profile.thread_profilers), report.getvalue())
+        path = profile_path(context, name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            stats.dump_stats(path)
+            self.log.info("Wrote profile of %s to %s", name, path)
+        except OSError as e:
+            self.log.warning("Could not write profile of %s to %s: %s", name, path, e)
@@ -0,0 +1,72 @@
+import time
+from itertools import islice
+from statistics import median
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def next_poke_interval(now: float, commit_times: Iterable[float], min_interval: float, max_interval: float,
+                       waited: Optional[float] = None) -> float:
+    """Return how long to wait before the next poke, given the creation times
+    (Unix epoch seconds) of recent commits on the branch.
+
+    The branch is expected to get its next commit one median gap after its
+    latest commit.  Before that the interval is half the remaining time, so it
+    is long during quiet periods and tightens as the expected arrival nears.
+    Once the commit is overdue the interval grows with the time overdue,
+    backing off exponentially.  Without enough history to estimate a cadence,
+    the interval grows with the time already waited.  The result is always
+    between min_interval and max_interval.
+    """
+    times = sorted(commit_times, reverse=True)
+    gaps = [later - earlier for later, earlier in zip(times, times[1:]) if later > earlier]
+    if gaps:
+        expected = times[0] + median(gaps)
+        if expected > now:
+            interval = (expected - now) / 2
+        else:
+            interval = now - expected
+    else:
+        interval = waited or 0
+    return max(min_interval, min(max_interval, interval))
+
+
+class AdaptivePokeMixin:
+    """
+    Adaptive poke interval for lakeFS sensors on a branch.  Sensors using it
+    set self.hook, self.repo, self.branch, self.max_poke_interval and
+    self.cadence_commits.  The adapted interval is kept apart from
+    poke_interval, which stays the shortest interval.
+    """
+
+    _first_poke: Optional[float] = None
+    _adaptive_poke_interval: Optional[float] = None
+
+    def first_poke_time(self, context: Dict[Any, Any]) -> float:
+        """Return the time of the first poke of this sensor run (Unix epoch
+        seconds, on the clock of the Airflow workers)."""
+        ti = context.get('ti')
+        if self.mode == 'reschedule' and ti is not None and ti.start_date is not None:
+            # Airflow keeps the start date of a rescheduled sensor at its first poke.
+            return ti.start_date.timestamp()
+        if self._first_poke is None:
+            self._first_poke = time.time()
+        return self._first_poke
+
+    def recent_commits(self) -> List[Dict[str, Any]]:
+        """Return the latest commits on the branch, newest first, in a single request."""
+        return list(islice(self.hook.log_commits(self.repo, self.branch, size=self.cadence_commits),
+                           self.cadence_commits))
+
+    def adapt_poke_interval(self, context: Dict[Any, Any], commits: List[Dict[str, Any]]) -> None:
+        """Set the interval until the next poke from the cadence of commits."""
+        now = time.time()
+        self._adaptive_poke_interval = next_poke_interval(now, [c['creation_date'] for c in commits],
+                                                          self.poke_interval, self.max_poke_interval,
+                                                          waited=now - self.first_poke_time(context))
+        self.log.info("Next poke of branch '%s' in %.0f seconds", self.branch, self._adaptive_poke_interval)
+
+    def _get_next_poke_interval(self, started_at: Any, run_duration: Callable[[], float],
+                                try_number: int) -> float:
+        if self._adaptive_poke_interval is not None:
+            return self._adaptive_poke_interval
+        return super()._get_next_poke_interval(started_at, run_duration, try_number)
@@ -1,13 +1,17 @@
-from typing import Any, Dict
+from datetime import timedelta
+from typing import Any, Dict, Optional
 
+from airflow.exceptions import AirflowException, AirflowRescheduleException
 from airflow.sensors.base import BaseSensorOperator
 from airflow.utils.decorators import apply_defaults
-from lakefs_sdk.exceptions import NotFoundException
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+from lakefs_provider.sensors.adaptive_poke import AdaptivePokeMixin
+from lakefs_provider.triggers.event_trigger import LakeFSCommitTrigger
 
 
-class LakeFSCommitSensor(BaseSensorOperator):
+class LakeFSCommitSensor(LakeFSProfilingMixin, AdaptivePokeMixin, BaseSensorOperator):
     """
     Executes a get branch operation until that branch was committed.
 
@@ -18,7 +22,27 @@ class LakeFSCommitSensor(BaseSensorOperator):
     :param branch: The branch to sense for.
     :type branch: str
     :param prev_commit_id: If present, previous last commit ID on branch; wait until it changes.
+        Otherwise wait until the branch changes from its head at the first poke.  In
+        reschedule mode that head is kept in an Airflow Variable until the try ends.
+        A try that is killed, marked failed or cleared leaves its Variable behind
+        until the next try of the task deletes it.
     :type prev_commit_id: str
+    :param adaptive_poke: Adapt the poke interval to the commit cadence of the branch:
+        back off while no commit is expected and tighten near the expected
+        next commit, between poke_interval and max_poke_interval.
+    :type adaptive_poke: bool
+    :param max_poke_interval: Longest poke interval in adaptive mode, in seconds.
+    :type max_poke_interval: float
+    :param cadence_commits: Number of recent commits used to estimate the cadence.
+    :type cadence_commits: int
+    :param deferrable: Wait in the triggerer instead of a worker slot.  The trigger
+        wakes on lakeFS webhook events when an event receiver is configured, and
+        checks the branch at least every poke_interval, sharing each check with other
+        deferred sensors that watch the same branch.
+    :type deferrable: bool
+    :param event_receiver_url: URL of the LakeFSEventReceiver used when deferred.
+        Defaults to the connection extra 'event_receiver_url'.
+    :type event_receiver_url: str
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -33,35 +57,122 @@ class LakeFSCommitSensor(BaseSensorOperator):
 
     @apply_defaults
     def __init__(self, lakefs_conn_id: str, repo: str, branch: str, prev_commit_id: str = None,
-                 **kwargs: Any) -> None:
+                 deferrable: bool = False, event_receiver_url: str = None, adaptive_poke: bool = False,
+                 max_poke_interval: float = 3600, cadence_commits: int = 20, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
         self.branch = branch
         self.prev_commit_id = prev_commit_id
+        self.deferrable = deferrable
+        self.event_receiver_url = event_receiver_url
+        self.adaptive_poke = adaptive_poke
+        self.max_poke_interval = max_poke_interval
+        self.cadence_commits = cadence_commits
 
         self.hook = LakeFSHook(lakefs_conn_id)
 
+    @profiled
+    def execute(self, context: Dict[Any, Any]) -> Any:
+        if not self.deferrable:
+            rescheduled = False
+            try:
+                return super().execute(context)
+            except AirflowRescheduleException:
+                rescheduled = True
+                raise
+            finally:
+                if not rescheduled:
+                    self.forget_baseline(context)
+        if self.poke(context):
+            return None
+        self.defer(
+            trigger=LakeFSCommitTrigger(
+                lakefs_conn_id=self.lakefs_conn_id,
+                repo=self.repo,
+                branch=self.branch,
+                prev_commit_id=self.prev_commit_id,
+                poll_interval=self.poke_interval,
+                event_receiver_url=self.event_receiver_url or self.hook.get_event_receiver_url()),
+            method_name="execute_complete",
+            timeout=timedelta(seconds=self.timeout))
+
+    def execute_complete(self, context: Dict[Any, Any], event: Dict[str, Any] = None) -> None:
+        if not event or event.get("status") != "success":
+            raise AirflowException(f"Waiting for commit on branch '{self.branch}' failed: {event}")
+        self.log.info('Previous ref: %s, current ref %s', self.prev_commit_id, event["commit_id"])
+
+    @profiled
     def poke(self, context: Dict[Any, Any]) -> bool:
         if self.prev_commit_id is None:
             self.prev_commit_id = context.get(self.current_commit_id_key, None)
-            if self.prev_commit_id is None:
-                self.prev_commit_id, _ = self.get_commit()
-                return False
 
         self.log.info('Poking: branch %s on repo %s', self.branch, self.repo)
-        curr_commit_id, exists = self.get_commit()
+        curr_commit_id, exists = self.get_commit(context)
+
+        if self.prev_commit_id is None:
+            self.prev_commit_id = self.stored_baseline(context)
+        if self.prev_commit_id is None:
+            self.prev_commit_id = curr_commit_id
+            self.store_baseline(context)
+            return False
         if not exists:
             return False
 
         self.log.info('Previous ref: %s, current ref %s', self.prev_commit_id, curr_commit_id)
         return curr_commit_id != self.prev_commit_id
 
-    def get_commit(self) -> (str, bool):
+    def get_commit(self, context: Dict[Any, Any] = None) -> (str, bool):
+        from lakefs_sdk.exceptions import NotFoundException
+
         try:
-            commit_id = self.hook.get_branch_commit_id(self.repo, self.branch)
+            if self.adaptive_poke:
+                # One page of the log holds both the head and the commit cadence.
+                recent_commits = self.recent_commits()
+                self.adapt_poke_interval(context or {}, recent_commits)
+                commit_id = recent_commits[0]['id']
+            else:
+                commit_id = self.hook.get_branch_commit_id(self.repo, self.branch)
         except NotFoundException:
             self.log.info("Branch '%s' not found in repo '%s'", self.branch, self.repo)
             return None, False
 
         return commit_id, True
+
+    def baseline_variable(self, context: Dict[Any, Any], try_number: Optional[int] = None) -> Optional[str]:
+        """Return the name of the Variable keeping the baseline commit of this
+        try (or of try_number) across reschedules, or None if the sensor keeps
+        it in memory."""
+        ti = context.get('ti')
+        if self.mode != 'reschedule' or self.deferrable or ti is None:
+            return None
+        return f"lakefs_commit_sensor_baseline::{ti.dag_id}::{ti.task_id}::{ti.run_id}::" \
+               f"{ti.map_index}::{try_number or ti.try_number}"
+
+    def stored_baseline(self, context: Dict[Any, Any]) -> Optional[str]:
+        """Return the branch head seen on the first poke of this try, if an
+        earlier reschedule stored it."""
+        name = self.baseline_variable(context)
+        if name is None:
+            return None
+        from airflow.models import Variable
+
+        return Variable.get(name, default_var=None)
+
+    def store_baseline(self, context: Dict[Any, Any]) -> None:
+        name = self.baseline_variable(context)
+        if name is not None and self.prev_commit_id is not None:
+            from airflow.models import Variable
+
+            # Earlier tries that did not finish cleanly left their baseline.
+            for try_number in range(1, context['ti'].try_number):
+                Variable.delete(self.baseline_variable(context, try_number))
+            Variable.set(name, self.prev_commit_id,
+                         description=f"Baseline commit of lakeFS sensor {self.task_id}, deleted when it finishes")
+
+    def forget_baseline(self, context: Dict[Any, Any]) -> None:
+        name = self.baseline_variable(context)
+        if name is not None:
+            from airflow.models import Variable
+
+            Variable.delete(name)
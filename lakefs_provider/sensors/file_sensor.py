@@ -1,13 +1,17 @@
+from datetime import timedelta
 from typing import Any, Dict
 
+from airflow.exceptions import AirflowException
 from airflow.sensors.base import BaseSensorOperator
 from airflow.utils.decorators import apply_defaults
-from lakefs_sdk.exceptions import NotFoundException
 
 from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.profiling import LakeFSProfilingMixin, profiled
+from lakefs_provider.sensors.adaptive_poke import AdaptivePokeMixin
+from lakefs_provider.triggers.event_trigger import LakeFSFileTrigger
 
 
-class LakeFSFileSensor(BaseSensorOperator):
+class LakeFSFileSensor(LakeFSProfilingMixin, AdaptivePokeMixin, BaseSensorOperator):
     """
     Waits for the given file to appear
 
@@ -19,6 +23,23 @@ class LakeFSFileSensor(BaseSensorOperator):
     :type branch: str
     :param path: The path to wait for.
     :type path: str
+    :param deferrable: Wait in the triggerer instead of a worker slot.  The trigger
+        wakes on lakeFS webhook events when an event receiver is configured, and
+        checks the path at least every poke_interval, sharing each check with other
+        deferred sensors that watch the same path (webhooks only fire on
+        commits and merges, not on uncommitted uploads).
+    :type deferrable: bool
+    :param event_receiver_url: URL of the LakeFSEventReceiver used when deferred.
+        Defaults to the connection extra 'event_receiver_url'.
+    :type event_receiver_url: str
+    :param adaptive_poke: Adapt the poke interval to the commit cadence of the branch:
+        back off while no commit is expected and tighten near the expected
+        next commit, between poke_interval and max_poke_interval.
+    :type adaptive_poke: bool
+    :param max_poke_interval: Longest poke interval in adaptive mode, in seconds.
+    :type max_poke_interval: float
+    :param cadence_commits: Number of recent commits used to estimate the cadence.
+    :type cadence_commits: int
     """
 
     # Specify the arguments that are allowed to parse with jinja templating
@@ -29,16 +50,48 @@ class LakeFSFileSensor(BaseSensorOperator):
     ]
 
     @apply_defaults
-    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, path: str, **kwargs: Any) -> None:
+    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, path: str, deferrable: bool = False,
+                 event_receiver_url: str = None, adaptive_poke: bool = False, max_poke_interval: float = 3600,
+                 cadence_commits: int = 20, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.lakefs_conn_id = lakefs_conn_id
         self.repo = repo
         self.branch = branch
         self.path = path
+        self.deferrable = deferrable
+        self.event_receiver_url = event_receiver_url
+        self.adaptive_poke = adaptive_poke
+        self.max_poke_interval = max_poke_interval
+        self.cadence_commits = cadence_commits
 
         self.hook = LakeFSHook(lakefs_conn_id)
 
+    @profiled
+    def execute(self, context: Dict[Any, Any]) -> Any:
+        if not self.deferrable:
+            return super().execute(context)
+        if self.poke(context):
+            return None
+        self.defer(
+            trigger=LakeFSFileTrigger(
+                lakefs_conn_id=self.lakefs_conn_id,
+                repo=self.repo,
+                branch=self.branch,
+                path=self.path,
+                poll_interval=self.poke_interval,
+                event_receiver_url=self.event_receiver_url or self.hook.get_event_receiver_url()),
+            method_name="execute_complete",
+            timeout=timedelta(seconds=self.timeout))
+
+    def execute_complete(self, context: Dict[Any, Any], event: Dict[str, Any] = None) -> None:
+        if not event or event.get("status") != "success":
+            raise AirflowException(f"Waiting for file '{self.path}' failed: {event}")
+        self.log.info("Found file '%s' on branch '%s'", self.path, self.branch)
+
+    @profiled
     def poke(self, context: Dict[Any, Any]) -> bool:
+        from lakefs_sdk.exceptions import NotFoundException
+
         try:
             self.hook.stat_object(self.repo, self.branch, self.path)
             self.log.info("Found file '%s' on branch '%s'", self.path, self.branch)
@@ -46,4 +99,10 @@ class LakeFSFileSensor(BaseSensorOperator):
 
         except NotFoundException:
             self.log.info("File '%s' not found on branch '%s'", self.path, self.branch)
-            return False
+
+        if self.adaptive_poke:
+            try:
+                self.adapt_poke_interval(context, self.recent_commits())
+            except NotFoundException:
+                self.log.info("Branch '%s' not found in repo '%s'", self.branch, self.repo)
+        return False
@@ -0,0 +1,140 @@
+"""Optional OpenTelemetry tracing of lakeFS calls.
+
+When opentelemetry-api is installed, hook calls and operator phases record
+spans named lakefs.<operation> under the current span (such as the Airflow
+task span), with lakefs.* attributes for repo, branch, operation and bytes.
+Each run of a lakeFS operator or sensor records a lakefs.task span around
+them, see lakefs_provider.profiling.profiled.
+Requests to lakeFS carry the trace context in their headers.  Without
+opentelemetry-api or a configured tracer provider, tracing does nothing.
+"""
+import contextlib
+import functools
+import inspect
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from lakefs_provider import __version__
+
+_opentelemetry = None
+
+# Call arguments recorded as span attributes.
+_ARGUMENT_ATTRIBUTES = {
+    "repo": "repo",
+    "repository": "repo",
+    "branch": "branch",
+    "destination_branch": "branch",
+    "ref": "ref",
+    "source_ref": "source_ref",
+    "path": "path",
+}
+
+
+def _trace() -> Optional[Any]:
+    """Return the opentelemetry.trace module, or None if it is not installed."""
+    global _opentelemetry
+    if _opentelemetry is None:
+        try:
+            from opentelemetry import trace
+            _opentelemetry = trace
+        except ImportError:
+            _opentelemetry = False
+    return _opentelemetry or None
+
+
+def enabled() -> bool:
+    return _trace() is not None
+
+
+@contextlib.contextmanager
+def span(operation: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """Record a span lakefs.<operation> around the block, with attributes
+    lakefs.<name> for attributes that are not None.  Yields the span, or None
+    when tracing is disabled.  Exceptions set the span status to error."""
+    trace = _trace()
+    if trace is None:
+        yield None
+        return
+    tracer = trace.get_tracer("lakefs_provider", __version__)
+    attributes = dict(attributes, operation=operation)
+    with tracer.start_as_current_span(f"lakefs.{operation}",
+                                      attributes={f"lakefs.{k}": v for k, v in attributes.items()
+                                                  if v is not None}) as current:
+        yield current
+
+
+def set_attributes(current: Optional[Any], **attributes: Any) -> None:
+    """Set lakefs.<name> attributes on a span yielded by span()."""
+    if current is not None:
+        for k, v in attributes.items():
+            if v is not None:
+                current.set_attribute(f"lakefs.{k}", v)
+
+
+def traced(operation: str) -> Callable:
+    """Decorate a hook method to record a span for each call, tagged with its
+    repo, branch, ref and path arguments and the size of bytes sent or
+    returned."""
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _trace() is None:
+                return func(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs).arguments
+            attributes = {attribute: arguments[name] for name, attribute in _ARGUMENT_ATTRIBUTES.items()
+                          if isinstance(arguments.get(name), str)}
+            if isinstance(arguments.get("content"), (bytes, bytearray)):
+                attributes["bytes"] = len(arguments["content"])
+            with span(operation, **attributes) as current:
+                result = func(*args, **kwargs)
+                if isinstance(result, (bytes, bytearray)):
+                    set_attributes(current, bytes=len(result))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def current_context() -> Optional[Any]:
+    """Return the current trace context, to continue the trace in another
+    thread with attached, or None when tracing is disabled."""
+    if _trace() is None:
+        return None
+    from opentelemetry import context
+
+    return context.get_current()
+
+
+@contextlib.contextmanager
+def attached(trace_context: Optional[Any]) -> Iterator[None]:
+    """Make trace_context from current_context the current trace context of
+    the block, so that spans of another thread keep their parent."""
+    if trace_context is None:
+        yield
+        return
+    from opentelemetry import context
+
+    token = context.attach(trace_context)
+    try:
+        yield
+    finally:
+        context.detach(token)
+
+
+def task_attributes(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Return span attributes identifying the Airflow task run of context."""
+    ti = context.get("ti")
+    if ti is None:
+        return {}
+    return {"dag_id": ti.dag_id, "task_id": ti.task_id, "run_id": ti.run_id, "try_number": ti.try_number}
+
+
+def inject_trace_headers(headers: Dict[str, str]) -> None:
+    """Add the trace context of the current span to request headers."""
+    if _trace() is not None:
+        from opentelemetry.propagate import inject
+
+        inject(headers)
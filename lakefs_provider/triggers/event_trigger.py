@@ -0,0 +1,195 @@
+import asyncio
+import functools
+from abc import abstractmethod
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+from lakefs_provider.events.client import poll_events
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.triggers.poller import get_poller
+
+
+class LakeFSEventTrigger(BaseTrigger):
+    """
+    Base trigger for lakeFS conditions on a branch.  Waits for lakeFS webhook
+    events from a LakeFSEventReceiver, and falls back to checking by polling
+    when no event arrives within poll_interval or when the receiver is
+    unreachable.  Without an event receiver it only polls.
+
+    Checks go through the shared LakeFSPoller, so triggers watching the same
+    resource share a single request to lakeFS per interval.
+
+    Subclasses implement poll_key(), fetch() and evaluate(), and may
+    implement match_events().
+
+    :param lakefs_conn_id: The connection to run the trigger against
+    :type lakefs_conn_id: str
+    :param repo: The lakeFS repo.
+    :type repo: str
+    :param branch: The branch to watch.
+    :type branch: str
+    :param poll_interval: Longest time to wait for an event before checking anyway.
+    :type poll_interval: float
+    :param event_receiver_url: URL of the LakeFSEventReceiver, if any.
+    :type event_receiver_url: str
+    """
+
+    def __init__(self, lakefs_conn_id: str, repo: str, branch: str, poll_interval: float = 60,
+                 event_receiver_url: Optional[str] = None) -> None:
+        super().__init__()
+        self.lakefs_conn_id = lakefs_conn_id
+        self.repo = repo
+        self.branch = branch
+        self.poll_interval = poll_interval
+        self.event_receiver_url = event_receiver_url
+
+    def serialize(self) -> Tuple[str, Dict[str, Any]]:
+        return (f"{self.__class__.__module__}.{self.__class__.__qualname__}", {
+            "lakefs_conn_id": self.lakefs_conn_id,
+            "repo": self.repo,
+            "branch": self.branch,
+            "poll_interval": self.poll_interval,
+            "event_receiver_url": self.event_receiver_url,
+        })
+
+    @abstractmethod
+    def poll_key(self) -> Hashable:
+        """Identify the lakeFS resource fetched, for sharing fetches between triggers."""
+
+    @abstractmethod
+    def fetch(self, hook: LakeFSHook) -> Any:
+        """Fetch the state of the watched resource from lakeFS.  Runs in an executor
+        thread, and its result may be shared with other triggers."""
+
+    @abstractmethod
+    def evaluate(self, state: Any) -> Optional[Dict[str, Any]]:
+        """Return the trigger event payload if the condition holds in state, or None."""
+
+    async def check(self, hook: LakeFSHook, interval: float) -> Optional[Dict[str, Any]]:
+        """Check the condition on lakeFS within interval seconds."""
+        state = await get_poller().poll(self.poll_key(), functools.partial(self.fetch, hook), interval)
+        return self.evaluate(state)
+
+    def match_events(self, events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return the trigger event payload if events alone show that the
+        condition holds, or None to check() it on lakeFS."""
+        return None
+
+    async def _subscribe(self) -> Optional[int]:
+        """Return the current cursor of the event receiver, or None if it is unavailable."""
+        try:
+            cursor, _ = await poll_events(self.event_receiver_url, self.repo, self.branch, None, timeout=0)
+            return cursor
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            self.log.warning("lakeFS event receiver %s unavailable, polling instead: %s",
+                             self.event_receiver_url, e)
+            return None
+
+    async def _wait_for_events(self, cursor: Optional[int]) -> Tuple[Optional[int], Optional[List[Dict[str, Any]]]]:
+        """Long-poll the event receiver for up to poll_interval.  Returns events as
+        None if the receiver is unavailable."""
+        if cursor is None:
+            cursor = await self._subscribe()
+            if cursor is None:
+                return None, None
+        try:
+            return await poll_events(self.event_receiver_url, self.repo, self.branch, cursor,
+                                     timeout=self.poll_interval)
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            self.log.warning("lakeFS event receiver %s unavailable, polling instead: %s",
+                             self.event_receiver_url, e)
+            return None, None
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        hook = LakeFSHook(self.lakefs_conn_id)
+        try:
+            # Subscribe before the first check, so no event falls between them.
+            cursor = await self._subscribe() if self.event_receiver_url else None
+            result = await self.check(hook, 0)
+            while result is None:
+                events = None
+                if self.event_receiver_url:
+                    cursor, events = await self._wait_for_events(cursor)
+                if events:
+                    self.log.info("Got %d lakeFS events on branch '%s' in repo '%s'",
+                                  len(events), self.branch, self.repo)
+                    result = self.match_events(events)
+                if result is None:
+                    # After a long poll the check is due now, otherwise wait for it.
+                    result = await self.check(hook, 0 if events is not None else self.poll_interval)
+            yield TriggerEvent(dict(result, status="success"))
+        except Exception as e:  # pylint: disable=broad-except
+            yield TriggerEvent({"status": "error", "message": str(e)})
+
+
+class LakeFSCommitTrigger(LakeFSEventTrigger):
+    """
+    Fires once the head commit of a branch differs from prev_commit_id.
+
+    :param prev_commit_id: Commit ID of the branch head to wait past.
+    :type prev_commit_id: str
+    """
+
+    def __init__(self, prev_commit_id: Optional[str], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.prev_commit_id = prev_commit_id
+
+    def serialize(self) -> Tuple[str, Dict[str, Any]]:
+        classpath, kwargs = super().serialize()
+        return classpath, dict(kwargs, prev_commit_id=self.prev_commit_id)
+
+    def poll_key(self) -> Hashable:
+        return ("branch", self.lakefs_conn_id, self.repo, self.branch)
+
+    def fetch(self, hook: LakeFSHook) -> Optional[str]:
+        from lakefs_sdk.exceptions import NotFoundException
+
+        try:
+            return hook.get_branch_commit_id(self.repo, self.branch)
+        except NotFoundException:
+            return None
+
+    def evaluate(self, state: Optional[str]) -> Optional[Dict[str, Any]]:
+        if state is None or state == self.prev_commit_id:
+            return None
+        return {"commit_id": state}
+
+    def match_events(self, events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        commit_ids = [event["commit_id"] for event in events if event.get("commit_id")]
+        if commit_ids and commit_ids[-1] != self.prev_commit_id:
+            return {"commit_id": commit_ids[-1]}
+        return None
+
+
+class LakeFSFileTrigger(LakeFSEventTrigger):
+    """
+    Fires once a path exists on a branch.  lakeFS webhooks do not list the
+    changed paths, so every event on the branch is verified with a single stat.
+
+    :param path: The path to wait for.
+    :type path: str
+    """
+
+    def __init__(self, path: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = path
+
+    def serialize(self) -> Tuple[str, Dict[str, Any]]:
+        classpath, kwargs = super().serialize()
+        return classpath, dict(kwargs, path=self.path)
+
+    def poll_key(self) -> Hashable:
+        return ("object", self.lakefs_conn_id, self.repo, self.branch, self.path)
+
+    def fetch(self, hook: LakeFSHook) -> bool:
+        from lakefs_sdk.exceptions import NotFoundException
+
+        try:
+            hook.stat_object(self.repo, self.branch, self.path)
+        except NotFoundException:
+            return False
+        return True
+
+    def evaluate(self, state: bool) -> Optional[Dict[str, Any]]:
+        return {"path": self.path} if state else None
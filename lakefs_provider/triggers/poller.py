@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class _SharedCheck:
+    """One lakeFS check and the triggers waiting for its next result."""
+
+    def __init__(self, poller: "LakeFSPoller", key: Hashable, fetch: Callable[[], Any]) -> None:
+        self.poller = poller
+        self.key = key
+        self.fetch = fetch
+        self.waiters: List[asyncio.Future] = []
+        self.due: Optional[float] = None
+        self.rescheduled = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run())
+
+    def add_waiter(self, interval: float) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        self.waiters.append(future)
+        due = time.monotonic() + interval
+        if self.due is None or due < self.due:
+            self.due = due
+            self.rescheduled.set()
+        return future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            self.waiters = [w for w in self.waiters if not w.done()]
+            if not self.waiters:
+                self.poller.checks.pop(self.key, None)
+                return
+            self.rescheduled.clear()
+            delay = self.due - time.monotonic()
+            if delay > 0:
+                try:
+                    # Wake early if a waiter with a shorter interval arrives.
+                    await asyncio.wait_for(self.rescheduled.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            waiters, self.waiters, self.due = self.waiters, [], None
+            self.poller.fetches += 1
+            try:
+                result = await loop.run_in_executor(None, self.fetch)
+            except Exception as e:  # pylint: disable=broad-except
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+            if not self.waiters:
+                self.due = None
+
+
+class LakeFSPoller:
+    """
+    Coalesces identical lakeFS checks made by triggers in the same triggerer.
+
+    Triggers ask for the next result of a check identified by a key, such as
+    the head of a branch or the existence of a path.  Each distinct key runs
+    at most once per requested interval, and one result is handed to every
+    trigger waiting on that key.  The request rate to lakeFS therefore grows
+    with the number of distinct resources watched, not with the number of
+    deferred sensors.
+    """
+
+    def __init__(self) -> None:
+        self.checks: Dict[Hashable, _SharedCheck] = {}
+        # Number of checks actually sent to lakeFS.
+        self.fetches = 0
+
+    async def poll(self, key: Hashable, fetch: Callable[[], Any], interval: float) -> Any:
+        """Return the result of the next run of the check identified by key.  The
+        check runs within interval seconds, sooner if another waiter needs it
+        sooner.  fetch is a blocking callable, run in an executor thread."""
+        check = self.checks.get(key)
+        if check is None:
+            check = self.checks[key] = _SharedCheck(self, key, fetch)
+        return await check.add_waiter(interval)
+
+
+_pollers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LakeFSPoller]" = weakref.WeakKeyDictionary()
+
+
+def get_poller() -> LakeFSPoller:
+    """Return the LakeFSPoller of the running event loop."""
+    loop = asyncio.get_event_loop()
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = _pollers[loop] = LakeFSPoller()
+    return poller
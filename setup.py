@@ -27,13 +27,27 @@ setup(
     entry_points={
         "apache_airflow_provider": [
             "provider_info=lakefs_provider.__init__:get_provider_info"
+        ],
+        "console_scripts": [
+            "lakefs-airflow-event-receiver=lakefs_provider.events.receiver:main"
+        ],
+        "fsspec.specs": [
+            "lakefs=lakefs_provider.fs.lakefs_fs.LakeFSFileSystem"
         ]
     },
     license='Apache License 2.0',
     packages=['lakefs_provider', 'lakefs_provider.hooks', 'lakefs_provider.links',
               'lakefs_provider.sensors', 'lakefs_provider.operators',
-              'lakefs_provider.example_dags'],
-    install_requires=['apache-airflow>=2.0', 'lakefs_sdk>=0.113.0.2'],
+              'lakefs_provider.example_dags', 'lakefs_provider.fs',
+              'lakefs_provider.events', 'lakefs_provider.triggers',
+              'lakefs_provider.datasets', 'lakefs_provider.manifests', 'lakefs_provider.commit_log'],
+    install_requires=['apache-airflow>=2.4', 'lakefs_sdk>=0.113.0.2,<1.1'],
+    extras_require={
+        'fsspec': ['fsspec>=2023.1.0'],
+        'parquet': ['fsspec>=2023.1.0', 'pyarrow>=10.0.0'],
+        'zstd': ['zstandard>=0.18.0'],
+        'opentelemetry': ['opentelemetry-api>=1.15.0'],
+    },
     setup_requires=['setuptools', 'wheel'],
     author='Treeverse',
     author_email='services@treeverse.io',
@@ -0,0 +1,77 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from airflow.exceptions import AirflowException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.export_commit_log_operator import LakeFSExportCommitLogOperator
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def make_commit(i):
+    metadata = {"::lakefs::Airflow::dag_id": "etl", "::lakefs::Airflow::url[url:ui]": f"http://airflow/{i}",
+                "owner": "data"} if i % 2 else {}
+    return {"id": f"c{i}", "parents": [f"c{i - 1}"] if i else [], "committer": "airflow",
+            "message": f"commit {i}", "creation_date": 1700000000 + i, "meta_range_id": f"m{i}",
+            "metadata": metadata}
+
+
+COMMITS = [make_commit(i) for i in reversed(range(10))]
+
+
+def raw_log(resource_path, query):
+    query = dict(query)
+    start = int(query["after"] or 0)
+    end = start + query["amount"]
+    return Mock(data=json.dumps({"results": COMMITS[start:end],
+                                 "pagination": {"has_more": end < len(COMMITS), "next_offset": str(end)}}))
+
+
+@patch.object(LakeFSHook, "_get_raw", side_effect=raw_log)
+def test_log_commit_pages_prefetches_all_pages(mock_get_raw):
+    hook = LakeFSHook(lakefs_conn_id="")
+
+    pages = list(hook.log_commit_pages("repo", "main", size=3))
+
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [commit["id"] for page in pages for commit in page] == [commit["id"] for commit in COMMITS]
+
+
+@patch.object(LakeFSHook, "_get_raw", side_effect=raw_log)
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", side_effect=lambda repo, ref: {"id": {"main": "c9", "v1": "c2"}[ref]})
+@patch.object(LakeFSHook, "find_merge_base", return_value="c2")
+def test_export_stops_at_since_ref(mock_find_merge_base, mock_get_commit, mock_ensure_healthy, mock_get_raw,
+                                   tmp_path):
+    output_path = str(tmp_path / "log.parquet")
+    operator = LakeFSExportCommitLogOperator(task_id="export", lakefs_conn_id="", repo="repo", ref="main",
+                                             since_ref="v1", output_path=output_path, page_size=4)
+
+    assert operator.execute({}) == {"commit_id": "c9", "commits": 7, "output_path": output_path}
+
+    parquet = pq.ParquetFile(output_path)
+    assert parquet.num_row_groups == 2
+    rows = parquet.read().to_pylist()
+    assert [row["id"] for row in rows] == [f"c{i}" for i in reversed(range(3, 10))]
+    assert rows[0]["airflow_dag_id"] == "etl"
+    assert rows[0]["airflow_url_ui"] == "http://airflow/9"
+    assert rows[0]["metadata"] == [("owner", "data")]
+    assert rows[1]["airflow_dag_id"] is None
+
+
+@patch.object(LakeFSHook, "_get_raw", side_effect=raw_log)
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", side_effect=lambda repo, ref: {"id": {"main": "c9", "other": "x1"}[ref]})
+@patch.object(LakeFSHook, "find_merge_base", return_value="c0")
+def test_export_rejects_since_ref_off_history(mock_find_merge_base, mock_get_commit, mock_ensure_healthy,
+                                              mock_get_raw, tmp_path):
+    operator = LakeFSExportCommitLogOperator(task_id="export", lakefs_conn_id="", repo="repo", ref="main",
+                                             since_ref="other", output_path=str(tmp_path / "log.parquet"))
+
+    with pytest.raises(AirflowException, match="is not an ancestor"):
+        operator.execute({})
+
+    mock_find_merge_base.assert_called_once_with("repo", "c9", "x1")
+    mock_get_raw.assert_not_called()
@@ -0,0 +1,63 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.object_stats import ObjectStats
+from lakefs_sdk.models.object_stats_list import ObjectStatsList
+from lakefs_sdk.models.pagination import Pagination
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+pytest.importorskip("fsspec")
+
+from lakefs_provider.fs.lakefs_fs import LakeFSFileSystem  # noqa: E402
+
+
+def _stats(path, path_type="object", size=0):
+    return ObjectStats(path=path, path_type=path_type, physical_address="", checksum="", mtime=0,
+                       size_bytes=size)
+
+
+def _page(results, has_more=False, next_offset=""):
+    return ObjectStatsList(results=results,
+                           pagination=Pagination(has_more=has_more, next_offset=next_offset,
+                                                 results=len(results), max_per_page=1000))
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_ls_pages_through_listing(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.objects_api.list_objects.side_effect = [
+        _page([_stats("data/a.parquet", size=3)], has_more=True, next_offset="data/a.parquet"),
+        _page([_stats("data/sub/", path_type="common_prefix")]),
+    ]
+
+    fs = LakeFSFileSystem(lakefs_conn_id="", skip_instance_cache=True)
+
+    assert fs.ls("lakefs://repo/main/data", detail=False) == ["repo/main/data/a.parquet", "repo/main/data/sub"]
+    assert mock_client.objects_api.list_objects.call_args.kwargs["after"] == "data/a.parquet"
+    assert mock_client.objects_api.list_objects.call_args.kwargs["delimiter"] == "/"
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_open_reads_ranges(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.objects_api.stat_object.return_value = _stats("a.bin", size=10)
+    mock_client.objects_api.get_object.return_value = bytearray(b"6789")
+
+    fs = LakeFSFileSystem(lakefs_conn_id="", default_cache_type="none", skip_instance_cache=True)
+    with fs.open("lakefs://repo/main/a.bin") as f:
+        f.seek(6)
+        assert f.read() == b"6789"
+
+    mock_client.objects_api.get_object.assert_called_once_with(
+        repository="repo", ref="main", path="a.bin", range="bytes=6-9")
+
+
+def test_open_rejects_unsupported_mode():
+    fs = LakeFSFileSystem(lakefs_conn_id="", skip_instance_cache=True)
+    with pytest.raises(ValueError, match="do not support mode 'ab'"):
+        fs.open("lakefs://repo/main/a.bin", "ab")
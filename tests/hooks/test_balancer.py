@@ -0,0 +1,70 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import lakefs_sdk
+import pytest
+
+from lakefs_provider.hooks.balancer import BalancedRESTClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.paths.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    started = []
+    for _ in range(2):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        server.paths = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append(server)
+    yield started
+    for server in started:
+        server.shutdown()
+
+
+def _unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _client(endpoints, **kwargs):
+    configuration = lakefs_sdk.Configuration(host=f"{endpoints[0]}/api/v1")
+    return BalancedRESTClient(configuration, endpoints, **kwargs)
+
+
+def test_round_robin_spreads_requests(servers):
+    client = _client([f"http://127.0.0.1:{s.server_port}" for s in servers], policy="round_robin")
+    for _ in range(4):
+        client.request("GET", f"http://127.0.0.1:{servers[0].server_port}/api/v1/repositories")
+
+    assert [len(s.paths) for s in servers] == [2, 2]
+    assert servers[1].paths[0] == "/api/v1/repositories"
+
+
+def test_fails_over_and_ejects_unreachable_endpoint(servers):
+    dead = f"http://127.0.0.1:{_unused_port()}"
+    client = _client([dead, f"http://127.0.0.1:{servers[0].server_port}"], probe_interval=60)
+    try:
+        for _ in range(3):
+            client.request("POST", f"{dead}/api/v1/repositories", body={})
+    finally:
+        client.close()
+
+    assert len(servers[0].paths) == 3
+    assert not client.endpoints[0].healthy
+    assert client.endpoints[1].healthy
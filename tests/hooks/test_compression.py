@@ -0,0 +1,99 @@
+import gzip
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import pytest
+from airflow.models import Connection
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.object_stats import ObjectStats
+
+from lakefs_provider.hooks.compression import compress_stream, decompress_stream
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+CONTENT = b"id,name\n" + b"".join(b"%d,row-%d\n" % (i, i) for i in range(10000))
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_round_trip(codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    compressed = io.BytesIO()
+    compress_stream(io.BytesIO(CONTENT), compressed, codec)
+    compressed.seek(0)
+
+    assert len(compressed.getvalue()) < len(CONTENT) / 3
+    assert decompress_stream(compressed, codec).read() == CONTENT
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_closing_decompressed_stream_releases_response(codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    compressed = io.BytesIO()
+    compress_stream(io.BytesIO(CONTENT), compressed, codec)
+    response = io.BytesIO(compressed.getvalue())
+    response.release_conn = Mock()
+
+    with decompress_stream(response, codec) as reader:
+        assert reader.read(8) == b"id,name\n"
+
+    assert response.closed
+    if codec == "gzip":
+        response.release_conn.assert_called_once_with()
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_upload_records_codec(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    uploaded = {}
+
+    def upload_object(content, _headers, **kwargs):
+        with open(content, "rb") as f:
+            uploaded["content"] = f.read()
+        uploaded["headers"] = _headers
+        return ObjectStats(path="data.csv", path_type="object", physical_address="s3://bucket/data.csv",
+                           checksum="", mtime=0)
+
+    mock_client.objects_api.upload_object.side_effect = upload_object
+
+    hook = LakeFSHook(lakefs_conn_id="")
+    assert hook.upload("repo", "main", "data.csv", CONTENT, compression="gzip") == "s3://bucket/data.csv"
+    assert gzip.decompress(uploaded["content"]) == CONTENT
+    assert uploaded["headers"] == {"X-Lakefs-Meta-Airflow-Compression": "gzip"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = gzip.compress(CONTENT)
+        self.server.requests.append((self.path, self.headers.get("Authorization")))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_open_object_detects_codec():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = Connection(conn_type="lakefs", host=f"http://127.0.0.1:{server.server_port}",
+                            login="key", password="secret")
+    try:
+        with patch.object(LakeFSHook, "get_connection", return_value=connection), \
+                patch.object(LakeFSHook, "stat_object", return_value={"metadata": {"Airflow-Compression": "gzip"}}):
+            hook = LakeFSHook(lakefs_conn_id="")
+            with hook.open_object("repo", "main", "dir/data.csv") as reader:
+                assert reader.read(8) == b"id,name\n"
+                assert reader.read() == CONTENT[8:]
+    finally:
+        server.shutdown()
+
+    path, authorization = server.requests[0]
+    assert path == "/api/v1/repositories/repo/refs/main/objects?path=dir/data.csv"
+    assert authorization.startswith("Basic ")
@@ -0,0 +1,69 @@
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+CONTENT = b"".join(b"line %d\n" % i for i in range(1000))
+
+
+@pytest.fixture
+def hook():
+    hook = LakeFSHook(lakefs_conn_id="")
+    ranges = []
+
+    def read_range(repo, ref, path, start, end=None):
+        ranges.append((start, end))
+        return CONTENT[start:end]
+
+    with patch.object(LakeFSHook, "read_range", side_effect=read_range), \
+            patch.object(LakeFSHook, "stat_object", return_value={"size_bytes": len(CONTENT)}), \
+            patch.object(LakeFSHook, "open_object", side_effect=lambda *args, **kwargs: io.BytesIO(CONTENT)):
+        hook.ranges = ranges
+        yield hook
+
+
+def test_head_lines(hook):
+    assert hook.head_lines("repo", "main", "data.csv", 3) == ["line 0", "line 1", "line 2"]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 65536])
+def test_tail_lines_reads_backwards(hook, chunk_size):
+    assert hook.tail_lines("repo", "main", "data.csv", 3, chunk_size=chunk_size) == \
+        ["line 997", "line 998", "line 999"]
+    assert hook.ranges[0] == (len(CONTENT) - min(chunk_size, len(CONTENT)), len(CONTENT))
+    if chunk_size == 64:
+        assert len(hook.ranges) == 1
+
+
+def test_sample_lines(hook):
+    sample = hook.sample_lines("repo", "main", "data.csv", 10, skip_lines=1, seed=1)
+
+    assert len(sample) == 10
+    assert "line 0" not in sample
+    assert sample == sorted(sample, key=lambda line: int(line.split()[1]))
+
+
+def test_tail_lines_reads_at_most_max_bytes(hook):
+    assert hook.tail_lines("repo", "main", "data.csv", 100, chunk_size=7, max_bytes=20) == ["line 998", "line 999"]
+    assert min(start for start, _ in hook.ranges) == len(CONTENT) - 20
+
+
+def test_long_lines_are_truncated():
+    from lakefs_provider.hooks.lakefs_hook import _iter_lines
+
+    data = b"a" * 200000 + b"\r\nb\n" + b"c" * 10
+    assert list(_iter_lines(io.BytesIO(data), max_line_bytes=5)) == [b"aaaaa", b"b", b"ccccc"]
+    assert list(_iter_lines(io.BytesIO(data))) == [b"a" * 200000, b"b", b"c" * 10]
+
+
+def test_read_range_suffix():
+    from lakefs_sdk.client import LakeFSClient
+
+    hook = LakeFSHook(lakefs_conn_id="")
+    with patch.object(LakeFSHook, "get_conn", return_value=Mock(LakeFSClient)()) as get_conn:
+        hook.read_range("repo", "main", "data.csv", -10)
+
+    get_conn.return_value.objects_api.get_object.assert_called_once_with(
+        repository="repo", ref="main", path="data.csv", range="bytes=-10")
@@ -0,0 +1,62 @@
+from unittest.mock import Mock, patch
+
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.exceptions import NotFoundException
+from lakefs_sdk.models.object_stats import ObjectStats
+from lakefs_sdk.models.object_stats_list import ObjectStatsList
+from lakefs_sdk.models.pagination import Pagination
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+
+def _stats(path):
+    return ObjectStats(path=path, path_type="object", physical_address="", checksum="", mtime=0, size_bytes=1)
+
+
+def _page(results, has_more=False):
+    return ObjectStatsList(results=results,
+                           pagination=Pagination(has_more=has_more, next_offset=results[-1].path if results else "",
+                                                 results=len(results), max_per_page=1000))
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_clustered_paths_are_listed_and_sparse_paths_stated(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    clustered = [f"data/part-{i:04}.parquet" for i in range(40)]
+    # Every other part exists.
+    mock_client.objects_api.list_objects.side_effect = [
+        _page([_stats(path) for path in clustered[::2]])]
+
+    def stat_object(repository, ref, path):
+        if path == "missing/file":
+            raise NotFoundException(status=404, reason="Not Found")
+        return _stats(path)
+
+    mock_client.objects_api.stat_object.side_effect = stat_object
+
+    result = LakeFSHook(lakefs_conn_id="").stat_objects("repo", "main", clustered + ["meta/_SUCCESS", "missing/file"])
+
+    assert list(result) == clustered + ["meta/_SUCCESS", "missing/file"]
+    assert [path for path, stats in result.items() if stats is None] == clustered[1::2] + ["missing/file"]
+    assert mock_client.objects_api.list_objects.call_count == 1
+    assert mock_client.objects_api.list_objects.call_args.kwargs["after"] == "data/part-0000.parque"
+    assert mock_client.objects_api.stat_object.call_count == 2
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_long_listing_falls_back_to_stat(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    wanted = [f"data/{i:05}" for i in range(0, 32000, 1000)]
+    # A dense directory: 32 wanted paths (2 listing pages allowed) among 32000 objects.
+    mock_client.objects_api.list_objects.side_effect = [
+        _page([_stats(f"data/{i:05}") for i in range(start, start + 1000)], has_more=True)
+        for start in range(0, 32000, 1000)]
+    mock_client.objects_api.stat_object.side_effect = lambda repository, ref, path: _stats(path)
+
+    result = LakeFSHook(lakefs_conn_id="").stat_objects("repo", "main", wanted)
+
+    assert all(stats is not None for stats in result.values())
+    assert mock_client.objects_api.list_objects.call_count == 2
+    assert mock_client.objects_api.stat_object.call_count == 30
@@ -0,0 +1,64 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow.models import Connection
+from lakefs_sdk.client import LakeFSClient
+
+from lakefs_provider.hooks import lakefs_hook
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.hooks.rest_clients import TimeoutRESTClient
+
+
+def _connection(**extra):
+    return Connection(conn_type="lakefs", host="http://lakefs:8000", login="key", password="secret",
+                      extra=json.dumps(extra))
+
+
+@pytest.mark.parametrize("extra, timeout", [
+    ({}, None),
+    ({"total_timeout": 60}, 60),
+    ({"connect_timeout": 3, "read_timeout": 120, "total_timeout": 60}, (3, 60)),
+    ({"read_timeout": 30}, (None, 30)),
+])
+def test_get_timeout(extra, timeout):
+    assert LakeFSHook.get_timeout(_connection(**extra)) == timeout
+
+
+def test_requests_get_connection_timeout():
+    with patch.object(LakeFSHook, "get_connection", return_value=_connection(connect_timeout=3, read_timeout=30)):
+        client = LakeFSHook(lakefs_conn_id="timeouts").get_conn()
+    rest_client = client._api.rest_client
+    while not isinstance(rest_client, TimeoutRESTClient):
+        # Skip the tracing wrapper, if any.
+        rest_client = rest_client.rest_client
+
+    rest_client.rest_client = Mock()
+    rest_client.get_request("http://lakefs:8000/api/v1/healthcheck")
+    rest_client.get_request("http://lakefs:8000/api/v1/healthcheck", _request_timeout=1)
+    timeouts = [call.kwargs["_request_timeout"] for call in rest_client.rest_client.request.call_args_list]
+    assert timeouts == [(3, 30), 1]
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_health_probe_is_cached_and_fails_fast(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.health_check_api.health_check.side_effect = OSError("connection refused")
+    lakefs_hook._health_probes.pop("down", None)
+
+    hook = LakeFSHook(lakefs_conn_id="down")
+    for _ in range(3):
+        with pytest.raises(AirflowException, match="connection refused"):
+            hook.ensure_healthy()
+
+    assert mock_client.health_check_api.health_check.call_count == 1
+    assert mock_client.health_check_api.health_check.call_args.kwargs["_request_timeout"] == 5
+
+
+def test_base_url_requires_an_endpoint():
+    connection = Connection(conn_type="lakefs", login="key", password="secret")
+    with patch.object(LakeFSHook, "get_connection", return_value=connection):
+        with pytest.raises(AirflowException, match="endpoint must be specified"):
+            LakeFSHook(lakefs_conn_id="").get_base_url()
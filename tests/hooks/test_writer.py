@@ -0,0 +1,75 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from airflow.exceptions import AirflowException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+
+
+def test_writer_applies_backpressure_and_commits():
+    hook = LakeFSHook(lakefs_conn_id="")
+    release = threading.Event()
+    uploaded = []
+
+    def upload(repo, branch, path, content, compression=None):
+        release.wait()
+        uploaded.append(path)
+        return path
+
+    with patch.object(LakeFSHook, "upload", side_effect=upload), \
+            patch.object(LakeFSHook, "commit", return_value="c1") as mock_commit:
+        with hook.writer("repo", "branch", max_workers=2, max_pending=3, commit_message="msg") as writer:
+            for i in range(3):
+                writer.write(f"out/{i}", b"data")
+            blocked = threading.Thread(target=writer.write, args=("out/3", b"data"))
+            blocked.start()
+            blocked.join(0.2)
+            # The queue is full until an upload completes.
+            assert blocked.is_alive()
+            release.set()
+            blocked.join()
+
+    assert sorted(uploaded) == [f"out/{i}" for i in range(4)]
+    assert writer.uploaded == 4
+    assert writer.commit_id == "c1"
+    mock_commit.assert_called_once_with("repo", "branch", "msg", {})
+
+
+def test_writer_raises_first_error_on_flush():
+    hook = LakeFSHook(lakefs_conn_id="")
+
+    def upload(repo, branch, path, content, compression=None):
+        if path in ("out/3", "out/5"):
+            raise IOError(f"cannot upload {path}")
+        return path
+
+    with patch.object(LakeFSHook, "upload", side_effect=upload), patch.object(LakeFSHook, "commit") as mock_commit:
+        with pytest.raises(AirflowException, match="Failed to upload 2 of 8 objects.*first 'out/3'"):
+            with hook.writer("repo", "branch", commit_message="msg") as writer:
+                for i in range(8):
+                    writer.write(f"out/{i}", b"data")
+
+    mock_commit.assert_not_called()
+
+
+def test_writer_workers_share_one_client():
+    hook = LakeFSHook(lakefs_conn_id="")
+    created = []
+
+    def create_client():
+        # Slow enough for all workers to find no client yet.
+        threading.Event().wait(0.1)
+        created.append(object())
+        return created[-1]
+
+    def upload(repo, branch, path, content, compression=None):
+        return hook.get_conn()
+
+    with patch.object(LakeFSHook, "_create_client", side_effect=create_client), \
+            patch.object(LakeFSHook, "upload", side_effect=upload):
+        with hook.writer("repo", "branch", max_workers=8) as writer:
+            for i in range(8):
+                writer.write(f"out/{i}", b"data")
+
+    assert len(created) == 1
@@ -0,0 +1,26 @@
+import io
+
+import pytest
+
+from lakefs_provider.manifests.manifest import ManifestEntry, diff_manifests, read_manifest, write_manifest
+
+OLD = [ManifestEntry("a", 1, "c1", 10), ManifestEntry("b", 2, "c2", 10), ManifestEntry("d", 4, "c4", 10)]
+NEW = [ManifestEntry("a", 1, "c1", 20), ManifestEntry("c", 3, "c3", 20), ManifestEntry("d", 5, "c5", 20),
+       ManifestEntry("e/ü", 6, "c6", 20)]
+
+
+@pytest.mark.parametrize("manifest_format", ["binary", "parquet"])
+def test_round_trip(manifest_format):
+    if manifest_format == "parquet":
+        pytest.importorskip("pyarrow")
+    out = io.BytesIO()
+    assert write_manifest(iter(NEW), out, manifest_format) == len(NEW)
+    out.seek(0)
+
+    assert list(read_manifest(out)) == NEW
+
+
+def test_diff_is_a_streaming_merge_join():
+    changes = [(change.change, change.path) for change in diff_manifests(iter(OLD), iter(NEW))]
+
+    assert changes == [("removed", "b"), ("added", "c"), ("modified", "d"), ("added", "e/ü")]
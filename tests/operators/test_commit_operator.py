@@ -0,0 +1,78 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from airflow.datasets import Dataset
+from airflow.exceptions import AirflowException, AirflowSkipException
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.commit import Commit
+
+from lakefs_provider.datasets.lakefs_dataset import get_triggering_commit
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.commit_operator import LakeFSCommitOperator
+
+
+@patch.object(LakeFSHook, "get_conn")
+def test_commit_emits_dataset(mock_conn):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.commits_api.commit.return_value = Commit(
+        id="c1", parents=[], committer="", message="", creation_date=0, meta_range_id="")
+
+    operator = LakeFSCommitOperator(task_id="commit", lakefs_conn_id="", repo="repo", branch="main",
+                                    msg="msg", metadata={}, emit_dataset=True)
+    assert operator.outlets == [Dataset("lakefs://repo/main")]
+
+    event = SimpleNamespace(extra={})
+    outlet_events = MagicMock()
+    outlet_events.__getitem__.return_value = event
+    with patch.object(LakeFSHook, "get_base_url"), patch("lakefs_provider.links.lakefs_link.LakeFSLink.persist"):
+        assert operator.execute({"outlet_events": outlet_events}) == "c1"
+
+    outlet_events.__getitem__.assert_called_once_with(Dataset("lakefs://repo/main"))
+    assert event.extra == {"commit_id": "c1"}
+    context = {"triggering_dataset_events": {"lakefs://repo/main": [event]}}
+    assert get_triggering_commit(context, "repo", "main") == "c1"
+
+
+@patch.object(LakeFSHook, "diff_branch", return_value=iter([]))
+@patch.object(LakeFSHook, "get_conn")
+def test_skip_empty_commit(mock_conn, mock_diff_branch):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+
+    operator = LakeFSCommitOperator(task_id="commit", lakefs_conn_id="", repo="repo", branch="main",
+                                    msg="msg", metadata={}, on_empty="skip")
+    with pytest.raises(AirflowSkipException):
+        operator.execute({})
+
+    mock_client.commits_api.commit.assert_not_called()
+
+
+@patch.object(LakeFSHook, "diff_branch", return_value=iter([
+    {"type": "added", "path": "raw/a.csv"}, {"type": "added", "path": "raw/b.csv"},
+    {"type": "removed", "path": "clean/a.csv"}, {"type": "changed", "path": "README"}]))
+@patch.object(LakeFSHook, "get_conn")
+def test_commit_adds_diff_summary(mock_conn, mock_diff_branch):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.commits_api.commit.return_value = Commit(
+        id="c1", parents=[], committer="", message="", creation_date=0, meta_range_id="")
+
+    operator = LakeFSCommitOperator(task_id="commit", lakefs_conn_id="", repo="repo", branch="main",
+                                    msg="msg", metadata={}, on_empty="head")
+    with patch.object(LakeFSHook, "get_base_url"), patch("lakefs_provider.links.lakefs_link.LakeFSLink.persist"):
+        assert operator.execute({}) == "c1"
+
+    metadata = mock_client.commits_api.commit.call_args.kwargs["commit_creation"].metadata
+    assert json.loads(metadata["::lakefs::Airflow::diff_summary"]) == {
+        "changes": {"added": 2, "removed": 1, "changed": 1},
+        "prefixes": {"raw/": 2, "clean/": 1, "": 1},
+    }
+
+
+def test_head_on_empty_cannot_emit_dataset():
+    with pytest.raises(AirflowException, match="use on_empty='skip'"):
+        LakeFSCommitOperator(task_id="commit", lakefs_conn_id="", repo="repo", branch="main", msg="msg",
+                             metadata={}, on_empty="head", emit_dataset=True)
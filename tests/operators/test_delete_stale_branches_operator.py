@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.commit import Commit
+from lakefs_sdk.models.pagination import Pagination
+from lakefs_sdk.models.ref import Ref
+from lakefs_sdk.models.ref_list import RefList
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.delete_stale_branches_operator import LakeFSDeleteStaleBranchesOperator
+
+DAY = 24 * 60 * 60
+
+
+def _refs(*names, has_more=False):
+    return RefList(results=[Ref(id=name, commit_id=f"{name}-head") for name in names],
+                   pagination=Pagination(has_more=has_more, next_offset=names[-1], results=len(names),
+                                         max_per_page=1000))
+
+
+@pytest.fixture
+def mock_client():
+    with patch.object(LakeFSHook, "get_conn") as mock_conn, \
+            patch.object(LakeFSHook, "has_uncommitted_changes", return_value=False):
+        client = Mock(LakeFSClient)()
+        mock_conn.return_value = client
+        client.branches_api.list_branches.side_effect = [_refs("run-1", "run-2", has_more=True),
+                                                         _refs("run-3", "runner")]
+        ages = {"run-1-head": 10 * DAY, "run-2-head": DAY, "run-3-head": 30 * DAY, "runner-head": 30 * DAY}
+        client.commits_api.get_commit.side_effect = lambda repo, ref: Commit(
+            id=ref, parents=[], committer="", message="", creation_date=int(time.time() - ages[ref]),
+            meta_range_id="")
+        yield client
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+def test_deletes_old_matching_branches(mock_client, dry_run):
+    operator = LakeFSDeleteStaleBranchesOperator(task_id="gc", lakefs_conn_id="", repo="repo", pattern="run-*",
+                                                 older_than=timedelta(days=7), dry_run=dry_run)
+    report = operator.execute({})
+
+    assert mock_client.branches_api.list_branches.call_args.kwargs["prefix"] == "run-"
+    assert report["matched"] == 3
+    assert sorted(report["stale"]) == ["run-1", "run-3"]
+    deleted = sorted(call.kwargs["branch"] for call in mock_client.branches_api.delete_branch.call_args_list)
+    assert deleted == ([] if dry_run else ["run-1", "run-3"])
+    assert sorted(report["deleted"]) == deleted
+
+
+def test_keeps_fresh_branch_with_uncommitted_changes(mock_client):
+    # A fresh branch has the head of its source: merged, and as old as that head.
+    mock_client.refs_api.find_merge_base.side_effect = lambda repo, source, destination: Mock(
+        base_commit_id=f"{source}-head")
+    operator = LakeFSDeleteStaleBranchesOperator(task_id="gc", lakefs_conn_id="", repo="repo", pattern="run-*",
+                                                 older_than=timedelta(days=7), merged_into="main")
+
+    with patch.object(LakeFSHook, "has_uncommitted_changes", side_effect=lambda repo, branch: branch == "run-3"):
+        report = operator.execute({})
+
+    assert report["stale"] == ["run-1"]
+    mock_client.branches_api.delete_branch.assert_called_once()
+    assert mock_client.branches_api.delete_branch.call_args.kwargs["branch"] == "run-1"
+
+
+def test_merged_criterion(mock_client):
+    mock_client.refs_api.find_merge_base.side_effect = lambda repo, source, destination: Mock(
+        base_commit_id="run-1-head" if source == "run-1" else "older")
+
+    operator = LakeFSDeleteStaleBranchesOperator(task_id="gc", lakefs_conn_id="", repo="repo", pattern="run-*",
+                                                 merged_into="main", dry_run=True)
+
+    assert operator.execute({})["stale"] == ["run-1"]
+
+
+def test_listing_advances_with_deletions():
+    listed, checked, ahead = [], [], []
+
+    def list_branches(repo, prefix=''):
+        for i in range(20):
+            ahead.append(len(listed) - len(checked))
+            listed.append(i)
+            yield {"id": f"run-{i}", "commit_id": f"c{i}"}
+
+    def is_stale(hook, branch, now):
+        time.sleep(0.001)
+        checked.append(branch["id"])
+        return False
+
+    operator = LakeFSDeleteStaleBranchesOperator(task_id="gc", lakefs_conn_id="", repo="repo", pattern="run-*",
+                                                 older_than=DAY, max_workers=2)
+    with patch.object(LakeFSHook, "ensure_healthy"), \
+            patch.object(LakeFSHook, "list_branches", side_effect=list_branches), \
+            patch.object(LakeFSDeleteStaleBranchesOperator, "is_stale", side_effect=is_stale):
+        assert operator.execute({})["matched"] == 20
+
+    # At most a window of 2 * max_workers branches is listed ahead of the checks.
+    assert max(ahead) <= 4
@@ -0,0 +1,61 @@
+import io
+from unittest.mock import patch
+
+import pytest
+from airflow.exceptions import AirflowException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.manifests.manifest import ManifestEntry, read_manifest
+from lakefs_provider.operators.manifest_operator import LakeFSManifestOperator
+
+OBJECTS = [{"path": f"data/part-{i}.csv", "size_bytes": i, "checksum": f"c{i}", "mtime": 100 + i} for i in range(3)]
+ENTRIES = [ManifestEntry(stats["path"], stats["size_bytes"], stats["checksum"], stats["mtime"]) for stats in OBJECTS]
+
+
+@pytest.fixture(autouse=True)
+def lakefs():
+    with patch.object(LakeFSHook, "ensure_healthy"), \
+            patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"}), \
+            patch.object(LakeFSHook, "list_objects", return_value=iter(OBJECTS)) as mock_list_objects:
+        yield mock_list_objects
+
+
+def test_writes_local_manifest(lakefs, tmp_path):
+    destination = tmp_path / "manifest.bin"
+    destination.write_bytes(b"previous")
+    operator = LakeFSManifestOperator(task_id="manifest", lakefs_conn_id="", repo="repo", ref="main",
+                                      prefix="data/", destination=str(destination))
+
+    assert operator.execute({}) == {"commit_id": "c1", "destination": str(destination), "objects": 3}
+
+    # The snapshot lists the commit, not the branch.
+    assert lakefs.call_args.args == ("repo", "c1")
+    with open(destination, "rb") as manifest:
+        assert list(read_manifest(manifest)) == ENTRIES
+    assert [path.name for path in tmp_path.iterdir()] == ["manifest.bin"]
+
+
+@patch.object(LakeFSHook, "upload_file")
+def test_uploads_manifest_to_lakefs(mock_upload_file):
+    uploaded = {}
+
+    def upload_file(repo, branch, path, local_path):
+        with open(local_path, "rb") as manifest:
+            uploaded[(repo, branch, path)] = manifest.read()
+
+    mock_upload_file.side_effect = upload_file
+    operator = LakeFSManifestOperator(task_id="manifest", lakefs_conn_id="", repo="repo", ref="main",
+                                      prefix="data/", destination="lakefs://out/main/manifests/run.bin")
+
+    assert operator.execute({})["objects"] == 3
+
+    assert list(uploaded) == [("out", "main", "manifests/run.bin")]
+    assert list(read_manifest(io.BytesIO(uploaded["out", "main", "manifests/run.bin"]))) == ENTRIES
+
+
+def test_rejects_incomplete_lakefs_destination():
+    operator = LakeFSManifestOperator(task_id="manifest", lakefs_conn_id="", repo="repo", ref="main",
+                                      prefix="data/", destination="lakefs://out/main")
+
+    with pytest.raises(AirflowException, match="is not lakefs://<repo>/<branch>/<path>"):
+        operator.execute({})
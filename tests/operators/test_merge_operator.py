@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from airflow.exceptions import AirflowException
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.merge_result import MergeResult
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.merge_operator import LakeFSMergeOperator, merge_queue_pool
+
+
+def test_merge_queue_runs_in_branch_pool():
+    operator = LakeFSMergeOperator(task_id="merge", lakefs_conn_id="", repo="repo", source_ref="feature",
+                                   destination_branch="main", msg="msg", metadata={}, merge_queue=True)
+    assert operator.pool == merge_queue_pool("repo", "main")
+
+    with pytest.raises(AirflowException, match="templated"):
+        LakeFSMergeOperator(task_id="merge", lakefs_conn_id="", repo="repo", source_ref="feature",
+                            destination_branch="{{ params.branch }}", msg="msg", merge_queue=True)
+    with pytest.raises(AirflowException, match="pool"):
+        LakeFSMergeOperator(task_id="merge", lakefs_conn_id="", repo="repo", source_ref="feature",
+                            destination_branch="main", msg="msg", merge_queue=True, pool="other")
+
+
+@patch.object(LakeFSHook, "get_base_url")
+@patch.object(LakeFSHook, "get_conn")
+def test_merge_queue_reports_wait_and_merge_times(mock_conn, _):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.refs_api.merge_into_branch.return_value = MergeResult(reference="c1")
+
+    operator = LakeFSMergeOperator(task_id="merge", lakefs_conn_id="", repo="repo", source_ref="feature",
+                                   destination_branch="main", msg="msg", metadata={}, merge_queue=True)
+    ready = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ti = Mock(start_date=ready + timedelta(seconds=30))
+    upstream = Mock(task_id="write", end_date=ready)
+    context = {"ti": ti, "task": Mock(upstream_task_ids={"write"}),
+               "dag_run": Mock(start_date=ready - timedelta(hours=1),
+                               get_task_instances=Mock(return_value=[upstream]))}
+    with patch("lakefs_provider.links.lakefs_link.LakeFSLink.persist"):
+        assert operator.execute(context) == "c1"
+
+    pushed = {call.kwargs["key"]: call.kwargs["value"] for call in ti.xcom_push.call_args_list}
+    assert pushed["queue_wait_seconds"] == 30
+    assert pushed["merge_seconds"] >= 0
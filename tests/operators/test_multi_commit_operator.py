@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from airflow.exceptions import AirflowException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.multi_commit_operator import LakeFSMultiCommitOperator
+
+TARGETS = [("repo-a", "tenant-1"), ("repo-a", "tenant-2", "own message"), {"repo": "repo-b", "branch": "tenant-3"}]
+
+
+def commit(repo, branch, msg, metadata):
+    if branch == "tenant-2":
+        raise IOError("lakeFS is down")
+    assert metadata["::lakefs::Airflow::dag_id"] is not None
+    return f"{repo}-{branch}-commit"
+
+
+@pytest.fixture
+def hook():
+    with patch.object(LakeFSHook, "ensure_healthy"), \
+            patch.object(LakeFSHook, "commit", side_effect=commit) as mock_commit, \
+            patch.object(LakeFSHook, "get_branch_commit_id", return_value="head") as mock_get_branch_commit_id, \
+            patch.object(LakeFSHook, "has_uncommitted_changes", return_value=True) as mock_has_changes, \
+            patch.object(LakeFSHook, "get_commit") as mock_get_commit, \
+            patch.object(LakeFSHook, "revert") as mock_revert, \
+            patch.object(LakeFSHook, "reset_branch") as mock_reset_branch:
+        yield MagicMock(commit=mock_commit, get_branch_commit_id=mock_get_branch_commit_id,
+                        has_uncommitted_changes=mock_has_changes, get_commit=mock_get_commit, revert=mock_revert,
+                        reset_branch=mock_reset_branch)
+
+
+@pytest.mark.parametrize("failure_policy", ["best_effort", "all_or_nothing"])
+def test_multi_commit_reports_every_target(hook, failure_policy):
+    operator = LakeFSMultiCommitOperator(task_id="commit", lakefs_conn_id="", targets=TARGETS, msg="msg",
+                                         failure_policy=failure_policy, max_workers=1)
+    ti = MagicMock()
+
+    with pytest.raises(AirflowException, match=r"Failed to commit \d of 3 branches"):
+        operator.execute({"ti": ti})
+
+    report = ti.xcom_push.call_args.kwargs["value"]
+    assert [entry["branch"] for entry in report] == ["tenant-1", "tenant-2", "tenant-3"]
+    assert report[1]["error"] == "lakeFS is down"
+    assert hook.commit.call_args_list[1].args[2] == "own message"
+    if failure_policy == "best_effort":
+        assert [entry["commit_id"] for entry in report] == ["repo-a-tenant-1-commit", None, "repo-b-tenant-3-commit"]
+        hook.revert.assert_not_called()
+        hook.reset_branch.assert_not_called()
+    else:
+        # No commit starts after the failure, and the earlier commit is reverted.
+        assert hook.commit.call_count == 2
+        assert [entry["compensation"] for entry in report] == ["reverted", "reset", "reset"]
+        hook.revert.assert_called_once_with("repo-a", "tenant-1", "repo-a-tenant-1-commit")
+
+
+def test_retry_succeeds_on_committed_branches(hook):
+    # An earlier try committed every branch but tenant-2, which now commits.
+    hook.has_uncommitted_changes.side_effect = lambda repo, branch: branch == "tenant-2"
+    hook.commit.side_effect = lambda repo, branch, msg, metadata: "retried-commit"
+    operator = LakeFSMultiCommitOperator(task_id="commit", lakefs_conn_id="", targets=TARGETS, msg="msg")
+    hook.get_commit.side_effect = lambda repo, ref: {"metadata": dict(operator.metadata)}
+
+    report = operator.execute({"ti": MagicMock()})
+
+    assert [entry["status"] for entry in report] == ["unchanged", "committed", "unchanged"]
+    assert [entry["commit_id"] for entry in report] == ["head", "retried-commit", "head"]
+    hook.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("own", [True, False])
+def test_failed_commit_claims_only_own_head(hook, own):
+    heads = iter(["head", "moved"])
+    hook.get_branch_commit_id.side_effect = lambda repo, branch: next(heads)
+    hook.commit.side_effect = IOError("response lost")
+    operator = LakeFSMultiCommitOperator(task_id="commit", lakefs_conn_id="", targets=TARGETS[:1], msg="msg",
+                                         failure_policy="all_or_nothing")
+    hook.get_commit.side_effect = lambda repo, ref: {"metadata": dict(operator.metadata) if own else {
+        "airflow_task_id": "another_task"}}
+    ti = MagicMock()
+
+    if own:
+        report = operator.execute({"ti": ti})
+        assert report[0]["status"] == "committed"
+        assert report[0]["commit_id"] == "moved"
+    else:
+        with pytest.raises(AirflowException):
+            operator.execute({"ti": ti})
+        report = ti.xcom_push.call_args.kwargs["value"]
+        assert report[0]["status"] == "unknown"
+        assert report[0]["commit_id"] is None
+        assert report[0]["compensation"] is None
+        hook.revert.assert_not_called()
+        hook.reset_branch.assert_not_called()
+
+
+def test_retry_after_rollback_fails(hook):
+    operator = LakeFSMultiCommitOperator(task_id="commit", lakefs_conn_id="", targets=TARGETS, msg="msg",
+                                         failure_policy="all_or_nothing", max_workers=1)
+    with pytest.raises(AirflowException):
+        operator.execute({"ti": MagicMock()})
+    hook.revert.assert_called_once()
+
+    # The rollback left no uncommitted changes, and heads that are not commits of the run.
+    hook.has_uncommitted_changes.return_value = False
+    hook.get_commit.side_effect = lambda repo, ref: {"metadata": {"airflow_task_id": "commit"}}
+    ti = MagicMock()
+    with pytest.raises(AirflowException, match="Failed to commit 3 of 3 branches"):
+        operator.execute({"ti": ti})
+
+    report = ti.xcom_push.call_args.kwargs["value"]
+    assert [entry["status"] for entry in report] == ["failed", "not_started", "not_started"]
+    assert "not a commit of this task run" in report[0]["error"]
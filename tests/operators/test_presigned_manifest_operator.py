@@ -0,0 +1,114 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from airflow.exceptions import AirflowException
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.presigned_manifest_operator import LakeFSPresignedManifestOperator
+
+PATHS = [f"data/part-{i:04}.parquet" for i in range(5)]
+
+
+class Clock:
+    now = 1000
+
+
+def list_objects(repo, ref, prefix='', delimiter='', size=1000, after='', presign=False):
+    assert presign
+    # lakeFS presigns URLs for 15 minutes, and the first listing takes 100 seconds an object, so
+    # the URLs of its first page expire soon.
+    step = 100 if list_objects.calls == 0 else 0
+    list_objects.calls += 1
+    for path in (p for p in PATHS if p > after):
+        Clock.now += step
+        yield {"path": path, "size_bytes": 10, "physical_address": f"https://s3/{path}?v={list_objects.calls}",
+               "physical_address_expiry": Clock.now + 900}
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    list_objects.calls = 0
+    Clock.now = 1000
+    with patch("lakefs_provider.operators.presigned_manifest_operator.time") as mock_time:
+        mock_time.time.side_effect = lambda: Clock.now
+        yield Clock
+
+
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+@patch.object(LakeFSHook, "list_objects", side_effect=list_objects)
+def test_refreshes_pages_near_expiry(mock_list_objects, mock_get_commit, mock_ensure_healthy, tmp_path):
+    destination = str(tmp_path / "urls.jsonl")
+    operator = LakeFSPresignedManifestOperator(task_id="presign", lakefs_conn_id="", repo="repo", ref="main",
+                                               prefix="data/", destination=destination, page_size=2)
+
+    result = operator.execute({})
+
+    assert result["objects"] == 5
+    assert result["refreshed_pages"] == 1
+    # The second page expires first, after the first page was listed again.
+    assert result["expires_at"] == 2200
+    # Only the first page was listed again.
+    assert mock_list_objects.call_args.kwargs == {"prefix": "data/", "size": 2, "after": "", "presign": True}
+    with open(destination) as manifest:
+        entries = [json.loads(line) for line in manifest]
+    assert [entry["path"] for entry in entries] == PATHS
+    assert [entry["url"].rsplit("=", 1)[1] for entry in entries] == ["2", "2", "1", "1", "1"]
+
+
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+@patch.object(LakeFSHook, "list_objects", side_effect=list_objects)
+@patch.object(LakeFSHook, "upload_file")
+def test_uploads_to_lakefs_destination(mock_upload_file, mock_list_objects, mock_get_commit, mock_ensure_healthy):
+    uploaded = []
+
+    def upload_file(repo, branch, path, local_path):
+        with open(local_path) as manifest:
+            uploaded.append((repo, branch, path, len(manifest.readlines())))
+
+    mock_upload_file.side_effect = upload_file
+    operator = LakeFSPresignedManifestOperator(task_id="presign", lakefs_conn_id="", repo="repo", ref="main",
+                                               prefix="data/", destination="lakefs://out/main/urls/run.jsonl")
+
+    assert operator.execute({})["objects"] == 5
+    assert uploaded == [("out", "main", "urls/run.jsonl", 5)]
+
+
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+@patch.object(LakeFSHook, "list_objects")
+def test_fails_if_listing_changes_while_refreshing(mock_list_objects, mock_get_commit, mock_ensure_healthy,
+                                                   tmp_path):
+    listings = [list_objects("repo", "c1", presign=True),
+                ({**stats, "path": stats["path"] + ".new"} for stats in list_objects("repo", "c1", presign=True))]
+    mock_list_objects.side_effect = lambda *args, **kwargs: listings.pop(0)
+    destination = tmp_path / "urls.jsonl"
+    destination.write_text("previous\n")
+    operator = LakeFSPresignedManifestOperator(task_id="presign", lakefs_conn_id="", repo="repo", ref="main",
+                                               prefix="data/", destination=str(destination), page_size=2)
+
+    with pytest.raises(AirflowException, match="changed while refreshing"):
+        operator.execute({})
+
+    # The previous manifest is left in place, and no temporary file remains.
+    assert destination.read_text() == "previous\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["urls.jsonl"]
+
+
+@patch.object(LakeFSHook, "ensure_healthy")
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+@patch.object(LakeFSHook, "list_objects", side_effect=list_objects)
+def test_fails_if_lakefs_presigns_too_short(mock_list_objects, mock_get_commit, mock_ensure_healthy, tmp_path):
+    operator = LakeFSPresignedManifestOperator(task_id="presign", lakefs_conn_id="", repo="repo", ref="main",
+                                               prefix="data/", destination=str(tmp_path / "urls.jsonl"),
+                                               min_url_validity=timedelta(hours=1))
+
+    with pytest.raises(AirflowException, match="presigns URLs for 900 seconds"):
+        operator.execute({})
+
+    # The operator fails on the first object, without listing the prefix.
+    assert Clock.now == 1100
+    assert not list(tmp_path.iterdir())
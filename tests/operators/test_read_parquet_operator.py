@@ -0,0 +1,75 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.read_parquet_operator import LakeFSReadParquetOperator
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("fsspec")
+
+
+def _parquet(year, rows):
+    table = pa.table({"year": [year] * rows, "id": list(range(rows)),
+                      "payload": [os.urandom(2048).hex() for _ in range(rows)]})
+    out = io.BytesIO()
+    pq.write_table(table, out, row_group_size=100)
+    return out.getvalue()
+
+
+OBJECTS = {"data/2022.parquet": _parquet(2022, 300), "data/2023.parquet": _parquet(2023, 300),
+           "data/_SUCCESS": b""}
+
+
+@pytest.fixture
+def lakefs():
+    ranges = []
+
+    def list_objects(repo, ref, prefix="", **kwargs):
+        for path in sorted(OBJECTS):
+            if path.startswith(prefix):
+                yield {"path": path, "path_type": "object", "size_bytes": len(OBJECTS[path])}
+
+    def stat_object(repo, ref, path):
+        return {"path": path, "path_type": "object", "size_bytes": len(OBJECTS[path])}
+
+    def read_range(repo, ref, path, start, end=None):
+        data = OBJECTS[path][start:end]
+        ranges.append((path, len(data)))
+        return data
+
+    with patch.object(LakeFSHook, "ensure_healthy"), \
+            patch.object(LakeFSHook, "list_objects", side_effect=list_objects), \
+            patch.object(LakeFSHook, "stat_object", side_effect=stat_object), \
+            patch.object(LakeFSHook, "read_range", side_effect=read_range):
+        yield ranges
+
+
+def test_reads_projected_columns_with_filters(lakefs, tmp_path):
+    output_path = str(tmp_path / "out.parquet")
+    operator = LakeFSReadParquetOperator(task_id="read", lakefs_conn_id="", repo="repo", ref="main",
+                                         prefix="data/", output_path=output_path, columns=["year", "id"],
+                                         filters=[("year", "=", 2023), ("id", "<", 150)])
+
+    assert operator.execute({}) == output_path
+
+    table = pq.read_table(output_path)
+    assert table.column_names == ["year", "id"]
+    assert table.num_rows == 150
+    assert set(table.column("year").to_pylist()) == {2023}
+    assert table.column("id").to_pylist() == list(range(150))
+
+
+def test_reads_only_footers_and_selected_column_chunks(lakefs, tmp_path):
+    operator = LakeFSReadParquetOperator(task_id="read", lakefs_conn_id="", repo="repo", ref="main",
+                                         prefix="data/", output_path=str(tmp_path / "out.parquet"),
+                                         columns=["id"])
+
+    operator.execute({})
+
+    assert {path for path, _ in lakefs} == {"data/2022.parquet", "data/2023.parquet"}
+    # The payload column holds most of the bytes, and is never fetched.
+    assert sum(size for _, size in lakefs) < sum(len(content) for content in OBJECTS.values()) / 4
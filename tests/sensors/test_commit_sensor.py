@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.sensors.adaptive_poke import next_poke_interval
+from lakefs_provider.sensors.commit_sensor import LakeFSCommitSensor
+
+DAY = 24 * 3600
+
+
+def test_next_poke_interval_follows_commit_cadence():
+    daily = [10 * DAY, 9 * DAY, 8 * DAY, 7 * DAY]
+    # Quiet right after a commit: back off up to the maximum.
+    assert next_poke_interval(10 * DAY + 3600, daily, 60, 3600) == 3600
+    # Close to the expected commit: tighten.
+    assert next_poke_interval(11 * DAY - 600, daily, 60, 3600) == 300
+    assert next_poke_interval(11 * DAY - 30, daily, 60, 3600) == 60
+    # Overdue: back off again with the time overdue.
+    assert next_poke_interval(11 * DAY + 600, daily, 60, 3600) == 600
+    # No cadence yet: grow with the time waited.
+    assert next_poke_interval(0, [5], 60, 3600, waited=240) == 240
+
+
+@patch.object(LakeFSHook, "log_commits")
+def test_rescheduled_sensor_keeps_baseline(mock_log_commits):
+    from airflow.models import Variable
+
+    heads = iter(["old", "old", "new"])
+    mock_log_commits.side_effect = lambda *args, **kwargs: iter([
+        {"id": next(heads), "creation_date": 2000},
+        {"id": "older", "creation_date": 1000},
+    ])
+    ti = Mock(dag_id="dag", task_id="sensor", run_id="run", map_index=-1, try_number=1,
+              start_date=datetime.fromtimestamp(1500, tz=timezone.utc))
+    variables = {}
+
+    def sensor():
+        # Each reschedule is a new sensor instance.
+        return LakeFSCommitSensor(task_id="sensor", lakefs_conn_id="", repo="repo", branch="main",
+                                  mode="reschedule", poke_interval=60, adaptive_poke=True)
+
+    with patch.object(Variable, "get", side_effect=lambda key, default_var: variables.get(key, default_var)), \
+            patch.object(Variable, "set", side_effect=lambda key, value, **kwargs: variables.update({key: value})):
+        assert not sensor().poke({"ti": ti})
+        assert not sensor().poke({"ti": ti})
+        rescheduled = sensor()
+        assert rescheduled.poke({"ti": ti})
+
+    # The baseline is the head seen on the first poke, whatever the clocks say.
+    assert rescheduled.prev_commit_id == "old"
+    assert list(variables.values()) == ["old"]
+    # The adapted interval does not replace the shortest poke interval.
+    assert rescheduled.poke_interval == 60
+    assert 60 <= rescheduled._get_next_poke_interval(0, lambda: 0, 1) <= 3600
+
+@patch.object(LakeFSHook, "get_branch_commit_id", return_value="head")
+def test_rescheduled_sensor_deletes_baselines_of_earlier_tries(mock_get_branch_commit_id):
+    from airflow.models import Variable
+
+    ti = Mock(dag_id="dag", task_id="sensor", run_id="run", map_index=-1, try_number=3)
+    key = "lakefs_commit_sensor_baseline::dag::sensor::run::-1::{}".format
+    # The first try was killed, and the second cleared, while rescheduled.
+    variables = {key(1): "old", key(2): "old"}
+    sensor = LakeFSCommitSensor(task_id="sensor", lakefs_conn_id="", repo="repo", branch="main", mode="reschedule")
+
+    with patch.object(Variable, "get", side_effect=lambda key, default_var: variables.get(key, default_var)), \
+            patch.object(Variable, "set", side_effect=lambda key, value, **kwargs: variables.update({key: value})), \
+            patch.object(Variable, "delete", side_effect=lambda key: variables.pop(key, None)):
+        assert not sensor.poke({"ti": ti})
+
+    assert variables == {key(3): "head"}
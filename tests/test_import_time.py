@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+# Modules a DAG file imports to declare lakeFS tasks.
+DAG_IMPORTS = [
+    "lakefs_provider.hooks.lakefs_hook",
+    "lakefs_provider.links.lakefs_link",
+    "lakefs_provider.operators.commit_operator",
+    "lakefs_provider.operators.create_branch_operator",
+    "lakefs_provider.operators.create_symlink_operator",
+    "lakefs_provider.operators.delete_branch_operator",
+    "lakefs_provider.operators.delete_stale_branches_operator",
+    "lakefs_provider.operators.export_commit_log_operator",
+    "lakefs_provider.operators.get_commit_operator",
+    "lakefs_provider.operators.get_object_operator",
+    "lakefs_provider.operators.manifest_operator",
+    "lakefs_provider.operators.merge_operator",
+    "lakefs_provider.operators.multi_commit_operator",
+    "lakefs_provider.operators.presigned_manifest_operator",
+    "lakefs_provider.operators.preview_object_operator",
+    "lakefs_provider.operators.read_parquet_operator",
+    "lakefs_provider.operators.stat_objects_operator",
+    "lakefs_provider.operators.upload_operator",
+    "lakefs_provider.sensors.commit_sensor",
+    "lakefs_provider.sensors.file_sensor",
+]
+
+# Packages that must only load on first real use.
+HEAVY_PACKAGES = ["lakefs_sdk", "pyarrow", "fsspec"]
+
+
+def test_dag_imports_do_not_load_heavy_packages():
+    # A fresh interpreter, so that modules loaded by other tests do not count.
+    script = "\n".join([f"import {module}" for module in DAG_IMPORTS] + [
+        "import sys",
+        "print('\\n'.join(sorted(m for m in sys.modules if m.split('.')[0] in %r)))" % (HEAVY_PACKAGES,),
+    ])
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    loaded = result.stdout.split()
+    assert not loaded, f"importing lakeFS operators loads {loaded}"
+
+
+def test_dag_imports_take_a_small_share_of_airflow_import_time():
+    # -X importtime reports "self [us] | cumulative | module" on stderr.  Comparing with `import airflow`
+    # in the same run keeps the check independent of the speed of the machine.
+    script = "\n".join(["import airflow"] + [f"import {module}" for module in DAG_IMPORTS])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True,
+                            check=True)
+
+    self_us, cumulative_us = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, total, module = line[len("import time:"):].split("|")
+        self_us[module.strip()], cumulative_us[module.strip()] = int(own), int(total)
+
+    provider_us = sum(us for module, us in self_us.items() if module.split(".")[0] == "lakefs_provider")
+    assert provider_us < cumulative_us["airflow"] / 4, \
+        f"lakeFS modules import in {provider_us}us, `import airflow` in {cumulative_us['airflow']}us"
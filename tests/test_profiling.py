@@ -0,0 +1,70 @@
+import pstats
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.get_commit_operator import LakeFSGetCommitOperator
+
+TI = SimpleNamespace(dag_id="dag", task_id="get_commit", run_id="manual__2024-01-01T00:00:00+00:00",
+                     try_number=1, map_index=-1)
+
+
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+def test_profiled_execute_writes_profile(mock_get_commit, tmp_path, caplog):
+    operator = LakeFSGetCommitOperator(task_id="get_commit", lakefs_conn_id="", repo="repo", ref="main",
+                                       profile=True)
+
+    with patch("lakefs_provider.profiling.profile_dir", return_value=str(tmp_path)), caplog.at_level("INFO"):
+        assert operator.execute({"ti": TI}) == {"id": "c1"}
+
+    profiles = list(tmp_path.glob("dag/get_commit/manual__2024-01-01T00_00_00_00_00/execute.try_1.*.prof"))
+    assert len(profiles) == 1
+    assert any(func[2] == "execute" for func in pstats.Stats(str(profiles[0])).stats)
+    assert "Profile of execute" in caplog.text
+
+
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+def test_profiling_is_off_by_default(mock_get_commit, tmp_path):
+    operator = LakeFSGetCommitOperator(task_id="get_commit", lakefs_conn_id="", repo="repo", ref="main")
+
+    with patch("lakefs_provider.profiling.profile_dir", return_value=str(tmp_path)):
+        operator.execute({"ti": TI})
+
+    assert not list(tmp_path.rglob("*.prof"))
+
+
+def test_profile_includes_worker_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lakefs_provider.profiling import Profile
+
+    def work_in_worker():
+        return sum(range(1000))
+
+    def call():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return list(executor.map(lambda _: work_in_worker(), range(4)))
+
+    profile = Profile()
+    profile.run(call)
+
+    assert any(func[2] == "work_in_worker" for func in profile.stats(None).stats)
+
+
+def test_sensor_pokes_of_a_try_share_one_profile(tmp_path):
+    from lakefs_sdk.exceptions import NotFoundException
+
+    from lakefs_provider.sensors.file_sensor import LakeFSFileSensor
+
+    sensor = LakeFSFileSensor(task_id="sense", lakefs_conn_id="", repo="repo", branch="main", path="a",
+                              poke_interval=0, profile=True)
+    ti = SimpleNamespace(dag_id="dag", task_id="sense", run_id="run", try_number=1, map_index=-1)
+
+    with patch("lakefs_provider.profiling.profile_dir", return_value=str(tmp_path)), \
+            patch.object(LakeFSHook, "stat_object", side_effect=[NotFoundException(), NotFoundException(), {}]):
+        sensor.execute({"ti": ti})
+
+    profiles = list(tmp_path.rglob("*.prof"))
+    assert [profile.name.split(".")[0] for profile in profiles] == ["poke"]
+    poke_calls = [stat for func, stat in pstats.Stats(str(profiles[0])).stats.items() if func[2] == "poke"]
+    assert poke_calls[0][1] == 3
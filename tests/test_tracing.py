@@ -0,0 +1,87 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from lakefs_sdk.client import LakeFSClient
+from lakefs_sdk.models.commit import Commit
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.operators.commit_operator import LakeFSCommitOperator
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace  # noqa: E402
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+from lakefs_provider.hooks.rest_clients import TracedRESTClient  # noqa: E402
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans():
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+    _exporter.clear()
+    yield _exporter
+
+
+@patch.object(LakeFSHook, "get_base_url")
+@patch.object(LakeFSHook, "get_conn")
+def test_commit_phases_are_child_spans(mock_conn, _, spans):
+    mock_client = Mock(LakeFSClient)()
+    mock_conn.return_value = mock_client
+    mock_client.commits_api.commit.return_value = Commit(
+        id="c1", parents=[], committer="", message="", creation_date=0, meta_range_id="")
+
+    operator = LakeFSCommitOperator(task_id="commit", lakefs_conn_id="", repo="repo", branch="main",
+                                    msg="msg", metadata={})
+    with patch.object(LakeFSCommitOperator, "enrich_metadata"), \
+            patch("lakefs_provider.links.lakefs_link.LakeFSLink.persist"):
+        assert operator.execute({}) == "c1"
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    assert set(finished) == {"lakefs.task", "lakefs.commit"}
+    assert finished["lakefs.commit"].parent.span_id == finished["lakefs.task"].context.span_id
+    assert finished["lakefs.commit"].attributes["lakefs.repo"] == "repo"
+    assert finished["lakefs.commit"].attributes["lakefs.branch"] == "main"
+
+
+@patch.object(LakeFSHook, "get_commit", return_value={"id": "c1"})
+def test_every_operator_records_a_task_span(mock_get_commit, spans):
+    from lakefs_provider.operators.get_commit_operator import LakeFSGetCommitOperator
+
+    operator = LakeFSGetCommitOperator(task_id="get_commit", lakefs_conn_id="", repo="repo", ref="main")
+    operator.execute({})
+
+    (task,) = spans.get_finished_spans()
+    assert task.name == "lakefs.task"
+    assert task.attributes["lakefs.operator"] == "LakeFSGetCommitOperator"
+    assert task.attributes["lakefs.repo"] == "repo"
+
+
+def test_requests_carry_trace_context(spans):
+    inner = Mock()
+    client = TracedRESTClient(inner)
+    with trace.get_tracer(__name__).start_as_current_span("parent") as parent:
+        client.get_request("http://lakefs/api/v1/repositories", headers={"X-Lakefs-Client": "airflow"})
+
+    headers = inner.request.call_args.kwargs["headers"]
+    assert headers["X-Lakefs-Client"] == "airflow"
+    assert headers["traceparent"].split("-")[2] == format(parent.get_span_context().span_id, "016x")
+
+
+def test_prefetched_pages_keep_the_consumer_span(spans):
+    def get_raw(resource_path, query):
+        return Mock(data=b'{"results": [], "pagination": {"has_more": false}}')
+
+    with patch.object(LakeFSHook, "_get_raw", side_effect=get_raw), \
+            trace.get_tracer(__name__).start_as_current_span("parent") as parent:
+        assert list(LakeFSHook(lakefs_conn_id="").log_commit_pages("repo", "main")) == [[]]
+
+    (log_commits,) = [span for span in spans.get_finished_spans() if span.name == "lakefs.log_commits"]
+    assert log_commits.parent.span_id == parent.get_span_context().span_id
@@ -0,0 +1,60 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from lakefs_provider.events.receiver import LakeFSEventReceiver, main
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.triggers.event_trigger import LakeFSCommitTrigger
+
+
+async def _first_event(trigger):
+    async for event in trigger.run():
+        return event
+
+
+@patch.object(LakeFSHook, "get_branch_commit_id", return_value="old")
+def test_commit_trigger_wakes_on_webhook(mock_get_branch_commit_id):
+    async def run():
+        receiver = LakeFSEventReceiver("127.0.0.1", 0)
+        await receiver.start()
+        trigger = LakeFSCommitTrigger(lakefs_conn_id="", repo="repo", branch="main", prev_commit_id="old",
+                                      poll_interval=30, event_receiver_url=f"http://127.0.0.1:{receiver.port}")
+        waiting = asyncio.ensure_future(_first_event(trigger))
+        await asyncio.sleep(0.2)
+        await receiver.record({"repository_id": "repo", "branch_id": "other", "commit_id": "x"})
+        await receiver.record({"repository_id": "repo", "branch_id": "main", "commit_id": "new"})
+        event = await asyncio.wait_for(waiting, timeout=5)
+        await receiver.close()
+        return event
+
+    event = asyncio.run(run())
+    assert event.payload == {"status": "success", "commit_id": "new"}
+    # Only the initial check hit lakeFS, the commit came from the webhook.
+    mock_get_branch_commit_id.assert_called_once_with("repo", "main")
+
+
+@patch.object(LakeFSHook, "get_branch_commit_id", side_effect=["old", "new"])
+def test_commit_trigger_polls_without_receiver(mock_get_branch_commit_id):
+    trigger = LakeFSCommitTrigger(lakefs_conn_id="", repo="repo", branch="main", prev_commit_id="old",
+                                  poll_interval=0.01, event_receiver_url="http://127.0.0.1:1")
+
+    event = asyncio.run(asyncio.wait_for(_first_event(trigger), timeout=5))
+
+    assert event.payload == {"status": "success", "commit_id": "new"}
+    assert mock_get_branch_commit_id.call_count == 2
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "10.0.0.5", "receiver.example.com"])
+def test_receiver_requires_token_off_loopback(host):
+    with pytest.raises(SystemExit), patch("lakefs_provider.events.receiver.asyncio.run") as mock_run:
+        main(["--host", host])
+    mock_run.assert_not_called()
+
+
+@pytest.mark.parametrize("argv", [[], ["--host", "::1"], ["--host", "0.0.0.0", "--token", "secret"]])
+def test_receiver_starts_on_loopback_or_with_token(argv):
+    with patch("lakefs_provider.events.receiver.asyncio.run") as mock_run:
+        main(argv)
+    mock_run.assert_called_once()
+    mock_run.call_args.args[0].close()
@@ -0,0 +1,27 @@
+import asyncio
+from unittest.mock import patch
+
+from lakefs_provider.hooks.lakefs_hook import LakeFSHook
+from lakefs_provider.triggers.event_trigger import LakeFSCommitTrigger
+from lakefs_provider.triggers.poller import get_poller
+
+
+async def _first_event(trigger):
+    async for event in trigger.run():
+        return event
+
+
+@patch.object(LakeFSHook, "get_branch_commit_id", side_effect=["old", "new"])
+def test_triggers_on_same_branch_share_checks(mock_get_branch_commit_id):
+    async def run():
+        triggers = [LakeFSCommitTrigger(lakefs_conn_id="", repo="repo", branch="main", prev_commit_id="old",
+                                        poll_interval=0.05)
+                    for _ in range(50)]
+        events = await asyncio.wait_for(asyncio.gather(*(_first_event(t) for t in triggers)), timeout=5)
+        return events, get_poller().fetches
+
+    events, fetches = asyncio.run(run())
+
+    assert all(event.payload == {"status": "success", "commit_id": "new"} for event in events)
+    assert fetches == 2
+    assert mock_get_branch_commit_id.call_count == 2